@@ -1,26 +1,54 @@
+from django import forms
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Count, Q
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from django.utils import timezone
+from .bulk_export import export_response
+from .changelist import (
+    DateDrillDownFilter, EstimatedCountPaginator, KeysetChangeList, update_in_batches
+)
+from .counters import adjust
+from .search import matching_ids
 from .models import (
     Profile, Skill, Project, Experience, 
-    Education, Certification, Contact, Testimonial
+    Education, Certification, Contact, Testimonial, OutboundEmail,
+    Technology
 )
 
 # Register your models here.
-admin.site.site_header = "Portfolio Administration"
-admin.site.site_title = "Portfolio Admin Portal"
-admin.site.index_title = "Welcome to Portfolio Management System"
+# admin.site is main.sites.CustomAdminSite, see portfolio/apps.py
 
 
 class BaseModelAdmin(admin.ModelAdmin):
     """Base admin class with common features"""
     
+    # Set to a main.search.SEARCH_TABLES key to route changelist search
+    # through the full-text index instead of LIKE scans
+    search_kind = None
+    
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs
     
+    actions = ['export_as_csv', 'export_as_jsonl']
+    
+    def export_as_csv(self, request, queryset):
+        return export_response(request, queryset, 'csv')
+    export_as_csv.short_description = "Export selected as CSV"
+    
+    def export_as_jsonl(self, request, queryset):
+        return export_response(request, queryset, 'jsonl')
+    export_as_jsonl.short_description = "Export selected as JSON Lines"
+    
+    def get_search_results(self, request, queryset, search_term):
+        if self.search_kind:
+            ids = matching_ids(self.search_kind, search_term)
+            if ids is not None:
+                return queryset.filter(pk__in=ids), False
+        return super().get_search_results(request, queryset, search_term)
+    
     class Media:
         css = {
             'all': ('admin/css/custom_admin.css',)
@@ -91,11 +119,41 @@ class SkillAdmin(BaseModelAdmin):
     icon_preview.short_description = 'Icon'
 
 
+@admin.register(Technology)
+class TechnologyAdmin(BaseModelAdmin):
+    list_display = ['name', 'slug', 'project_count']
+    search_fields = ['name']
+    prepopulated_fields = {'slug': ('name',)}
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(num_projects=Count('projects'))
+    
+    def project_count(self, obj):
+        return obj.num_projects
+    project_count.short_description = 'Projects'
+    project_count.admin_order_field = 'num_projects'
+
+
+class ProjectAdminForm(forms.ModelForm):
+    technologies = forms.CharField(max_length=300, required=False, help_text="Comma-separated technologies")
+    
+    class Meta:
+        model = Project
+        exclude = ['stack']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('technologies', ', '.join(self.instance.get_tech_list()))
+
+
 @admin.register(Project)
 class ProjectAdmin(BaseModelAdmin):
+    form = ProjectAdminForm
     list_display = ['title', 'thumbnail', 'is_featured_badge', 'tech_stack', 'links', 'created_date', 'is_featured']
-    list_filter = ['is_featured', 'created_date']
-    search_fields = ['title', 'description', 'technologies']
+    list_filter = ['is_featured', 'stack', 'created_date']
+    search_fields = ['title', 'description']
+    search_kind = 'project'
     list_editable = ['is_featured']
     readonly_fields = ['image_preview', 'created_date']
     date_hierarchy = 'created_date'
@@ -141,6 +199,21 @@ class ProjectAdmin(BaseModelAdmin):
         )
     is_featured_badge.short_description = 'Status'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('stack')
+    
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term.strip():
+            # Technology names live in another table, outside the text index
+            results |= queryset.filter(stack__name__iexact=search_term.strip())
+            may_have_duplicates = True
+        return results, may_have_duplicates
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        form.instance.stack.set(Technology.from_names(form.cleaned_data.get('technologies', '')))
+    
     def tech_stack(self, obj):
         techs = obj.get_tech_list()[:3]
         badges = ''.join([
@@ -165,6 +238,7 @@ class ExperienceAdmin(BaseModelAdmin):
     list_display = ['position', 'company', 'duration', 'status_badge', 'start_date']
     list_filter = ['is_current', 'start_date']
     search_fields = ['position', 'company', 'description']
+    search_kind = 'experience'
     date_hierarchy = 'start_date'
     
     fieldsets = (
@@ -202,6 +276,7 @@ class EducationAdmin(BaseModelAdmin):
     list_display = ['degree', 'institution', 'field_of_study', 'grade_badge', 'duration', 'start_date']
     list_filter = ['start_date']
     search_fields = ['degree', 'institution', 'field_of_study']
+    search_kind = 'education'
     date_hierarchy = 'start_date'
     
     fieldsets = (
@@ -236,6 +311,7 @@ class CertificationAdmin(BaseModelAdmin):
     list_display = ['name', 'issuing_organization', 'issue_date', 'credential_badge', 'verify_link']
     list_filter = ['issuing_organization', 'issue_date']
     search_fields = ['name', 'issuing_organization', 'credential_id']
+    search_kind = 'certification'
     date_hierarchy = 'issue_date'
     
     fieldsets = (
@@ -268,13 +344,39 @@ class CertificationAdmin(BaseModelAdmin):
     verify_link.short_description = 'Verification'
 
 
+class ReadStatusFilter(admin.SimpleListFilter):
+    title = 'read'
+    parameter_name = 'is_read'
+    
+    def lookups(self, request, model_admin):
+        return [('0', 'Unread'), ('1', 'Read')]
+    
+    def queryset(self, request, queryset):
+        if self.value() in ('0', '1'):
+            # is_read=False compiles to NOT is_read, which SQLite can't
+            # match against contact_inbox_idx; IN compiles to an equality
+            return queryset.filter(is_read__in=[self.value() == '1'])
+        return None
+
+
+class ReceivedFilter(DateDrillDownFilter):
+    title = 'received'
+    parameter_name = 'received'
+    field_name = 'created_at'
+
+
 @admin.register(Contact)
 class ContactAdmin(BaseModelAdmin):
     list_display = ['name', 'email', 'subject', 'status_badge', 'created_at', 'action_buttons']
-    list_filter = ['is_read', 'created_at']
+    # The inbox can grow to millions of rows: no date_hierarchy or facets
+    # (both scan the table), a capped count, and keyset links past it
+    list_filter = [ReadStatusFilter, ReceivedFilter]
     search_fields = ['name', 'email', 'subject', 'message']
+    search_kind = 'contact'
     readonly_fields = ['created_at']
-    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
     
     fieldsets = (
         ('Contact Information', {
@@ -312,15 +414,24 @@ class ContactAdmin(BaseModelAdmin):
         return ''
     action_buttons.short_description = 'Actions'
     
-    actions = ['mark_as_read', 'mark_as_unread']
+    actions = ['mark_as_read', 'mark_as_unread', *BaseModelAdmin.actions]
+    
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
     
     def mark_as_read(self, request, queryset):
-        updated = queryset.update(is_read=True)
+        updated = update_in_batches(
+            queryset.filter(is_read__in=[False]), is_read=True,
+            after_batch=lambda count: adjust('unread_contacts', -count),
+        )
         self.message_user(request, f'{updated} message(s) marked as read.')
     mark_as_read.short_description = "Mark selected as read"
     
     def mark_as_unread(self, request, queryset):
-        updated = queryset.update(is_read=False)
+        updated = update_in_batches(
+            queryset.filter(is_read__in=[True]), is_read=False,
+            after_batch=lambda count: adjust('unread_contacts', count),
+        )
         self.message_user(request, f'{updated} message(s) marked as unread.')
     mark_as_unread.short_description = "Mark selected as unread"
 
@@ -360,20 +471,19 @@ class TestimonialAdmin(BaseModelAdmin):
     image_thumbnail.short_description = 'Photo'
 
 
-# Custom Dashboard
-class CustomAdminSite(admin.AdminSite):
-    site_header = "Portfolio Administration"
-    site_title = "Portfolio Admin"
-    index_title = "Dashboard"
-    
-    def index(self, request, extra_context=None):
-        extra_context = extra_context or {}
-        
-        # Get statistics
-        extra_context['total_projects'] = Project.objects.count()
-        extra_context['featured_projects'] = Project.objects.filter(is_featured=True).count()
-        extra_context['total_skills'] = Skill.objects.count()
-        extra_context['unread_contacts'] = Contact.objects.filter(is_read=False).count()
-        extra_context['total_certifications'] = Certification.objects.count()
-        
-        return super().index(request, extra_context)
\ No newline at end of file
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(BaseModelAdmin):
+    list_display = ['subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'to']
+    readonly_fields = ['attempts', 'last_error', 'created_at', 'sent_at']
+    
+    actions = ['retry_now', *BaseModelAdmin.actions]
+    
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} email(s) queued for immediate delivery.')
+    retry_now.short_description = "Retry selected now"
+
@@ -0,0 +1,338 @@
+"""
+Page view analytics without a database write per request.
+
+PageViewMiddleware appends each view to an in-process ring buffer. A
+background thread writes the buffer out with bulk_create() every
+ANALYTICS_FLUSH_INTERVAL seconds, or sooner once ANALYTICS_FLUSH_SIZE views
+are waiting. rollup() folds the raw rows into PageViewHour and PageViewDay
+and deletes them, so the table of raw views stays small and the admin
+analytics page only reads the rollups.
+"""
+import atexit
+import collections
+import datetime
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Greatest, TruncDate, TruncHour
+from django.utils import timezone
+
+from .cache import get_cache
+from .models import PageView, PageViewDay, PageViewHour
+
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_LOCK_KEY = 'portfolio:analytics:rollup-lock'
+
+BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|preview|curl|wget|python|java/|http', re.IGNORECASE)
+# Checked in order: Edge and Opera also claim to be Chrome, Chrome claims Safari
+BROWSERS = (
+    ('Edge', 'Edg/'),
+    ('Opera', 'OPR/'),
+    ('Chrome', 'Chrome/'),
+    ('Firefox', 'Firefox/'),
+    ('Safari', 'Safari/'),
+)
+
+# PageViewDay dimension -> PageView field
+DIMENSIONS = {
+    'path': 'path',
+    'referrer': 'referrer',
+    'agent': 'agent',
+    'status': 'status',
+}
+
+
+def coarse_agent(user_agent):
+    if BOT_PATTERN.search(user_agent):
+        return 'Bot'
+    family = next((name for name, token in BROWSERS if token in user_agent), 'Other')
+    return f'{family} mobile' if 'Mobi' in user_agent else family
+
+
+def referrer_host(request):
+    """Host of an external referrer, blank for direct visits and internal links"""
+    host = urlsplit(request.META.get('HTTP_REFERER', '')).hostname or ''
+    own = request.META.get('HTTP_HOST', '').rsplit(':', 1)[0].lower()
+    return '' if host == own else host[:200]
+
+
+def should_record(request):
+    # No User-Agent: health checks, and the test client the build commands
+    # render pages with
+    if not settings.PORTFOLIO_ANALYTICS or request.method not in ('GET', 'HEAD'):
+        return False
+    if not request.META.get('HTTP_USER_AGENT'):
+        return False
+    return not request.path.startswith(tuple(settings.ANALYTICS_EXCLUDE_PATHS))
+
+
+def recorded_path(request, response):
+    """
+    The page a view is filed under. Error responses go under their URL
+    pattern, or one shared placeholder when nothing matched, so scanners
+    probing random paths can't add a rollup row per path.
+    """
+    if response.status_code < 400:
+        return request.path[:300]
+    match = getattr(request, 'resolver_match', None)
+    return f'/{match.route}'[:300] if match else '<unresolved>'
+
+
+def record(request, response, started):
+    """
+    Queue a page view, once a streamed response has finished sending so its
+    latency covers the body; never touches the database. Returns `response`.
+    """
+    if not should_record(request):
+        return response
+    view = {
+        'path': recorded_path(request, response),
+        'referrer': referrer_host(request),
+        'agent': coarse_agent(request.META['HTTP_USER_AGENT']),
+        'status': response.status_code,
+        'created_at': timezone.now(),
+    }
+
+    def done():
+        view['latency_ms'] = int((time.perf_counter() - started) * 1000)
+        get_buffer().add(view)
+
+    if not response.streaming:
+        done()
+    elif response.is_async:
+        response.streaming_content = _astreamed(response.streaming_content, done)
+    else:
+        response.streaming_content = _streamed(response.streaming_content, done)
+    return response
+
+
+def _streamed(chunks, done):
+    try:
+        yield from chunks
+    finally:
+        done()
+
+
+async def _astreamed(chunks, done):
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        done()
+
+
+class PageViewBuffer:
+    """Ring buffer of page views for this process, drained by a daemon thread"""
+
+    def __init__(self, size):
+        self.views = collections.deque(maxlen=size)
+        self.dropped = 0
+        self.pid = os.getpid()
+        self.wake = threading.Event()
+        self.flush_lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.thread = None
+
+    def add(self, view):
+        if len(self.views) == self.views.maxlen:
+            # The oldest view is overwritten; the database is behind
+            self.dropped += 1
+        self.views.append(view)
+        if self.thread is None:
+            self.start()
+        if len(self.views) >= settings.ANALYTICS_FLUSH_SIZE:
+            self.wake.set()
+
+    def start(self):
+        with self.start_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='pageview-flusher', daemon=True)
+                self.thread.start()
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.views.popleft())
+            except IndexError:
+                return items
+
+    def flush(self):
+        """Write every buffered view with bulk_create, returning how many"""
+        with self.flush_lock:
+            items = self.drain()
+            if not items:
+                return 0
+            try:
+                PageView.objects.bulk_create([PageView(**item) for item in items], batch_size=500)
+            except Exception:
+                logger.exception("Could not write %d page views", len(items))
+                return 0
+            if self.dropped:
+                logger.warning("Page view buffer overflowed, %d views dropped", self.dropped)
+                self.dropped = 0
+            return len(items)
+
+    def run(self):
+        next_rollup = time.monotonic() + settings.ANALYTICS_ROLLUP_INTERVAL
+        while True:
+            self.wake.wait(settings.ANALYTICS_FLUSH_INTERVAL)
+            self.wake.clear()
+            self.flush()
+            if settings.ANALYTICS_ROLLUP_INTERVAL and time.monotonic() >= next_rollup:
+                next_rollup = time.monotonic() + settings.ANALYTICS_ROLLUP_INTERVAL
+                try:
+                    rollup()
+                except Exception:
+                    logger.exception("Page view rollup failed")
+            close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """This process's buffer; a forked worker starts its own"""
+    global _buffer
+    if _buffer is None or _buffer.pid != os.getpid():
+        with _buffer_lock:
+            if _buffer is None or _buffer.pid != os.getpid():
+                _buffer = PageViewBuffer(settings.ANALYTICS_BUFFER_SIZE)
+    return _buffer
+
+
+@atexit.register
+def _flush_at_exit():
+    if _buffer is not None and _buffer.pid == os.getpid():
+        try:
+            _buffer.flush()
+        except Exception:
+            pass
+
+
+def _accumulate(model, keys, sums, maxima=None):
+    """Add `sums` to the rollup row at `keys`, creating it if needed"""
+    changes = {field: F(field) + value for field, value in sums.items()}
+    changes.update({field: Greatest(F(field), value) for field, value in (maxima or {}).items()})
+    if not model.objects.filter(**keys).update(**changes):
+        model.objects.create(**keys, **sums, **(maxima or {}))
+
+
+def rollup():
+    """
+    Fold every raw page view into the hourly and daily tables, delete the
+    raw rows and apply the retention windows. Returns the number of views
+    rolled up, or None if another process is already rolling up.
+    """
+    cache = get_cache()
+    if not cache.add(ROLLUP_LOCK_KEY, 1, 600):
+        return None
+    try:
+        with transaction.atomic():
+            last = PageView.objects.order_by('-id').values_list('id', flat=True).first()
+            count = 0
+            if last is not None:
+                raw = PageView.objects.filter(id__lte=last).order_by()
+                hours = raw.annotate(hour=TruncHour('created_at')).values('hour', 'path').annotate(
+                    views=Count('id'),
+                    errors=Count('id', filter=Q(status__gte=500)),
+                    latency_total=Sum('latency_ms'),
+                    latency_max=Max('latency_ms'),
+                )
+                for row in hours:
+                    _accumulate(
+                        PageViewHour, {'hour': row['hour'], 'path': row['path']},
+                        {'views': row['views'], 'errors': row['errors'], 'latency_total_ms': row['latency_total']},
+                        {'latency_max_ms': row['latency_max']},
+                    )
+                for dimension, field in DIMENSIONS.items():
+                    days = raw.annotate(day=TruncDate('created_at')).values('day', field).annotate(views=Count('id'))
+                    for row in days:
+                        _accumulate(
+                            PageViewDay, {'day': row['day'], 'dimension': dimension, 'value': str(row[field])},
+                            {'views': row['views']},
+                        )
+                count = raw.delete()[0]
+            prune()
+        return count
+    finally:
+        cache.delete(ROLLUP_LOCK_KEY)
+
+
+def prune(now=None):
+    now = now or timezone.now()
+    PageViewHour.objects.filter(
+        hour__lt=now - datetime.timedelta(days=settings.ANALYTICS_HOURLY_RETENTION_DAYS)
+    ).delete()
+    PageViewDay.objects.filter(
+        day__lt=timezone.localdate(now) - datetime.timedelta(days=settings.ANALYTICS_DAILY_RETENTION_DAYS)
+    ).delete()
+
+
+def analytics_summary(hours=48, days=30, top=10):
+    """Everything the admin analytics page shows, read from the rollup tables"""
+    now = timezone.now()
+    first_hour = now.replace(minute=0, second=0, microsecond=0) - datetime.timedelta(hours=hours - 1)
+    hourly = {
+        row['hour']: row for row in
+        PageViewHour.objects.filter(hour__gte=first_hour).values('hour').annotate(
+            views=Sum('views'), errors=Sum('errors'),
+            latency_total=Sum('latency_total_ms'), latency_max=Max('latency_max_ms'),
+        ).order_by()
+    }
+    hour_series = []
+    for offset in range(hours):
+        hour = first_hour + datetime.timedelta(hours=offset)
+        row = hourly.get(hour, {})
+        views = row.get('views') or 0
+        hour_series.append({
+            'hour': hour,
+            'views': views,
+            'errors': row.get('errors') or 0,
+            'latency_avg': round((row.get('latency_total') or 0) / views) if views else 0,
+            'latency_max': row.get('latency_max') or 0,
+        })
+
+    first_day = timezone.localdate(now) - datetime.timedelta(days=days - 1)
+    in_range = PageViewDay.objects.filter(day__gte=first_day)
+    daily = dict(
+        in_range.filter(dimension='path').values('day').annotate(views=Sum('views'))
+        .values_list('day', 'views').order_by()
+    )
+    day_series = [
+        {'day': day, 'views': daily.get(day, 0)}
+        for day in (first_day + datetime.timedelta(days=offset) for offset in range(days))
+    ]
+    breakdowns = {
+        dimension: list(
+            in_range.filter(dimension=dimension).values('value').annotate(views=Sum('views'))
+            .order_by('-views', 'value')[:top]
+        )
+        for dimension in DIMENSIONS
+    }
+
+    recent = hour_series[-24:]
+    recent_views = sum(row['views'] for row in recent)
+    return {
+        'hours': hour_series,
+        'days': day_series,
+        'breakdowns': breakdowns,
+        'views_24h': recent_views,
+        'errors_24h': sum(row['errors'] for row in recent),
+        'latency_avg_24h': round(
+            sum(row['latency_avg'] * row['views'] for row in recent) / recent_views
+        ) if recent_views else 0,
+        'views_period': sum(row['views'] for row in day_series),
+        'peak_hour': max(row['views'] for row in hour_series),
+        'peak_day': max(row['views'] for row in day_series),
+    }
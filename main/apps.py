@@ -4,4 +4,18 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
-    verbose_name = 'Portfolio Management'
\ No newline at end of file
+    verbose_name = 'Portfolio Management'
+
+    def ready(self):
+        from django.core.checks import Tags, register
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from .checks import check_shared_cache, check_vendored_assets
+        from .metrics import install_query_timer
+        from .signals import connect_signals, install_search_triggers
+        connect_signals()
+        post_migrate.connect(install_search_triggers, sender=self)
+        connection_created.connect(install_query_timer, dispatch_uid='install_query_timer')
+        register(check_shared_cache, Tags.caches)
+        register(check_vendored_assets, Tags.staticfiles)
+
@@ -0,0 +1,138 @@
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.templatetags.static import static
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+
+@dataclass(frozen=True)
+class VendorAsset:
+    """A third-party file served from our static tree instead of its CDN"""
+    path: str
+    url: str
+    # Files the asset references by relative URL, as (static path, source url)
+    extra: tuple = ()
+
+
+FONT_AWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0'
+
+VENDOR_ASSETS = {
+    'bootstrap-css': VendorAsset(
+        'vendor/bootstrap/bootstrap.min.css',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
+    ),
+    'bootstrap-js': VendorAsset(
+        'vendor/bootstrap/bootstrap.bundle.min.js',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js',
+    ),
+    'fontawesome-css': VendorAsset(
+        'vendor/fontawesome/css/all.min.css',
+        f'{FONT_AWESOME_CDN}/css/all.min.css',
+        extra=tuple(
+            (f'vendor/fontawesome/webfonts/{font}{ext}', f'{FONT_AWESOME_CDN}/webfonts/{font}{ext}')
+            for font in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility')
+            for ext in ('.woff2', '.ttf')
+        ),
+    ),
+    # Symbol sprites that main.icons subsets into build/icons.svg
+    **{
+        f'fa-sprite-{style}': VendorAsset(
+            f'vendor/fontawesome/sprites/{style}.svg',
+            f'https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.4.0/sprites/{style}.svg',
+        )
+        for style in ('solid', 'regular', 'brands')
+    },
+    # Font files are discovered from the stylesheet when it is fetched. The
+    # committed copy holds the regular and bold faces only
+    'poppins-css': VendorAsset(
+        'vendor/fonts/poppins.css',
+        'https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&display=swap',
+    ),
+    'aos-css': VendorAsset(
+        'vendor/aos/aos.css',
+        'https://unpkg.com/aos@2.3.1/dist/aos.css',
+    ),
+    'aos-js': VendorAsset(
+        'vendor/aos/aos.js',
+        'https://unpkg.com/aos@2.3.1/dist/aos.js',
+    ),
+    'typed-js': VendorAsset(
+        'vendor/typed/typed.min.js',
+        'https://cdn.jsdelivr.net/npm/typed.js@2.0.12',
+    ),
+}
+
+
+def vendor_root():
+    return settings.STATICFILES_DIRS[0]
+
+
+def missing_assets():
+    return [name for name, asset in VENDOR_ASSETS.items() if not finders.find(asset.path)]
+
+
+@lru_cache(maxsize=None)
+def asset_url(name):
+    """
+    Fingerprinted static URL of a vendored asset. Pages never fall back to
+    the CDN; a missing copy fails `manage.py check` (main.E002) and
+    `build_assets` instead.
+    """
+    return static(VENDOR_ASSETS[name].path)
+
+
+# name.<12 hex digits>.ext as written by ManifestStaticFilesStorage
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def serve_static(request, path):
+    """
+    Serve a collected static file, preferring a precompressed sibling.
+
+    Fingerprinted names never change content, so they are cacheable
+    forever; anything else gets a short lifetime and is revalidated with
+    If-Modified-Since.
+    """
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation as exc:
+        raise Http404(path) from exc
+    if not os.path.isfile(fullpath):
+        raise Http404(path)
+    mtime = os.stat(fullpath).st_mtime
+    cache_control = (
+        'public, max-age=31536000, immutable' if HASHED_NAME.search(path)
+        else f'public, max-age={getattr(settings, "STATIC_UNHASHED_MAX_AGE", 300)}'
+    )
+    if not was_modified_since(request.headers.get('If-Modified-Since'), mtime):
+        response = HttpResponseNotModified()
+        response['Cache-Control'] = cache_control
+        response['Vary'] = 'Accept-Encoding'
+        return response
+
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    accepted = request.headers.get('Accept-Encoding', '')
+    encoding = None
+    for name, suffix in ENCODINGS:
+        if name in accepted and os.path.isfile(fullpath + suffix):
+            fullpath, encoding = fullpath + suffix, name
+            break
+
+    response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = cache_control
+    return response
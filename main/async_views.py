@@ -0,0 +1,107 @@
+"""
+Async versions of the public views, used when PORTFOLIO_ASYNC_VIEWS is on.
+
+Under an ASGI server they run on the event loop with no thread hand-off
+while the snapshot and page cache are warm. A snapshot reload fans its
+queries out concurrently (see snapshot.aload_snapshot). Under WSGI Django
+runs them in a per-request event loop and they behave like the sync views.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+
+from .cache import cache_public_page
+from .freshness import conditional_page
+from .routers import read_replica
+from .pagination import akeyset_page, decode_cursor
+from .search import search as search_content
+from .snapshot import aget_snapshot
+from .streaming import astream_render
+from .views import (
+    about_context, fragment_response, index_context, next_page_cursor,
+    projects_position, projects_query, skills_context,
+)
+
+
+async def attach_snapshot(request):
+    """Load the snapshot for this request so templates never query for it"""
+    request.portfolio_snapshot = snapshot = await aget_snapshot()
+    return snapshot
+
+
+async def aproject_page(tech='', position=None):
+    items, has_more = await akeyset_page(projects_query(tech), position, settings.PROJECTS_PAGE_SIZE)
+    return items, next_page_cursor(items, has_more, tech)
+
+
+@read_replica
+@conditional_page('home')
+@cache_public_page
+async def index(request):
+    async def context():
+        return index_context(await attach_snapshot(request))
+    return await astream_render(request, 'index.html', context)
+
+
+@read_replica
+@conditional_page('about')
+@cache_public_page
+async def about(request):
+    async def context():
+        return about_context(await attach_snapshot(request))
+    return await astream_render(request, 'about.html', context)
+
+
+@read_replica
+@conditional_page('projects')
+@cache_public_page
+async def projects(request, tech=''):
+    position, tech = projects_position(request, tech)
+
+    async def context():
+        (page, next_cursor), snapshot = await asyncio.gather(
+            aproject_page(tech, position), attach_snapshot(request),
+        )
+        return {
+            'projects': page,
+            'next_cursor': next_cursor,
+            'technologies': snapshot.technologies,
+            'current_tech': tech,
+        }
+    return await astream_render(request, 'projects.html', context)
+
+
+@read_replica
+@conditional_page('projects_fragment')
+@cache_public_page
+async def projects_fragment(request, cursor):
+    position = decode_cursor(cursor)
+    if position is None:
+        raise Http404("Invalid cursor")
+    page, next_cursor = await aproject_page(position.get('tech', ''), position)
+    return fragment_response(request, page, next_cursor)
+
+
+@read_replica
+@conditional_page('skills')
+@cache_public_page
+async def skills(request):
+    async def context():
+        return skills_context(await attach_snapshot(request))
+    return await astream_render(request, 'skills.html', context)
+
+
+@read_replica
+@conditional_page('search')
+async def search(request):
+    query = request.GET.get('q', '').strip()
+
+    async def context():
+        results, _ = await asyncio.gather(
+            sync_to_async(search_content)(query) if query else asyncio.sleep(0, result=[]),
+            attach_snapshot(request),
+        )
+        return {'query': query, 'results': results}
+    return await astream_render(request, 'search.html', context)
@@ -0,0 +1,329 @@
+"""
+Endpoint benchmarks with stored baselines.
+
+`python manage.py benchmark_endpoints` requests every route in main/urls.py
+and the main admin pages through the test client and through local WSGI and
+ASGI servers. It records p50/p95 latency, and, through the test client, the
+SQL queries and peak Python memory of one request. Results are compared with
+the baseline file (settings.BENCHMARK_BASELINE) and any metric past its
+threshold fails the run. Seed data first with `manage.py seed_portfolio`.
+"""
+import asyncio
+import http.client
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.contrib import admin
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.urls import reverse
+
+from . import urls
+from .cache import bump_content_version
+from .models import Project, Technology
+from .views import project_page
+
+# Test client, warm page cache; test client with the content version moved
+# before every request, so each one renders; real servers over loopback
+MODES = ('client', 'cold', 'wsgi', 'asgi')
+
+# Latency and memory wobble between runs, so they fail past a relative
+# threshold plus a small absolute allowance. A p95 over a few dozen requests
+# jumps with any GC pause or noisy neighbour, so only a gross change in the
+# tail fails; query counts are exact
+DEFAULT_THRESHOLDS = {
+    'latency': 0.5,
+    'tail_latency': 3.0,
+    'latency_slack_ms': 2.0,
+    'memory': 0.25,
+    'memory_slack_kib': 64,
+    'queries': 0,
+}
+
+TRACED_REQUESTS = 3
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    # The default backlog of 5 stalls bursts on SYN retries
+    request_queue_size = 128
+
+
+class ASGIServer:
+    """
+    Just enough HTTP/1.0 over asyncio to drive an ASGI app: a stand-in for
+    uvicorn/daphne, which this project does not depend on.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self.tasks = set()
+
+    def start(self):
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._listen(), self.loop).result()
+
+    async def _listen(self):
+        self.server = await asyncio.start_server(self.accept, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        async def close():
+            self.server.close()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            await self.server.wait_closed()
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def accept(self, reader, writer):
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            await self.handle(reader, writer)
+        finally:
+            self.tasks.discard(task)
+
+    async def handle(self, reader, writer):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = []
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.append((name.strip().lower().encode(), value.strip().encode()))
+        path, _, query = request_line[1].partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.0',
+            'method': request_line[0], 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '', 'headers': headers,
+            'client': writer.get_extra_info('peername'), 'server': ('127.0.0.1', self.port),
+        }
+
+        disconnected = asyncio.Event()
+        sent_request = False
+
+        async def receive():
+            nonlocal sent_request
+            if not sent_request:
+                sent_request = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Django listens for the client going away while the view runs
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                writer.write(f"HTTP/1.0 {message['status']} OK\r\n".encode())
+                for name, value in message.get('headers', []):
+                    writer.write(name + b': ' + value + b'\r\n')
+                writer.write(b'Connection: close\r\n\r\n')
+            elif message['type'] == 'http.response.body':
+                writer.write(message.get('body', b''))
+                await writer.drain()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            disconnected.set()
+            writer.close()
+
+
+@contextmanager
+def serve(mode):
+    """Run a WSGI or ASGI server on a free loopback port, yielding the port"""
+    if mode == 'wsgi':
+        httpd = make_server('127.0.0.1', 0, WSGIHandler(),
+                            server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        try:
+            yield httpd.server_port
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+    else:
+        server = ASGIServer(ASGIHandler())
+        server.start()
+        try:
+            yield server.port
+        finally:
+            server.stop()
+
+
+def public_routes():
+    """
+    {name: path} for every route in main/urls.py, with arguments taken from
+    the data. A new route needs an entry here before it can be benchmarked.
+    """
+    tech = Technology.objects.filter(projects__isnull=False).order_by('name').values_list('slug', flat=True).first()
+    _, cursor = project_page()
+    title = Project.objects.order_by('-created_date', '-id').values_list('title', flat=True).first() or 'project'
+    routes = {
+        'home': reverse('home'),
+        'about': reverse('about'),
+        'projects': reverse('projects'),
+        'projects_by_tech': reverse('projects_by_tech', args=[tech]) if tech else None,
+        'projects_fragment': reverse('projects_fragment', args=[cursor]) if cursor else None,
+        'skills': reverse('skills'),
+        'search': reverse('search') + '?q=' + title.split()[0].lower(),
+        'contact': reverse('contact'),
+    }
+    missing = {pattern.name for pattern in urls.urlpatterns} - set(routes)
+    if missing:
+        raise LookupError(f"No benchmark path for route(s): {', '.join(sorted(missing))}")
+    return {name: path for name, path in routes.items() if path}
+
+
+def admin_routes(site=admin.site):
+    """{name: path} for the admin index, analytics page and main's changelists"""
+    routes = {
+        'admin:index': reverse(f'{site.name}:index'),
+        'admin:analytics': reverse(f'{site.name}:analytics'),
+    }
+    for model in site._registry:
+        if model._meta.app_label == 'main':
+            name = f'{site.name}:main_{model._meta.model_name}_changelist'
+            routes[name] = reverse(name)
+    return routes
+
+
+@contextmanager
+def count_queries():
+    """Count the queries run on any database connection of this thread"""
+    counter = {'queries': 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counter['queries'] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        # A test mirror is the same connection object under another alias
+        for connection in {id(connections[alias]): connections[alias] for alias in connections}.values():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield counter
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(latencies, **extra):
+    return {
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        **extra,
+    }
+
+
+def fetch(client, path):
+    response = client.get(path)
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} returned {response.status_code}")
+    # Streamed pages render while the body is read
+    return response.getvalue()
+
+
+def measure_client(client, routes, repeat, cold=False):
+    results = {}
+    for name, path in routes.items():
+        fetch(client, path)  # warm the page cache, snapshot and template loaders
+        latencies = []
+        for _ in range(repeat):
+            if cold:
+                bump_content_version()
+            start = time.perf_counter()
+            fetch(client, path)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        # Counted and traced on requests of their own so neither slows the
+        # timings; the median peak ignores a request that also happened to
+        # flush metrics or page views
+        queries, peaks = 0, []
+        for _ in range(TRACED_REQUESTS):
+            if cold:
+                bump_content_version()
+            tracemalloc.start()
+            try:
+                with count_queries() as counter:
+                    fetch(client, path)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+            queries = max(queries, counter['queries'])
+        results[name] = summarize(latencies, queries=queries, peak_kib=round(statistics.median(peaks) / 1024))
+    return results
+
+
+def measure_server(mode, routes, repeat, cookie=''):
+    headers = {'Host': 'localhost'}
+    if cookie:
+        headers['Cookie'] = cookie
+    results = {}
+    with serve(mode) as port:
+        for name, path in routes.items():
+            latencies = []
+            for attempt in range(repeat + 1):
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+                start = time.perf_counter()
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                elapsed = (time.perf_counter() - start) * 1000
+                connection.close()
+                if response.status != 200:
+                    raise RuntimeError(f"{path} returned {response.status} under {mode}")
+                if attempt:  # the first request warms up
+                    latencies.append(elapsed)
+            results[name] = summarize(latencies)
+    return results
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline, thresholds=DEFAULT_THRESHOLDS):
+    """Messages for every metric that regressed past its threshold"""
+    failures = []
+    for mode, routes in results.items():
+        for name, current in routes.items():
+            before = baseline.get(mode, {}).get(name)
+            if before is None:
+                continue
+            for metric, threshold in (('p50_ms', 'latency'), ('p95_ms', 'tail_latency')):
+                limit = before[metric] * (1 + thresholds[threshold]) + thresholds['latency_slack_ms']
+                if current[metric] > limit:
+                    failures.append(f"{mode} {name} {metric}: {current[metric]:.2f} > {limit:.2f} "
+                                    f"(baseline {before[metric]:.2f})")
+            if 'queries' in current and 'queries' in before:
+                limit = before['queries'] + thresholds['queries']
+                if current['queries'] > limit:
+                    failures.append(f"{mode} {name} queries: {current['queries']} > {limit}")
+            if 'peak_kib' in current and 'peak_kib' in before:
+                limit = before['peak_kib'] * (1 + thresholds['memory']) + thresholds['memory_slack_kib']
+                if current['peak_kib'] > limit:
+                    failures.append(f"{mode} {name} peak_kib: {current['peak_kib']} > {limit:.0f} "
+                                    f"(baseline {before['peak_kib']})")
+    return failures
@@ -0,0 +1,236 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+
+
+CONTENT_VERSION_KEY = 'portfolio:content-version'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PORTFOLIO_CACHE_ALIAS', 'default')]
+
+
+_seen_state = None
+_checked_at = None
+_check_lock = threading.Lock()
+
+
+def check_due():
+    """Whether this process should compare the content with the database again"""
+    global _checked_at
+    interval = getattr(settings, 'PORTFOLIO_CONTENT_CHECK_INTERVAL', 5)
+    # Inside a transaction the check could see its own uncommitted writes
+    if interval is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return False
+    now = time.monotonic()
+    with _check_lock:
+        if _checked_at is not None and now - _checked_at < interval:
+            return False
+        _checked_at = now
+    return True
+
+
+def check_content_state():
+    """
+    Bump the content version if the database changed since the last check.
+
+    Saves bump the version in the cache of the process that made them; with
+    a per-process cache (LocMem), other workers, a separate admin process or
+    a script would never see it. One MAX(updated_at)/COUNT(*) query every
+    PORTFOLIO_CONTENT_CHECK_INTERVAL seconds catches those edits.
+    """
+    global _seen_state
+    from .freshness import content_state
+
+    state = content_state()
+    if _seen_state is not None and state != _seen_state:
+        bump_content_version()
+    _seen_state = state
+
+
+def get_content_version():
+    """Return the current content version, starting at 1 on a cold cache"""
+    if check_due():
+        check_content_state()
+    cache = get_cache()
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        # add() is a no-op if another process set the key in the meantime
+        cache.add(CONTENT_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CONTENT_VERSION_KEY, 1)
+    return version
+
+
+# In-process backends never block; their a*() methods would only add a
+# hand-off to the single thread-sensitive executor for every call
+NON_BLOCKING_CACHES = (LocMemCache, DummyCache)
+
+
+async def acache_get(cache, key, default=None):
+    if isinstance(cache, NON_BLOCKING_CACHES):
+        return cache.get(key, default)
+    return await cache.aget(key, default)
+
+
+async def acache_set(cache, key, value, timeout):
+    if isinstance(cache, NON_BLOCKING_CACHES):
+        return cache.set(key, value, timeout)
+    return await cache.aset(key, value, timeout)
+
+
+async def aget_content_version():
+    if check_due():
+        await sync_to_async(check_content_state)()
+    cache = get_cache()
+    version = await acache_get(cache, CONTENT_VERSION_KEY)
+    if version is None:
+        if isinstance(cache, NON_BLOCKING_CACHES):
+            cache.add(CONTENT_VERSION_KEY, 1, timeout=None)
+        else:
+            await cache.aadd(CONTENT_VERSION_KEY, 1, timeout=None)
+        version = await acache_get(cache, CONTENT_VERSION_KEY, 1)
+    return version
+
+
+def bump_content_version():
+    """Invalidate every cached page by moving to a new content version"""
+    cache = get_cache()
+    try:
+        return cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        # Key missing (cold or evicted cache): any new value is a fresh version
+        cache.add(CONTENT_VERSION_KEY, 1, timeout=None)
+        return cache.incr(CONTENT_VERSION_KEY)
+
+
+def page_cache_key(request, version=None):
+    """
+    Key of a cached page: the content version covers data edits, the release
+    token a deploy that changes templates or hashed asset URLs.
+    """
+    from .freshness import release_token
+
+    if version is None:
+        version = get_content_version()
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'portfolio:page:{version}:{release_token()}:{path}'
+
+
+def fragment_cache_key(obj, *variant, assets=''):
+    """
+    Key of one object's rendered card. It moves with the object's updated_at,
+    so an edit re-renders that card only, while every page rendering the same
+    card and variant shares the entry. `assets` is anything else the markup
+    depends on, such as the icon sprite build; the release token covers
+    template and static asset changes from a deploy.
+    """
+    from .freshness import release_token
+
+    label = obj._meta.label_lower
+    version = obj.updated_at.isoformat() if obj.updated_at else ''
+    digest = hashlib.md5(f'{version}:{release_token()}:{assets}:{variant!r}'.encode()).hexdigest()
+    return f'portfolio:card:{label}:{obj.pk}:{digest}'
+
+
+def page_cache_timeout(request):
+    """Seconds to cache this request's page for, or None to bypass the cache"""
+    timeout = getattr(settings, 'PORTFOLIO_PAGE_CACHE_TIMEOUT', 60 * 60)
+    if request.method not in ('GET', 'HEAD') or not timeout:
+        return None
+    return timeout
+
+
+def cached_response(cached):
+    content, content_type, status = cached
+    return HttpResponse(content, content_type=content_type, status=status)
+
+
+def cacheable(response):
+    return response.status_code == 200 and not response.cookies
+
+
+def cache_public_page(view_func):
+    """
+    Cache the rendered response of a public, read-only view.
+
+    Keys embed the content version, so editing any portfolio model in the
+    admin orphans all cached pages at once; stale entries simply expire.
+    A warm hit costs one cache read for the version and one for the page.
+    Works on sync and async views alike.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            timeout = page_cache_timeout(request)
+            if timeout is None:
+                return await view_func(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = page_cache_key(request, await aget_content_version())
+            cached = await acache_get(cache, key)
+            if cached is not None:
+                return cached_response(cached)
+
+            response = await view_func(request, *args, **kwargs)
+            if not cacheable(response):
+                return response
+            entry = (response['Content-Type'], response.status_code)
+            if response.streaming:
+                collect = acollect_stream if response.is_async else collect_stream
+                response.streaming_content = collect(response.streaming_content, cache, key, entry, timeout)
+            else:
+                await acache_set(cache, key, (response.content, *entry), timeout)
+            return response
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        timeout = page_cache_timeout(request)
+        if timeout is None:
+            return view_func(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached_response(cached)
+
+        response = view_func(request, *args, **kwargs)
+        if not cacheable(response):
+            return response
+        entry = (response['Content-Type'], response.status_code)
+        if response.streaming:
+            collect = acollect_stream if response.is_async else collect_stream
+            response.streaming_content = collect(response.streaming_content, cache, key, entry, timeout)
+        else:
+            cache.set(key, (response.content, *entry), timeout)
+        return response
+    return wrapper
+
+
+def collect_stream(chunks, cache, key, entry, timeout):
+    """Pass a streamed page through, caching it once it has been sent in full"""
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    cache.set(key, (b''.join(content), *entry), timeout)
+
+
+async def acollect_stream(chunks, cache, key, entry, timeout):
+    content = []
+    async for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    await acache_set(cache, key, (b''.join(content), *entry), timeout)
@@ -0,0 +1,193 @@
+"""Admin changelist pieces that stay fast on tables with millions of rows."""
+import calendar
+import datetime
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .pagination import pack_cursor, unpack_cursor
+
+
+# Query parameter holding a keyset position, hidden from ChangeList
+CURSOR_VAR = 'before'
+
+
+def estimate_count(queryset):
+    """Approximate row count without a full scan, or None if there is no cheap estimate"""
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    if not queryset.query.has_filters():
+        # Both ends of the primary key index; deleted rows make this an overestimate
+        pks = queryset.order_by().values_list('pk', flat=True)
+        first, last = pks.order_by('pk').first(), pks.order_by('-pk').first()
+        if first is not None:
+            return last - first + 1
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts exactly up to `threshold` rows and estimates beyond that.
+
+    Numbered pages stop at the exact count, which bounds every OFFSET; the
+    rest of a long list is reached through KeysetChangeList's older links.
+    """
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        capped = self.object_list[:self.threshold + 1].count()
+        self.truncated = capped > self.threshold
+        return min(capped, self.threshold)
+
+    @cached_property
+    def estimate(self):
+        """Approximate total for a truncated count, None if exact or unknown"""
+        if not self.count or not self.truncated:
+            return None
+        estimate = estimate_count(self.object_list)
+        return estimate if estimate and estimate > self.threshold else None
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist that pages past the paginator's exact count by seeking on
+    (`keyset_field`, id) instead of using OFFSET.
+
+    Only the default newest-first ordering can be seeked; sorting by a
+    column falls back to plain numbered pages.
+    """
+    keyset_field = 'created_at'
+
+    def __init__(self, request, *args, **kwargs):
+        cursor = request.GET.get(CURSOR_VAR)
+        if cursor is not None:
+            # ChangeList treats unknown parameters as field lookups
+            request.GET = request.GET.copy()
+            del request.GET[CURSOR_VAR]
+        self.position = unpack_cursor(cursor, datetime.datetime.fromisoformat)
+        self.older_url = self.newest_url = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_results(self, request):
+        super().get_results(request)
+        if ORDER_VAR in self.params or self.show_all:
+            return
+        if self.position is not None:
+            field = self.keyset_field
+            rows = list(self.queryset.filter(
+                Q(**{f'{field}__lt': self.position['d']})
+                | Q(**{field: self.position['d'], 'pk__lt': self.position['id']})
+            )[:self.list_per_page + 1])
+            has_more = len(rows) > self.list_per_page
+            self.result_list = rows[:self.list_per_page]
+            self.multi_page, self.can_show_all = True, False
+            self.newest_url = self.get_query_string(remove=[PAGE_VAR])
+        elif getattr(self.paginator, 'truncated', False) and self.page_num == self.paginator.num_pages:
+            self.result_list = list(self.result_list)
+            has_more = True
+        else:
+            return
+        if has_more and self.result_list:
+            last = self.result_list[-1]
+            cursor = pack_cursor({'d': getattr(last, self.keyset_field).isoformat(), 'id': last.pk})
+            self.older_url = self.get_query_string({CURSOR_VAR: cursor}, [PAGE_VAR])
+
+
+class DateDrillDownFilter(admin.SimpleListFilter):
+    """
+    Year and month filter for `field_name`, a cheaper date_hierarchy.
+
+    The choices come from the oldest and newest values (one index lookup
+    each) rather than a DISTINCT over the whole table, and selections are
+    plain ranges the same index can answer.
+    """
+    field_name = None
+
+    def bounds(self, request, model_admin):
+        values = model_admin.get_queryset(request).order_by().values_list(self.field_name, flat=True)
+        oldest = values.order_by(self.field_name).first()
+        if oldest is None:
+            return None
+        newest = values.order_by(f'-{self.field_name}').first()
+        if settings.USE_TZ:
+            oldest, newest = timezone.localtime(oldest), timezone.localtime(newest)
+        return oldest.date(), newest.date()
+
+    def parsed_value(self):
+        try:
+            parts = [int(part) for part in (self.value() or '').split('-')]
+            datetime.date(parts[0], parts[1] if len(parts) > 1 else 1, 1)
+        except (ValueError, IndexError):
+            return None
+        return parts[:2]
+
+    def lookups(self, request, model_admin):
+        bounds = self.bounds(request, model_admin)
+        if bounds is None:
+            return []
+        oldest, newest = bounds
+        selected = self.parsed_value()
+        choices = []
+        for year in range(newest.year, oldest.year - 1, -1):
+            choices.append((str(year), str(year)))
+            if selected and selected[0] == year:
+                choices.extend(
+                    (f'{year}-{month:02d}', f'{calendar.month_name[month]} {year}')
+                    for month in range(12, 0, -1)
+                    if (oldest.year, oldest.month) <= (year, month) <= (newest.year, newest.month)
+                )
+        return choices
+
+    def queryset(self, request, queryset):
+        selected = self.parsed_value()
+        if not selected:
+            return None
+        if len(selected) == 1:
+            start, end = datetime.datetime(selected[0], 1, 1), datetime.datetime(selected[0] + 1, 1, 1)
+        else:
+            year, month = selected
+            start = datetime.datetime(year, month, 1)
+            end = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+        if settings.USE_TZ:
+            start, end = timezone.make_aware(start), timezone.make_aware(end)
+        return queryset.filter(**{f'{self.field_name}__gte': start, f'{self.field_name}__lt': end})
+
+
+def update_in_batches(queryset, batch_size=1000, after_batch=None, **values):
+    """
+    UPDATE the rows of `queryset` one batch of primary keys at a time.
+
+    Only primary keys are read and each batch commits on its own, so an
+    action over a huge filtered selection never holds the write lock, or
+    every row, for the whole run. `after_batch` is called with each batch's
+    row count inside its transaction. Returns the number of rows updated.
+    """
+    model = queryset.model
+    queryset = queryset.order_by('-pk')
+    updated, last = 0, None
+    while True:
+        batch = queryset if last is None else queryset.filter(pk__lt=last)
+        ids = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return updated
+        with transaction.atomic(using=router.db_for_write(model)):
+            count = model._base_manager.filter(pk__in=ids).update(**values)
+            if after_batch is not None:
+                after_batch(count)
+        updated += count
+        last = ids[-1]
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.checks import Error
+
+# Backends whose entries only the process holding them can see
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """
+    A public-only process (portfolio/settings_public.py) serves pages cached
+    under the content version that the separate admin process bumps, so the
+    two must share a cache.
+    """
+    if not getattr(settings, 'PORTFOLIO_PUBLIC_ONLY', False):
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f"{backend} is local to each process, so admin edits won't reach the public pages.",
+        hint="Use a shared cache backend; setting PORTFOLIO_CACHE_DIR selects a file-based one.",
+        obj='CACHES',
+        id='main.E001',
+    )]
+
+
+def check_vendored_assets(app_configs, **kwargs):
+    """Every CDN asset the templates use must have its vendored copy committed"""
+    from .assets import missing_assets
+
+    missing = missing_assets()
+    if not missing:
+        return []
+    return [Error(
+        f"Vendored assets missing from static/vendor/: {', '.join(missing)}.",
+        hint="Run `manage.py build_assets --fetch` once with network access and commit static/vendor/.",
+        id='main.E002',
+    )]
@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from .snapshot import get_snapshot
+
+
+def portfolio(request):
+    """
+    Expose the content snapshot to every template.
+
+    Both values are lazy so admin pages, which never use them, don't pay
+    for a snapshot load.
+    """
+    # Async views load the snapshot up front: rendering can't touch the ORM
+    snapshot = getattr(request, 'portfolio_snapshot', None) or SimpleLazyObject(get_snapshot)
+    return {
+        'portfolio': snapshot,
+        'profile': SimpleLazyObject(lambda: snapshot.profile),
+    }
@@ -0,0 +1,161 @@
+"""
+Counter-cached totals for the admin dashboard.
+
+Model signals and the bulk admin actions adjust DashboardCounter rows in
+the same transaction as the change they count, so the dashboard reads every
+number with one query on a tiny table. Writes that bypass signals
+(queryset.update(), bulk_create(), raw SQL) are corrected by
+`python manage.py reconcile_counters`.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Certification, Contact, DashboardCounter, Project, Skill
+
+
+# Counter name -> (model, field values a row must have to be counted)
+TOTALS = {
+    'projects': (Project, {}),
+    'featured_projects': (Project, {'is_featured': True}),
+    'skills': (Skill, {}),
+    'unread_contacts': (Contact, {'is_read': False}),
+    'certifications': (Certification, {}),
+}
+
+# New messages per day, one counter per local date
+TREND_PREFIX = 'new_contacts:'
+TREND_DAYS = 14
+
+
+def counted_models():
+    return {model for model, _ in TOTALS.values()}
+
+
+def trend_name(day):
+    return f'{TREND_PREFIX}{day.isoformat()}'
+
+
+def trend_days(days, today=None):
+    today = today or timezone.localdate()
+    return [today - datetime.timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+
+
+def count_total(name):
+    model, conditions = TOTALS[name]
+    # IN keeps boolean conditions an index equality on SQLite (see ReadStatusFilter)
+    lookups = {f'{field}__in': [value] for field, value in conditions.items()}
+    return model._default_manager.filter(**lookups).count()
+
+
+def matching(instance, values=None):
+    """Names of the totals `instance` counts towards, judged by `values` if given"""
+    names = set()
+    for name, (model, conditions) in TOTALS.items():
+        if not isinstance(instance, model):
+            continue
+        current = values or {field: getattr(instance, field) for field in conditions}
+        if all(current[field] == value for field, value in conditions.items()):
+            names.add(name)
+    return names
+
+
+def adjust(name, delta):
+    """Add `delta` to a counter, creating it on first use"""
+    if not delta:
+        return
+    if DashboardCounter.objects.filter(name=name).update(value=F('value') + delta):
+        return
+    # A total that was never stored is counted instead; the table already
+    # includes the change being recorded
+    value = count_total(name) if name in TOTALS else delta
+    try:
+        with transaction.atomic():
+            DashboardCounter.objects.create(name=name, value=value)
+    except IntegrityError:
+        # Another request created it first
+        DashboardCounter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def remember(instance):
+    """Before an existing row is saved, note which totals it counted towards"""
+    fields = {field for model, conditions in TOTALS.values() if isinstance(instance, model) for field in conditions}
+    if not fields or instance._state.adding:
+        return
+    previous = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+    instance._counted = matching(instance, previous) if previous else set()
+
+
+def record_save(instance, created):
+    now = matching(instance)
+    before = set() if created else getattr(instance, '_counted', now)
+    for name in now - before:
+        adjust(name, 1)
+    for name in before - now:
+        adjust(name, -1)
+    instance._counted = now
+    if created and isinstance(instance, Contact):
+        adjust(trend_name(timezone.localdate(instance.created_at)), 1)
+
+
+def record_delete(instance):
+    for name in matching(instance):
+        adjust(name, -1)
+    if isinstance(instance, Contact):
+        adjust(trend_name(timezone.localdate(instance.created_at)), -1)
+
+
+def set_counter(name, value):
+    DashboardCounter.objects.update_or_create(name=name, defaults={'value': value})
+    return value
+
+
+def dashboard_stats(days=TREND_DAYS):
+    """Current totals and the new-message trend, from one query"""
+    series = trend_days(days)
+    names = [*TOTALS, *(trend_name(day) for day in series)]
+    values = dict(DashboardCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    for name in TOTALS:
+        if name not in values:
+            # First visit since the counters were added
+            values[name] = set_counter(name, count_total(name))
+    return {
+        'totals': {name: values[name] for name in TOTALS},
+        'trend': [(day, values.get(trend_name(day), 0)) for day in series],
+    }
+
+
+def reconcile(days=90):
+    """
+    Recount every total and the last `days` of the trend.
+
+    Returns {name: (stored, actual)} for the counters that had drifted.
+    """
+    series = trend_days(days)
+    start = datetime.datetime.combine(series[0], datetime.time.min)
+    if settings.USE_TZ:
+        start = timezone.make_aware(start)
+    drift = {}
+    with transaction.atomic():
+        stored = dict(
+            DashboardCounter.objects.select_for_update()
+            .filter(name__in=[*TOTALS, *(trend_name(day) for day in series)])
+            .values_list('name', 'value')
+        )
+        actual = {name: count_total(name) for name in TOTALS}
+        daily = dict(
+            Contact.objects.filter(created_at__gte=start)
+            .annotate(day=TruncDate('created_at'))
+            .values('day').annotate(count=Count('id'))
+            .values_list('day', 'count').order_by()
+        )
+        actual.update({trend_name(day): daily.get(day, 0) for day in series})
+        for name, value in actual.items():
+            if stored.get(name) != value and (value or name in stored):
+                drift[name] = (stored.get(name), value)
+                set_counter(name, value)
+    return drift
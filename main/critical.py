@@ -0,0 +1,226 @@
+"""
+Above-the-fold ("critical") CSS per page template.
+
+There is no browser here, so the fold is approximated from the markup: the
+navigation plus the first FOLD_SECTIONS <section> elements of the page.
+Every rule from the site stylesheets whose selectors could match an element
+in that region is kept; the rest arrive with the full stylesheets, which
+base.html then loads without blocking render.
+"""
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.test import Client
+from django.urls import reverse
+
+from .assets import VENDOR_ASSETS
+
+
+# Template -> URL name of a page rendered from it
+CRITICAL_PAGES = {
+    'index.html': 'home',
+    'about.html': 'about',
+    'projects.html': 'projects',
+    'skills.html': 'skills',
+    'contact.html': 'contact',
+}
+
+FOLD_SECTIONS = 2
+
+# Stylesheets in the order base.html links them
+STYLESHEETS = (
+    VENDOR_ASSETS['bootstrap-css'].path,
+    VENDOR_ASSETS['poppins-css'].path,
+    VENDOR_ASSETS['aos-css'].path,
+    'css/style.css',
+)
+
+# Classes scripts add after load: AOS, Typed.js, Bootstrap's navbar collapse
+RUNTIME_CLASSES = {'aos-init', 'aos-animate', 'typed-cursor', 'show', 'collapsing'}
+
+ALWAYS_TAGS = {'html', 'body', '*'}
+
+
+class FoldCollector(HTMLParser):
+    """Tags, classes and ids used from <body> up to the fold"""
+
+    def __init__(self, sections=FOLD_SECTIONS):
+        super().__init__()
+        self.sections = sections
+        self.in_body = False
+        self.done = False
+        self.tags, self.classes, self.ids = set(ALWAYS_TAGS), set(RUNTIME_CLASSES), set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.in_body = True
+        if not self.in_body or self.done:
+            return
+        if tag == 'section':
+            if self.sections == 0:
+                self.done = True
+                return
+            self.sections -= 1
+        attrs = dict(attrs)
+        self.tags.add(tag)
+        self.classes.update((attrs.get('class') or '').split())
+        if attrs.get('id'):
+            self.ids.add(attrs['id'])
+
+
+def fold_selectors(html):
+    collector = FoldCollector()
+    collector.feed(html)
+    return collector.tags, collector.classes, collector.ids
+
+
+def split_rules(css):
+    """Top-level (prelude, block) pairs; statement at-rules get block None"""
+    rules, depth, start, prelude = [], 0, 0, None
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude, start = css[start:i].strip(), i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:i]))
+                start = i + 1
+        elif char == ';' and depth == 0:
+            rules.append((css[start:i].strip(), None))
+            start = i + 1
+    return rules
+
+
+def split_selectors(prelude):
+    parts, depth, current = [], 0, ''
+    for char in prelude:
+        depth += char == '('
+        depth -= char == ')'
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    parts.append(current.strip())
+    return parts
+
+
+PSEUDO = re.compile(r'::?[\w-]+(\((?:[^()]|\([^()]*\))*\))?')
+ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+COMPOUND = re.compile(r'^([a-zA-Z][\w-]*|\*)?((?:[.#][\w\\:-]+)*)$')
+
+
+def selector_matches(selector, tags, classes, ids):
+    simplified = ATTRIBUTE.sub('', PSEUDO.sub('', selector))
+    for compound in re.split(r'\s*[>+~]\s*|\s+', simplified.strip()):
+        if not compound:
+            continue
+        match = COMPOUND.match(compound)
+        if not match:
+            return False
+        tag, rest = match.groups()
+        if tag and tag.lower() not in tags and tag != '*':
+            return False
+        for kind, name in re.findall(r'([.#])((?:\\.|[\w-])+)', rest):
+            name = name.replace('\\', '')
+            if name not in (classes if kind == '.' else ids):
+                return False
+    return True
+
+
+def critical_rules(css, tags, classes, ids):
+    """The subset of `css` that applies to the given elements"""
+    out = []
+    for prelude, block in split_rules(css):
+        if block is None:
+            continue
+        if prelude.startswith('@'):
+            name = prelude.split()[0].lower()
+            if name in ('@media', '@supports'):
+                inner = critical_rules(block, tags, classes, ids)
+                if inner:
+                    out.append(f'{prelude}{{{inner}}}')
+            elif name == '@font-face':
+                out.append(f'{prelude}{{{block.strip()}}}')
+            # @keyframes and the rest can wait for the full stylesheet
+            continue
+        selectors = [s for s in split_selectors(prelude) if selector_matches(s, tags, classes, ids)]
+        if selectors:
+            out.append(f'{",".join(selectors)}{{{block.strip()}}}')
+    return ''.join(out)
+
+
+def minify(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', css).strip()
+
+
+def missing_stylesheets():
+    return [path for path in STYLESHEETS if not finders.find(path)]
+
+
+def stylesheet_sources():
+    """Minified text of each stylesheet"""
+    return [minify(Path(finders.find(path)).read_text(encoding='utf-8')) for path in STYLESHEETS]
+
+
+def critical_dir():
+    return Path(settings.BUILD_DIR) / 'critical'
+
+
+def artifact_path(template_name):
+    return critical_dir() / (Path(template_name).stem + '.css')
+
+
+def extract(html, sources):
+    tags, classes, ids = fold_selectors(html)
+    return ''.join(critical_rules(css, tags, classes, ids) for css in sources)
+
+
+def build_critical_css(templates=None, client=None):
+    """
+    Render each page and write its critical CSS to BUILD_DIR/critical/.
+    Returns {template name: size in bytes}.
+    """
+    client = client or Client()
+    sources = stylesheet_sources()
+    critical_dir().mkdir(parents=True, exist_ok=True)
+
+    sizes = {}
+    for template_name in templates or CRITICAL_PAGES:
+        response = client.get(reverse(CRITICAL_PAGES[template_name]), HTTP_HOST='localhost')
+        if response.status_code != 200:
+            raise RuntimeError(f"{template_name} rendered with status {response.status_code}")
+        # The public pages stream their <head> ahead of the body
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        css = extract(body.decode(response.charset or 'utf-8'), sources)
+        artifact_path(template_name).write_text(css, encoding='utf-8')
+        sizes[template_name] = len(css.encode())
+    load_critical_css.cache_clear()
+    return sizes
+
+
+@lru_cache(maxsize=None)
+def load_critical_css(template_name, mtime=None):
+    try:
+        return artifact_path(template_name).read_text(encoding='utf-8')
+    except OSError:
+        return None
+
+
+def critical_css_for(template_name):
+    """Critical CSS built for this template, or None; reread when rebuilt"""
+    if not template_name or template_name not in CRITICAL_PAGES:
+        return None
+    try:
+        mtime = artifact_path(template_name).stat().st_mtime_ns
+    except OSError:
+        return None
+    return load_critical_css(template_name, mtime)
@@ -0,0 +1,270 @@
+"""
+Static export of the public site.
+
+Every read-only page is rendered through the test client into
+`<output>/<path>/index.html`. Infinite-scroll fragments are followed from
+each project listing, and the collected static files and media (variants
+included) are copied alongside, so a plain file server can take the
+public traffic. /contact/ and /search/ need a live request and are left to
+Django; route those paths to it.
+
+Each exported URL records the ETag of its page (see main.freshness), and an
+incremental export re-renders only the URLs whose ETag moved.
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import reverse
+
+from .freshness import page_etag
+from .images import _init_worker
+from .models import Technology
+
+
+NEXT_FRAGMENT = re.compile(r'data-next="([^"]+)"')
+
+
+def export_root():
+    return Path(settings.STATIC_EXPORT_DIR)
+
+
+def _sidecar(root, suffix):
+    # Kept next to the output, where the file server cannot see them
+    return root.parent / f'.{root.name}.{suffix}'
+
+
+def export_targets():
+    """(page, path) of every URL rendered directly; fragments hang off listings"""
+    targets = [
+        ('home', reverse('home')),
+        ('about', reverse('about')),
+        ('projects', reverse('projects')),
+        ('skills', reverse('skills')),
+    ]
+    slugs = Technology.objects.filter(projects__isnull=False).distinct().values_list('slug', flat=True)
+    targets.extend(('projects', reverse('projects_by_tech', args=[slug])) for slug in slugs)
+    return targets
+
+
+def output_file(root, path):
+    return root / path.strip('/') / 'index.html'
+
+
+def fetch(client, path):
+    response = client.get(path, HTTP_HOST='localhost')
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} returned {response.status_code}")
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+def write(root, path, content):
+    target = output_file(root, path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix('.tmp')
+    tmp.write_bytes(content)
+    os.replace(tmp, target)
+    return str(target.relative_to(root))
+
+
+def render_target(page, path, root):
+    """Write one page (and its fragment chain); return the files written"""
+    root = Path(root)
+    client = Client()
+    content = fetch(client, path)
+    files = [write(root, path, content)]
+
+    # Fragments are JSON; fetch() in main.js does not mind the file name
+    match = NEXT_FRAGMENT.search(content.decode())
+    next_url = match and match.group(1)
+    while next_url:
+        content = fetch(client, next_url)
+        files.append(write(root, next_url, content))
+        next_url = json.loads(content)['next_url']
+    return files
+
+
+def sync_tree(source, target):
+    """Mirror a directory by size and mtime; return (copied, removed)"""
+    source, target = Path(source), Path(target)
+    copied = removed = 0
+    wanted = set()
+    if source.is_dir():
+        for path in source.rglob('*'):
+            if not path.is_file():
+                continue
+            relative = path.relative_to(source)
+            wanted.add(relative)
+            dest = target / relative
+            stat = path.stat()
+            if dest.exists() and dest.stat().st_size == stat.st_size and dest.stat().st_mtime >= stat.st_mtime:
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, dest)
+            copied += 1
+    if target.is_dir():
+        for path in target.rglob('*'):
+            if path.is_file() and path.relative_to(target) not in wanted:
+                path.unlink()
+                removed += 1
+    return copied, removed
+
+
+def load_state(root):
+    try:
+        return json.loads(_sidecar(root, 'export.json').read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(root, state):
+    _sidecar(root, 'export.json').write_text(json.dumps(state, indent=1, sort_keys=True))
+
+
+def export_site(root=None, incremental=False, workers=None, progress=None):
+    """
+    Export the site into `root`. Returns a summary dict of rendered,
+    skipped and removed pages and copied static/media files.
+    """
+    root = Path(root or export_root())
+    root.mkdir(parents=True, exist_ok=True)
+    state = load_state(root) if incremental else {}
+    etags = {}
+
+    todo = []
+    for page, path in export_targets():
+        etag = etags.get(page) or etags.setdefault(page, page_etag(page))
+        entry = state.get(path)
+        if entry and entry['etag'] == etag and all((root / f).exists() for f in entry['files']):
+            continue
+        todo.append((page, path, etag))
+
+    # Forked workers must not share the parent's database connections
+    connections.close_all()
+    new_state = {path: entry for path, entry in state.items() if path not in {p for _, p, _ in todo}}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [(path, etag, pool.submit(render_target, page, path, str(root))) for page, path, etag in todo]
+        for path, etag, future in futures:
+            new_state[path] = {'etag': etag, 'files': future.result()}
+            if progress:
+                progress(path)
+
+    # Fragments of an earlier export whose cursors no longer exist, and
+    # listings for technologies that were removed
+    live_paths = {path for _, path in export_targets()}
+    kept = set()
+    for path in list(new_state):
+        if path not in live_paths:
+            del new_state[path]
+        else:
+            kept.update(new_state[path]['files'])
+    removed = 0
+    for entry in state.values():
+        for name in entry['files']:
+            path = root / name
+            if name not in kept and path.exists():
+                path.unlink()
+                removed += 1
+                # Drop the emptied <cursor>/ directories too
+                for parent in path.parents:
+                    if parent == root or any(parent.iterdir()):
+                        break
+                    parent.rmdir()
+    save_state(root, new_state)
+
+    static = sync_tree(settings.STATIC_ROOT, root / settings.STATIC_URL.strip('/'))
+    media = sync_tree(settings.MEDIA_ROOT, root / settings.MEDIA_URL.strip('/'))
+    return {
+        'rendered': len(todo),
+        'skipped': len(live_paths) - len(todo),
+        'removed': removed,
+        'static': static,
+        'media': media,
+    }
+
+
+@contextmanager
+def export_lock(root):
+    """Yield whether this process got the export lock (always, without fcntl)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield True
+        return
+    root.parent.mkdir(parents=True, exist_ok=True)
+    with open(_sidecar(root, 'lock'), 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def mark_pending(root):
+    root.parent.mkdir(parents=True, exist_ok=True)
+    _sidecar(root, 'pending').touch()
+
+
+def pop_pending(root):
+    try:
+        _sidecar(root, 'pending').unlink()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def export_while_pending(root=None, workers=None, progress=None):
+    """
+    Incremental exports until no save is waiting. Returns the number of
+    runs; 0 if another process holds the lock (it will pick the save up).
+    """
+    root = Path(root or export_root())
+    runs = 0
+    while True:
+        with export_lock(root) as acquired:
+            if not acquired:
+                return runs
+            pop_pending(root)
+            export_site(root, incremental=True, workers=workers, progress=progress)
+            runs += 1
+        # Checked after the lock is released: a save marked later spawns an
+        # exporter that finds the lock free
+        if not _sidecar(root, 'pending').exists():
+            return runs
+
+
+# Saves in one admin request fire several signals; one exporter covers them
+SPAWN_INTERVAL = 1.0
+_last_spawn = 0.0
+
+
+def _spawn_export():
+    global _last_spawn
+    mark_pending(export_root())
+    if time.monotonic() - _last_spawn < SPAWN_INTERVAL:
+        return
+    _last_spawn = time.monotonic()
+    subprocess.Popen(
+        [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), 'export_static_site', '--when-idle'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+
+
+def schedule_export():
+    """Re-export in the background after the current transaction, if enabled"""
+    if getattr(settings, 'STATIC_EXPORT_ON_SAVE', False):
+        transaction.on_commit(_spawn_export)
@@ -1,7 +1,22 @@
 from django import forms
 from .models import Contact
 
+
+class BootstrapBoundField(forms.BoundField):
+    """Marks inputs with errors as .is-invalid, which shows Bootstrap's .invalid-feedback"""
+
+    def build_widget_attrs(self, attrs, widget=None):
+        attrs = super().build_widget_attrs(attrs, widget)
+        if self.errors:
+            widget = widget or self.field.widget
+            attrs['class'] = f"{attrs.get('class', widget.attrs.get('class', ''))} is-invalid".strip()
+        return attrs
+
+
 class ContactForm(forms.ModelForm):
+    # Rendered by templates/partials/form_fields.html, no form library needed
+    bound_field_class = BootstrapBoundField
+
     class Meta:
         model = Contact
         fields = ['name', 'email', 'subject', 'message']
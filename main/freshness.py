@@ -0,0 +1,183 @@
+"""
+Conditional GET for the public pages.
+
+Each page declares the models it is built from. The validator is the
+latest `updated_at` and the row count of each of them, read in a single
+UNION ALL query; counts catch deletions, which leave no timestamp behind.
+A request whose If-None-Match still matches gets a 304 without the view, the
+page cache or the templates being touched. There is no Last-Modified: the
+latest timestamp goes backwards when the newest row is deleted, so a date
+can't tell a client its copy is stale. The state is cached under the
+content version, so warm requests stay query-free.
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+from functools import lru_cache, wraps
+from inspect import iscoroutinefunction
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connections
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
+
+from .cache import acache_get, acache_set, aget_content_version, get_cache, get_content_version
+from .models import (
+    Profile, Skill, Project, Experience,
+    Education, Certification, Testimonial, Technology
+)
+from .routers import read_alias
+
+
+# Models whose changes are visible on the public pages
+CONTENT_MODELS = (
+    Profile, Skill, Project, Experience,
+    Education, Certification, Testimonial, Technology,
+)
+
+# Every page renders base.html, whose footer shows the Profile
+PAGE_DEPENDENCIES = {
+    'home': (Profile, Project, Technology, Skill, Education, Certification, Testimonial),
+    'about': (Profile, Experience, Education, Certification),
+    'projects': (Profile, Project, Technology),
+    'projects_fragment': (Project, Technology),
+    'skills': (Profile, Skill),
+    'search': (Profile, Project, Experience, Education, Certification),
+}
+
+
+def dependency_state(models):
+    """[(latest updated_at, row count)] for each model, in one query"""
+    connection = connections[read_alias()]
+    quote = connection.ops.quote_name
+    sql = ' UNION ALL '.join(
+        f'SELECT MAX({quote("updated_at")}), COUNT(*) FROM {quote(model._meta.db_table)}'
+        for model in models
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+    return [(to_datetime(latest), count) for latest, count in rows]
+
+
+def content_state():
+    """dependency_state() of every content model"""
+    return dependency_state(CONTENT_MODELS)
+
+
+def to_datetime(value):
+    # SQLite hands back text from a raw aggregate; other backends a datetime
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value
+
+
+def _release_token():
+    """
+    Changes with each deploy: the static manifest (hashed asset URLs in the
+    HTML), the templates, and the built sprite and critical CSS.
+    """
+    parts = [getattr(staticfiles_storage, 'manifest_hash', '')]
+    paths = [settings.ICON_SPRITE_PATH, Path(settings.BUILD_DIR) / 'critical']
+    for engine in settings.TEMPLATES:
+        paths.extend(engine.get('DIRS', []))
+    for path in map(Path, paths):
+        if path.is_dir():
+            parts.extend(str(p.stat().st_mtime_ns) for p in sorted(path.rglob('*')) if p.is_file())
+        elif path.exists():
+            parts.append(str(path.stat().st_mtime_ns))
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+_cached_release_token = lru_cache(maxsize=None)(_release_token)
+
+
+def release_token():
+    # Template edits are picked up live while developing
+    return _release_token() if settings.DEBUG else _cached_release_token()
+
+
+def state_cache_key(page, version):
+    return f'portfolio:validators:{version}:{page}'
+
+
+def page_state(page):
+    timeout = getattr(settings, 'PORTFOLIO_PAGE_CACHE_TIMEOUT', 60 * 60)
+    if not timeout:
+        return dependency_state(PAGE_DEPENDENCIES[page])
+    cache = get_cache()
+    key = state_cache_key(page, get_content_version())
+    state = cache.get(key)
+    if state is None:
+        state = dependency_state(PAGE_DEPENDENCIES[page])
+        cache.set(key, state, timeout)
+    return state
+
+
+async def apage_state(page):
+    timeout = getattr(settings, 'PORTFOLIO_PAGE_CACHE_TIMEOUT', 60 * 60)
+    if not timeout:
+        return await sync_to_async(dependency_state)(PAGE_DEPENDENCIES[page])
+    cache = get_cache()
+    key = state_cache_key(page, await aget_content_version())
+    state = await acache_get(cache, key)
+    if state is None:
+        state = await sync_to_async(dependency_state)(PAGE_DEPENDENCIES[page])
+        await acache_set(cache, key, state, timeout)
+    return state
+
+
+def state_etag(page, state):
+    """ETag of a page at a dependency state"""
+    digest = hashlib.md5(repr((page, state, release_token())).encode())
+    return quote_etag(digest.hexdigest())
+
+
+def page_etag(page):
+    return state_etag(page, page_state(page))
+
+
+def finish_response(response, etag):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        # Browsers may keep the page but must ask before reusing it
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_page(page):
+    """
+    Answer conditional GET/HEAD requests for a public page from its
+    dependencies' state, and mark fresh responses for revalidation.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+
+                etag = state_etag(page, await apage_state(page))
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return finish_response(response, etag)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            etag = page_etag(page)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return finish_response(response, etag)
+        return wrapper
+    return decorator
@@ -0,0 +1,293 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import urllib.request
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db import connections, transaction
+from django.template.loaders.app_directories import get_app_template_dirs
+
+from .cache import bump_content_version
+from .models import Skill
+
+logger = logging.getLogger(__name__)
+
+
+FA_VERSION = '6.4.0'
+
+STYLE_PREFIXES = {
+    'fa': 'solid', 'fas': 'solid', 'fa-solid': 'solid',
+    'far': 'regular', 'fa-regular': 'regular',
+    'fab': 'brands', 'fa-brands': 'brands',
+}
+
+# Classes that size or animate an icon rather than name one
+MODIFIER = re.compile(
+    r'^fa-(?:\d+x|2xs|xs|sm|lg|xl|2xl|fw|spin|pulse|beat|fade|bounce|shake|border|inverse|'
+    r'pull-left|pull-right|pull-start|pull-end|ul|li|stack|stack-1x|stack-2x|'
+    r'rotate-\d+|flip|flip-horizontal|flip-vertical|flip-both)$'
+)
+
+ICON_TAG = re.compile(r'''{%\s*icon\s+["']([^"']+)["']''')
+CSS_ALIASES = re.compile(r'((?:\.fa-[a-z0-9-]+:(?:before|after),?)+)\{content:"([^"]+)"\}')
+SYMBOL = re.compile(r'<symbol id="([^"]+)" viewBox="([^"]+)">(.*?)</symbol>', re.S)
+SPRITE_ID = re.compile(r'<symbol id="([^"]+)"')
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+ET.register_namespace('', SVG_NS)
+
+# What a Skill's SVG icon may keep: static shapes and how they are
+# painted. Anything else (script, style, animate, set, use, a, image,
+# foreignObject, ...) goes with its subtree, and so does every other attribute.
+SVG_ELEMENTS = frozenset({
+    'g', 'defs', 'path', 'rect', 'circle', 'ellipse', 'line', 'polyline', 'polygon',
+    'linearGradient', 'radialGradient', 'stop', 'clipPath', 'mask',
+})
+SVG_ATTRIBUTES = frozenset({
+    'id', 'd', 'points', 'x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'rx', 'ry',
+    'fx', 'fy', 'width', 'height', 'offset', 'transform', 'opacity', 'visibility',
+    'fill', 'fill-opacity', 'fill-rule', 'clip-rule', 'clip-path', 'mask',
+    'stroke', 'stroke-width', 'stroke-opacity', 'stroke-linecap', 'stroke-linejoin',
+    'stroke-miterlimit', 'stroke-dasharray', 'stroke-dashoffset',
+    'stop-color', 'stop-opacity', 'gradientUnits', 'gradientTransform', 'spreadMethod',
+    'clipPathUnits', 'maskUnits', 'maskContentUnits',
+})
+# The only reference a kept attribute may hold: a fragment within the icon
+SVG_URL = re.compile(r'url\(\s*(?![\'"]?#)', re.I)
+
+
+def parse_icon(classes):
+    """'fab fa-github fa-lg' -> ('brands', 'github', ['fa-lg'])"""
+    style, name, rest = None, None, []
+    for token in classes.split():
+        if token in STYLE_PREFIXES:
+            style = STYLE_PREFIXES[token]
+        elif token.startswith('fa-') and not MODIFIER.match(token) and name is None:
+            name = token[3:]
+        else:
+            rest.append(token)
+    if name is None:
+        return None, None, rest
+    return style or 'solid', name, rest
+
+
+def symbol_id(style, name):
+    return f'fa-{style}-{name}'
+
+
+def svg_symbol_id(url):
+    return 'svg-' + hashlib.md5(url.encode()).hexdigest()[:10]
+
+
+def sprite_path():
+    return Path(settings.ICON_SPRITE_PATH)
+
+
+def template_dirs():
+    dirs = []
+    for engine in settings.TEMPLATES:
+        dirs.extend(engine.get('DIRS', []))
+    # Only our own app's templates; third-party admin themes ship their own icons
+    dirs.extend(d for d in get_app_template_dirs('templates') if Path(settings.BASE_DIR) in Path(d).parents)
+    return dirs
+
+
+def collect_icons():
+    """Every (style, name) referenced by the site templates or a Skill"""
+    classes = []
+    for directory in template_dirs():
+        for path in Path(directory).rglob('*.html'):
+            classes.extend(ICON_TAG.findall(path.read_text(encoding='utf-8')))
+    classes.extend(Skill.objects.filter(icon_type='fa').values_list('icon', flat=True))
+
+    icons = set()
+    for value in classes:
+        style, name, _ = parse_icon(value)
+        if name:
+            icons.add((style, name))
+    return icons
+
+
+@lru_cache(maxsize=None)
+def vendored_symbols(style):
+    path = finders.find(f'vendor/fontawesome/sprites/{style}.svg')
+    if not path:
+        return {}
+    content = Path(path).read_text(encoding='utf-8')
+    return {
+        name: (view_box, re.sub(r'<!--.*?-->|<title>.*?</title>', '', body, flags=re.S).strip())
+        for name, view_box, body in SYMBOL.findall(content)
+    }
+
+
+@lru_cache(maxsize=None)
+def aliases():
+    """Font Awesome 5 names (external-link-alt, ...) -> their 6.x names"""
+    path = finders.find('vendor/fontawesome/css/all.min.css')
+    if not path:
+        return {}
+    known = set(vendored_symbols('solid')) | set(vendored_symbols('regular')) | set(vendored_symbols('brands'))
+    mapping = {}
+    for selectors, _ in CSS_ALIASES.findall(Path(path).read_text(encoding='utf-8')):
+        names = re.findall(r'\.fa-([a-z0-9-]+):', selectors)
+        canonical = next((name for name in names if name in known), None)
+        if canonical:
+            mapping.update((name, canonical) for name in names)
+    return mapping
+
+
+def resolve_symbol(style, name):
+    symbols = vendored_symbols(style)
+    if name in symbols:
+        return symbols[name]
+    return symbols.get(aliases().get(name))
+
+
+def read_svg(url):
+    """Raw SVG for a Skill icon URL: a static file, or a remote download"""
+    static_prefix = '/' + settings.STATIC_URL.lstrip('/')
+    path = url if url.startswith('/') else '/' + url
+    if path.startswith(static_prefix):
+        found = finders.find(path[len(static_prefix):])
+        return Path(found).read_bytes() if found else None
+    if url.startswith(('http://', 'https://')):
+        try:
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return response.read(512 * 1024)
+        except OSError:
+            return None
+    return None
+
+
+def sanitize_svg(element):
+    """Strip an SVG tree, in place, down to SVG_ELEMENTS and SVG_ATTRIBUTES"""
+    for child in list(element):
+        namespace, _, tag = child.tag.rpartition('}')
+        if namespace.lstrip('{') != SVG_NS or tag not in SVG_ELEMENTS:
+            element.remove(child)
+        else:
+            sanitize_svg(child)
+    for attr, value in list(element.attrib.items()):
+        if attr not in SVG_ATTRIBUTES or SVG_URL.search(value):
+            del element.attrib[attr]
+
+
+def svg_to_symbol(content):
+    """(viewBox, inner markup) of an SVG document, reduced to plain shapes"""
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return None
+    view_box = root.get('viewBox')
+    if not view_box and root.get('width') and root.get('height'):
+        width, height = (re.sub(r'[^\d.]', '', root.get(attr)) for attr in ('width', 'height'))
+        view_box = f'0 0 {width} {height}'
+    if not view_box:
+        return None
+
+    sanitize_svg(root)
+    inner = ''.join(ET.tostring(child, encoding='unicode') for child in root)
+    return view_box, inner
+
+
+def build_sprite():
+    """
+    Write a sprite holding only the icons the site uses.
+
+    Returns (symbol count, names that could not be resolved). The sprite is
+    marked complete only if every Font Awesome icon was found, which is what
+    lets base.html drop the Font Awesome stylesheet and webfonts.
+    """
+    symbols, missing = [], []
+    for style, name in sorted(collect_icons()):
+        symbol = resolve_symbol(style, name)
+        if symbol:
+            symbols.append((symbol_id(style, name),) + symbol)
+        else:
+            missing.append(f'{style}/{name}')
+
+    for url in sorted(set(Skill.objects.filter(icon_type='svg').values_list('icon', flat=True))):
+        content = read_svg(url)
+        symbol = svg_to_symbol(content) if content else None
+        if symbol:
+            symbols.append((svg_symbol_id(url),) + symbol)
+
+    complete = 'true' if not missing else 'false'
+    parts = [
+        f'<svg xmlns="{SVG_NS}" style="display: none" data-complete="{complete}">',
+        f'<!-- Font Awesome Free {FA_VERSION} by @fontawesome - https://fontawesome.com '
+        f'License - https://fontawesome.com/license/free -->',
+    ]
+    parts.extend(
+        f'<symbol id="{sid}" viewBox="{view_box}">{body}</symbol>'
+        for sid, view_box, body in symbols
+    )
+    parts.append('</svg>')
+
+    path = sprite_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(''.join(parts), encoding='utf-8')
+    os.replace(tmp, path)
+    return len(symbols), missing
+
+
+_rebuild_lock = threading.Lock()
+
+
+def _rebuild():
+    try:
+        with _rebuild_lock:
+            count, missing = build_sprite()
+    except Exception:
+        logger.exception("Could not rebuild the icon sprite")
+        return
+    finally:
+        # A thread of its own, so its connection doesn't outlive the rebuild
+        connections.close_all()
+    if missing:
+        logger.warning("Icon sprite is missing %s", ', '.join(missing))
+    # Pages cached before the rebuild may reference symbols it lacked
+    bump_content_version()
+
+
+def schedule_sprite_rebuild():
+    """
+    Rebuild the sprite once the current transaction commits, if one was ever
+    built. The rebuild may download remote Skill icons, so it runs on a
+    thread of its own rather than in the admin request that saved the Skill.
+    """
+    if sprite_path().exists():
+        transaction.on_commit(
+            lambda: threading.Thread(target=_rebuild, name='icon-sprite').start()
+        )
+
+
+_loaded = (None, '', frozenset(), False)
+
+
+def sprite_version():
+    """Changes whenever the sprite is rebuilt; 0 until it has been built"""
+    try:
+        return sprite_path().stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def load_sprite():
+    """(markup, symbol ids, complete) of the built sprite, reread when it changes"""
+    global _loaded
+    try:
+        mtime = sprite_path().stat().st_mtime_ns
+    except OSError:
+        return '', frozenset(), False
+    if _loaded[0] != mtime:
+        markup = sprite_path().read_text(encoding='utf-8')
+        _loaded = (mtime, markup, frozenset(SPRITE_ID.findall(markup)), 'data-complete="true"' in markup)
+    return _loaded[1:]
@@ -0,0 +1,162 @@
+import logging
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.dispatch import Signal
+
+from .cache import bump_content_version
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (160, 320, 640, 960, 1280)
+
+# Sent with `name` once an upload's variants exist
+variants_built = Signal()
+
+# (extension, Pillow format, save options)
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def variant_widths():
+    return tuple(getattr(settings, 'IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS))
+
+
+def variant_name(name, width, ext):
+    """projects/shot.png -> variants/projects/shot-640w.webp"""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join('variants', directory, f'{stem}-{width}w.{ext}')
+
+
+def generate_variants(name, force=False, storage=None):
+    """
+    Write resized WebP and JPEG copies of a stored image.
+
+    Images are never upscaled: generation stops at the first configured
+    width that reaches the original's. Returns the widths for which files
+    were written, so [] when every variant already existed.
+    """
+    from PIL import Image, ImageOps
+
+    storage = storage or default_storage
+    widths = variant_widths()
+    if not force and all(storage.exists(variant_name(name, w, 'webp')) for w in widths):
+        return []
+
+    with storage.open(name, 'rb') as source:
+        original = Image.open(source)
+        original.load()
+    original = ImageOps.exif_transpose(original)
+
+    generated = []
+    for width in widths:
+        # The first width at or past the original gets an unscaled copy
+        target_width = min(width, original.width)
+        target_height = max(1, round(original.height * target_width / original.width))
+        resized, written = None, False
+        for ext, image_format, options in FORMATS:
+            target = variant_name(name, width, ext)
+            if storage.exists(target):
+                if not force:
+                    continue
+                storage.delete(target)
+            if resized is None:
+                resized = original.resize((target_width, target_height), Image.Resampling.LANCZOS)
+            image = resized
+            if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                image = image.convert('RGBA')
+            buffer = BytesIO()
+            image.save(buffer, image_format, **options)
+            storage.save(target, ContentFile(buffer.getvalue()))
+            written = True
+        if written:
+            generated.append(width)
+        if width >= original.width:
+            break
+    return generated
+
+
+def available_widths(name, storage=None):
+    storage = storage or default_storage
+    return [w for w in variant_widths() if storage.exists(variant_name(name, w, 'webp'))]
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def variants_ready(name):
+    # Cached pages and cards still point at the bare upload; re-render them
+    variants_built.send(sender=None, name=name)
+    transaction.on_commit(bump_content_version)
+
+
+def _report(name, exc, widths):
+    if exc is not None:
+        logger.warning("Could not build image variants for %s: %s", name, exc)
+    elif widths:
+        variants_ready(name)
+
+
+def _generate_logged(name):
+    try:
+        widths = generate_variants(name)
+    except Exception as exc:
+        _report(name, exc, None)
+    else:
+        _report(name, None, widths)
+
+
+def _finish(name, future):
+    try:
+        exc = future.exception()
+        _report(name, exc, None if exc else future.result())
+    finally:
+        # A thread of its own, so its connection doesn't outlive the report
+        connections.close_all()
+
+
+def schedule_variants(name):
+    """Generate variants off the request path once the upload is committed"""
+    if not name:
+        return
+    if not getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+        transaction.on_commit(lambda: _generate_logged(name))
+        return
+
+    def submit():
+        future = get_executor().submit(generate_variants, name)
+        # Done callbacks run on the executor's management thread (or this
+        # one, if the future already finished); the report writes to the
+        # database from a short-lived thread instead
+        future.add_done_callback(
+            lambda f: threading.Thread(target=_finish, args=(name, f), name='image-variants').start()
+        )
+
+    transaction.on_commit(submit)
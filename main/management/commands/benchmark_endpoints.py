@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from main.benchmark import (
+    DEFAULT_THRESHOLDS, MODES, admin_routes, compare, load_baseline, measure_client,
+    measure_server, public_routes, save_baseline,
+)
+
+BENCHMARK_USERNAME = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = ("Measure latency, queries and memory of every public route and the admin changelists, "
+            "failing on regressions against the stored baseline")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', action='append', choices=MODES,
+                            help="Only run this mode (repeatable); default: all of them")
+        parser.add_argument('--route', action='append', help="Only this route name (repeatable)")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per route and mode")
+        parser.add_argument('--baseline', default=settings.BENCHMARK_BASELINE)
+        parser.add_argument('--update-baseline', action='store_true',
+                            help="Store these results as the new baseline instead of comparing")
+        parser.add_argument('--latency-threshold', type=float, default=DEFAULT_THRESHOLDS['latency'],
+                            help="Allowed relative p50 increase, e.g. 0.5 for 50%%")
+        parser.add_argument('--tail-latency-threshold', type=float,
+                            default=DEFAULT_THRESHOLDS['tail_latency'], help="Allowed relative p95 increase")
+        parser.add_argument('--memory-threshold', type=float, default=DEFAULT_THRESHOLDS['memory'])
+        parser.add_argument('--query-threshold', type=int, default=DEFAULT_THRESHOLDS['queries'],
+                            help="Extra queries allowed per request")
+
+    def handle(self, *args, **options):
+        routes = {**public_routes(), **admin_routes()}
+        if options['route']:
+            unknown = set(options['route']) - set(routes)
+            if unknown:
+                raise CommandError(f"Unknown route(s): {', '.join(sorted(unknown))}")
+            routes = {name: path for name, path in routes.items() if name in options['route']}
+
+        user, created = get_user_model().objects.get_or_create(
+            username=BENCHMARK_USERNAME, defaults={'is_staff': True, 'is_superuser': True},
+        )
+        try:
+            client = Client()
+            client.force_login(user)
+            cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+            results = {}
+            # Query counts are exact: keep the periodic content check out of them
+            with override_settings(PORTFOLIO_CONTENT_CHECK_INTERVAL=None):
+                for mode in options['mode'] or MODES:
+                    if mode in ('client', 'cold'):
+                        results[mode] = measure_client(client, routes, options['repeat'], cold=mode == 'cold')
+                    else:
+                        results[mode] = measure_server(mode, routes, options['repeat'], cookie)
+                    self.report(mode, results[mode])
+        finally:
+            if created:
+                user.delete()
+
+        if options['update_baseline']:
+            baseline = load_baseline(options['baseline']) or {}
+            for mode, measured in results.items():
+                baseline.setdefault(mode, {}).update(measured)
+            save_baseline(options['baseline'], baseline)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}."))
+            return
+
+        baseline = load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(
+                f"No baseline at {options['baseline']}; store one with --update-baseline."
+            ))
+            return
+        thresholds = {
+            **DEFAULT_THRESHOLDS,
+            'latency': options['latency_threshold'],
+            'tail_latency': options['tail_latency_threshold'],
+            'memory': options['memory_threshold'],
+            'queries': options['query_threshold'],
+        }
+        failures = compare(results, baseline, thresholds)
+        if failures:
+            raise CommandError("Regressed past the baseline:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Within the baseline thresholds."))
+
+    def report(self, mode, results):
+        self.stdout.write(f"\n{mode}")
+        self.stdout.write(f"{'route':<40}{'p50 ms':>9}{'p95 ms':>9}{'queries':>9}{'peak KiB':>10}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<40}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result.get('queries', ''):>9}{result.get('peak_kib', ''):>10}"
+            )
@@ -0,0 +1,79 @@
+import http.client
+import importlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import clear_url_caches
+
+from main.benchmark import serve
+from main.cache import bump_content_version
+
+DEFAULT_PATHS = ('/', '/about/', '/projects/', '/skills/')
+
+
+def reload_urls():
+    import main.urls
+    import portfolio.urls
+    import portfolio.urls_public
+    # urls_public's include() resolver caches main.urls' patterns, so it is
+    # rebuilt too, before the root URLconf that copies its list
+    importlib.reload(main.urls)
+    importlib.reload(portfolio.urls_public)
+    importlib.reload(portfolio.urls)
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = "Compare latency and throughput of sync views under WSGI with sync and async views under ASGI"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--requests', type=int, default=400, help="Requests per mode")
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--cold', action='store_true',
+                            help="Move the content version before each request, so every request "
+                                 "misses the page cache and reloads the snapshot")
+
+    def handle(self, *args, **options):
+        modes = (('wsgi', False), ('asgi', False), ('asgi', True))
+        self.stdout.write(f"{'server':<8}{'views':<7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+        try:
+            for server, async_views in modes:
+                with override_settings(PORTFOLIO_ASYNC_VIEWS=async_views):
+                    reload_urls()
+                    rate, latencies = self.run_mode(server, options)
+                latencies.sort()
+                self.stdout.write(
+                    f"{server:<8}{'async' if async_views else 'sync':<7}{rate:>9.0f}"
+                    f"{statistics.median(latencies):>9.2f}"
+                    f"{latencies[int(len(latencies) * 0.95) - 1]:>9.2f}{latencies[-1]:>9.2f}"
+                )
+        finally:
+            reload_urls()
+
+    def run_mode(self, server, options):
+        paths = options['paths']
+
+        with serve(server) as port:
+            def fetch(i):
+                if options['cold']:
+                    bump_content_version()
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+                start = time.perf_counter()
+                connection.request('GET', paths[i % len(paths)], headers={'Host': 'localhost'})
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                if response.status != 200:
+                    raise RuntimeError(f"{paths[i % len(paths)]} returned {response.status}")
+                return (time.perf_counter() - start) * 1000
+
+            fetch(0)  # warm up imports and the snapshot
+            start = time.perf_counter()
+            with ThreadPoolExecutor(options['concurrency']) as pool:
+                latencies = list(pool.map(fetch, range(options['requests'])))
+            elapsed = time.perf_counter() - start
+        return options['requests'] / elapsed, latencies
@@ -0,0 +1,130 @@
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What the public pages read
+READS = (
+    "SELECT * FROM main_profile LIMIT 1",
+    "SELECT * FROM main_skill ORDER BY proficiency DESC",
+    "SELECT * FROM main_project ORDER BY created_date DESC, id DESC LIMIT 10",
+    "SELECT * FROM main_experience ORDER BY start_date DESC",
+    "SELECT * FROM main_certification ORDER BY issue_date DESC",
+)
+
+# A contact submission: the message plus its queued notification
+WRITES = (
+    ("INSERT INTO main_contact (name, email, subject, message, created_at, is_read) "
+     "VALUES ('Bench', 'bench@example.com', 'Benchmark', ?, datetime('now'), 0)"),
+    ("INSERT INTO main_outboundemail (subject, body, from_email, \"to\", reply_to, status, attempts, "
+     "next_attempt_at, last_error, created_at) VALUES ('Benchmark', ?, '', 'x@example.com', '', "
+     "'pending', 0, datetime('now'), '', datetime('now'))"),
+)
+
+
+def pragmas(init_command):
+    return [statement.strip() for statement in init_command.split(';') if statement.strip()]
+
+
+class Command(BaseCommand):
+    help = "Measure page-read latency while contact-form writes run, before and after the SQLite tuning"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help="Duration per profile")
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--hold-ms', type=float, default=20.0,
+                            help="How long each write transaction keeps the write lock")
+
+    def handle(self, *args, **options):
+        source = Path(settings.DATABASES['default']['NAME'])
+        if not source.exists():
+            raise CommandError(f"{source} does not exist; run migrate first.")
+
+        replica_init = settings.DATABASES.get('replica', {}).get('OPTIONS', {}).get('init_command', '')
+        profiles = {
+            # Django's defaults: rollback journal, FULL sync, Python's 5s busy wait
+            'baseline': {'primary': ['PRAGMA journal_mode=DELETE', 'PRAGMA synchronous=FULL'],
+                         'reader': [], 'read_only': False},
+            'tuned': {'primary': pragmas(settings.SQLITE_PRAGMAS),
+                      'reader': pragmas(replica_init), 'read_only': True},
+        }
+
+        self.stdout.write(f"{'profile':<10}{'reads/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+                          f"{'writes/s':>10}{'errors':>8}")
+        for name, profile in profiles.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / 'bench.sqlite3'
+                shutil.copy(source, path)
+                stats = self.run_profile(path, profile, options)
+            latencies = sorted(stats['reads'])
+            self.stdout.write(
+                f"{name:<10}{len(latencies) / options['seconds']:>9.0f}"
+                f"{statistics.median(latencies):>9.2f}{latencies[int(len(latencies) * 0.99) - 1]:>9.2f}"
+                f"{latencies[-1]:>9.2f}{stats['writes'] / options['seconds']:>10.1f}{stats['errors']:>8}"
+            )
+
+    def connect(self, path, statements, read_only=False):
+        uri = f"file:{path}?mode=ro" if read_only else f"file:{path}"
+        connection = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        for statement in statements:
+            connection.execute(statement)
+        return connection
+
+    def run_profile(self, path, profile, options):
+        # Sets the journal mode on the file before anyone reads it
+        self.connect(path, profile['primary']).close()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        stats = {'reads': [], 'writes': 0, 'errors': 0}
+
+        def reader():
+            connection = self.connect(path, profile['reader'] or profile['primary'], profile['read_only'])
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    for sql in READS:
+                        connection.execute(sql).fetchall()
+                except sqlite3.OperationalError:
+                    with lock:
+                        stats['errors'] += 1
+                    continue
+                with lock:
+                    stats['reads'].append((time.perf_counter() - start) * 1000)
+            connection.close()
+
+        def writer():
+            connection = self.connect(path, profile['primary'])
+            while not stop.is_set():
+                try:
+                    connection.execute('BEGIN IMMEDIATE')
+                    for sql in WRITES:
+                        connection.execute(sql, ['x' * 500])
+                    time.sleep(options['hold_ms'] / 1000)
+                    connection.execute('COMMIT')
+                except sqlite3.OperationalError:
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+                    with lock:
+                        stats['errors'] += 1
+                    continue
+                with lock:
+                    stats['writes'] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return stats
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.cache import bump_content_version
+from main.critical import CRITICAL_PAGES, artifact_path, build_critical_css, missing_stylesheets
+
+
+class Command(BaseCommand):
+    help = "Extract the above-the-fold CSS of each page template into build/critical/"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', action='append', choices=sorted(CRITICAL_PAGES),
+                            help="Only build this template (repeatable)")
+
+    def handle(self, *args, **options):
+        # Critical CSS that left out Bootstrap would flash an unstyled page
+        missing = missing_stylesheets()
+        if missing:
+            raise CommandError(
+                f"Not vendored: {', '.join(missing)}; run `manage.py build_assets --fetch` first."
+            )
+
+        try:
+            sizes = build_critical_css(options['template'])
+        except RuntimeError as e:
+            raise CommandError(str(e)) from e
+        for template_name, size in sizes.items():
+            self.stdout.write(f"{template_name}: {size / 1024:.1f} KiB -> {artifact_path(template_name)}")
+
+        # Cached pages still link the stylesheets as render-blocking
+        bump_content_version()
+        self.stdout.write(self.style.SUCCESS("Critical CSS built."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.icons import build_sprite, sprite_path, vendored_symbols
+
+
+class Command(BaseCommand):
+    help = "Build the inline SVG sprite holding only the icons the site uses"
+
+    def handle(self, *args, **options):
+        if not any(vendored_symbols(style) for style in ('solid', 'regular', 'brands')):
+            raise CommandError(
+                "Font Awesome sprites are not vendored; run `manage.py build_assets --fetch` first."
+            )
+
+        count, missing = build_sprite()
+        for name in missing:
+            self.stderr.write(self.style.WARNING(f"No symbol for {name}"))
+        self.stdout.write(f"{count} icon(s) written to {sprite_path()}")
+        if missing:
+            self.stdout.write("Sprite is incomplete; pages keep loading the Font Awesome stylesheet.")
+        else:
+            self.stdout.write(self.style.SUCCESS("Sprite is complete; the Font Awesome stylesheet is dropped."))
@@ -0,0 +1,44 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from main.images import _init_worker, generate_variants, variants_ready
+from main.signals import IMAGE_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Generate responsive WebP/JPEG variants for every uploaded image"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes (defaults to the CPU count)")
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate variants that already exist")
+
+    def handle(self, *args, **options):
+        names = set()
+        for model, field_name in IMAGE_FIELDS:
+            names.update(
+                model.objects.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+            )
+
+        failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            futures = {pool.submit(generate_variants, name, options['force']): name for name in sorted(names)}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    widths = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{name}: {exc}")
+                else:
+                    if widths:
+                        variants_ready(name)
+                    self.stdout.write(f"{name}: {', '.join(map(str, widths)) or 'up to date'}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {len(names) - failed} image(s), {failed} failed."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from main.throttle import rejection_counts, reset_rejection_counts
+
+
+class Command(BaseCommand):
+    help = "Show how many contact submissions the rate limiter and duplicate check turned away"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help="Zero the counters after printing them")
+
+    def handle(self, *args, **options):
+        counts = rejection_counts()
+        for reason, count in counts.items():
+            self.stdout.write(f"{reason:<10} {count}")
+        if options['reset']:
+            reset_rejection_counts()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
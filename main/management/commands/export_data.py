@@ -0,0 +1,61 @@
+import datetime
+import sys
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from main.bulk_export import CHUNK_SIZE, FORMATS, date_field, filter_dates, stream_export
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"Not a YYYY-MM-DD date: {value}") from exc
+
+
+class Command(BaseCommand):
+    help = "Stream the rows of a model to CSV or JSON Lines without loading them into memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help="Model name, e.g. contact or main.contact")
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', default='-',
+                            help="File to write, or - for standard output")
+        parser.add_argument('--gzip', action='store_true', help="Compress the output with gzip")
+        parser.add_argument('--since', type=parse_date,
+                            help="Only rows dated on or after this day (YYYY-MM-DD)")
+        parser.add_argument('--until', type=parse_date,
+                            help="Only rows dated before this day (YYYY-MM-DD)")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help="Rows fetched from the database at a time")
+
+    def handle(self, *args, **options):
+        label = options['model']
+        app_label, _, model_name = label.rpartition('.')
+        try:
+            model = apps.get_model(app_label or 'main', model_name)
+        except (LookupError, ValueError) as exc:
+            raise CommandError(f"Unknown model: {label}") from exc
+
+        queryset = model._default_manager.all()
+        if options['since'] or options['until']:
+            if date_field(model) is None:
+                raise CommandError(f"{model.__name__} has no date field to filter on")
+            queryset = filter_dates(queryset, options['since'], options['until'])
+
+        chunks = stream_export(queryset, options['format'], options['gzip'], options['chunk_size'])
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+        written = 0
+        with open(options['output'], 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {model._meta.verbose_name_plural} to {options['output']} ({written} bytes)."
+        ))
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.export import export_root, export_site, export_while_pending
+
+
+class Command(BaseCommand):
+    help = "Render the public pages, static files and media into a static site"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None, help="Defaults to settings.STATIC_EXPORT_DIR")
+        parser.add_argument('--incremental', action='store_true',
+                            help="Only re-render pages whose content changed since the last export")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes (defaults to the CPU count)")
+        parser.add_argument('--when-idle', action='store_true',
+                            help="Incremental export that exits if another export is running "
+                                 "and repeats while saves keep arriving (used by STATIC_EXPORT_ON_SAVE)")
+
+    def handle(self, *args, **options):
+        root = options['output'] or export_root()
+        if not Path(settings.STATIC_ROOT).is_dir():
+            self.stderr.write(self.style.WARNING(
+                "STATIC_ROOT is empty; run `manage.py build_assets` so the export has its assets."
+            ))
+
+        def progress(path):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"rendered {path}")
+
+        if options['when_idle']:
+            runs = export_while_pending(root, options['workers'], progress)
+            self.stdout.write(f"{runs} export run(s).")
+            return
+
+        summary = export_site(root, options['incremental'], options['workers'], progress)
+        self.stdout.write(
+            f"{summary['rendered']} page(s) rendered, {summary['skipped']} unchanged, "
+            f"{summary['removed']} stale file(s) removed"
+        )
+        self.stdout.write(f"static: {summary['static'][0]} copied, {summary['static'][1]} removed")
+        self.stdout.write(f"media: {summary['media'][0]} copied, {summary['media'][1]} removed")
+        self.stdout.write(self.style.SUCCESS(f"Site exported to {root}"))
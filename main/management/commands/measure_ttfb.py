@@ -0,0 +1,63 @@
+import http.client
+import statistics
+import threading
+import time
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from main.snapshot import clear_snapshot
+
+DEFAULT_PATHS = ('/', '/about/', '/projects/', '/skills/')
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Compare time to first byte of the public pages with and without streaming render"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--requests', type=int, default=20, help="Requests per page and mode")
+        parser.add_argument('--warm', action='store_true',
+                            help="Keep the content snapshot loaded between requests")
+
+    def handle(self, *args, **options):
+        server = make_server('127.0.0.1', 0, WSGIHandler(), handler_class=QuietHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            self.stdout.write(f"{'page':<16}{'mode':<10}{'ttfb ms':>10}{'total ms':>10}")
+            for path in options['paths']:
+                for streaming in (False, True):
+                    # Page cache off so every request renders
+                    with override_settings(PORTFOLIO_STREAMING_RENDER=streaming,
+                                           PORTFOLIO_PAGE_CACHE_TIMEOUT=0):
+                        ttfb, total = self.measure(server.server_port, path, options)
+                    mode = 'stream' if streaming else 'render'
+                    self.stdout.write(f"{path:<16}{mode:<10}{ttfb:>10.2f}{total:>10.2f}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def measure(self, port, path, options):
+        """Median (time to first byte, time to last byte) in milliseconds"""
+        ttfb, total = [], []
+        for _ in range(options['requests']):
+            if not options['warm']:
+                clear_snapshot()
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            start = time.perf_counter()
+            connection.request('GET', path, headers={'Host': 'localhost'})
+            response = connection.getresponse()
+            response.read1()
+            ttfb.append(time.perf_counter() - start)
+            response.read()
+            total.append(time.perf_counter() - start)
+            connection.close()
+        return statistics.median(ttfb) * 1000, statistics.median(total) * 1000
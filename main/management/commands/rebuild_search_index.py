@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.search import SEARCH_TABLES, rebuild_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite full-text search index from the content tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--kind', action='append', choices=sorted(SEARCH_TABLES),
+                            help="Only rebuild this index (repeatable)")
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError("Full-text search requires the SQLite database backend.")
+
+        def progress(kind, count):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{kind}: {count} row(s) indexed")
+
+        totals = rebuild_search_index(options['batch_size'], options['kind'], progress)
+        for kind, count in totals.items():
+            self.stdout.write(f"{kind}: {count}")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
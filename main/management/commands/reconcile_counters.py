@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from main.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount the admin dashboard counters and correct any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90,
+                            help="How many days of the new-message trend to recount")
+
+    def handle(self, *args, **options):
+        drift = reconcile(options['days'])
+        for name, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{name}: {stored} -> {actual}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Counters reconciled, {len(drift)} corrected." if drift else "Counters reconciled, no drift."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from main.analytics import get_buffer, rollup
+
+
+class Command(BaseCommand):
+    help = "Fold raw page views into the hourly and daily analytics tables and apply retention"
+
+    def handle(self, *args, **options):
+        # Views buffered by this process, e.g. when run from a shell
+        get_buffer().flush()
+        count = rollup()
+        if count is None:
+            self.stdout.write(self.style.WARNING("Another rollup is in progress."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rolled up {count} page views."))
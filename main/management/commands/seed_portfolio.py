@@ -0,0 +1,275 @@
+import datetime
+import random
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.cache import bump_content_version
+from main.counters import reconcile
+from main.models import (
+    Certification, Contact, Education, Experience, Profile, Project, Skill,
+    Technology, Testimonial, tech_slug,
+)
+from main.snapshot import clear_snapshot
+
+# Rows per model for each --scale; any of them can be overridden by its option
+SCALES = {
+    'small': {'technologies': 20, 'projects': 30, 'skills': 24, 'experience': 4, 'education': 2,
+              'certifications': 6, 'testimonials': 6, 'contacts': 500},
+    'medium': {'technologies': 60, 'projects': 1000, 'skills': 40, 'experience': 8, 'education': 3,
+               'certifications': 20, 'testimonials': 20, 'contacts': 100_000},
+    'large': {'technologies': 120, 'projects': 10_000, 'skills': 60, 'experience': 12, 'education': 4,
+              'certifications': 40, 'testimonials': 50, 'contacts': 1_000_000},
+}
+
+# Delete order: rows that point at others go first
+SEEDED_MODELS = (Project.stack.through, Project, Technology, Skill, Experience, Education,
+                 Certification, Testimonial, Contact)
+
+TECHNOLOGIES = (
+    'Python', 'Django', 'Flask', 'FastAPI', 'JavaScript', 'TypeScript', 'React', 'Vue', 'Svelte',
+    'Node.js', 'Go', 'Rust', 'Java', 'Kotlin', 'C', 'C++', 'C#', 'PostgreSQL', 'MySQL', 'SQLite',
+    'Redis', 'Celery', 'Docker', 'Kubernetes', 'AWS', 'GCP', 'Terraform', 'GraphQL', 'Tailwind',
+    'Bootstrap', 'Pandas', 'NumPy', 'PyTorch', 'TensorFlow', 'Elasticsearch', 'Nginx', 'Linux',
+)
+WORDS = (
+    'realtime', 'dashboard', 'tracker', 'platform', 'engine', 'analytics', 'budget', 'weather',
+    'chat', 'inventory', 'portfolio', 'recipe', 'fitness', 'booking', 'scheduler', 'crawler',
+    'notes', 'blog', 'marketplace', 'quiz', 'music', 'library', 'expense', 'monitoring', 'api',
+)
+SENTENCES = (
+    "Built with a focus on fast page loads and accessible markup.",
+    "Handles thousands of requests a minute behind a small cache layer.",
+    "Includes authentication, role based permissions and an audit trail.",
+    "Deployed with Docker and a zero-downtime rolling release.",
+    "Background jobs process uploads and send email notifications.",
+    "A responsive interface that works offline once loaded.",
+    "Covered by unit and integration tests running in CI.",
+    "Data is imported nightly from a public API and indexed for search.",
+)
+FIRST_NAMES = ('Aarav', 'Maya', 'Liam', 'Sofia', 'Noah', 'Priya', 'Ethan', 'Zara', 'Omar', 'Chen',
+               'Lucas', 'Amara', 'Ravi', 'Elena', 'Kenji', 'Fatima', 'Jonas', 'Ana', 'Tariq', 'Mei')
+LAST_NAMES = ('Sharma', 'Smith', 'Garcia', 'Kim', 'Okafor', 'Rossi', 'Nguyen', 'Patel', 'Müller',
+              'Silva', 'Cohen', 'Kowalski', 'Haddad', 'Tanaka', 'Reddy', 'Johnson')
+COMPANIES = ('Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Tech',
+             'Hooli', 'Pied Piper', 'Vandelay Imports', 'Wonka Systems')
+SUBJECTS = ('Project inquiry', 'Job opportunity', 'Freelance work', 'Collaboration',
+            'Question about your work', 'Hello!', 'Speaking invitation', 'Feedback')
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Let bulk_create() keep the dates we set on auto_now/auto_now_add fields"""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "Fill the database with generated portfolio content and contact messages for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+        for name in SCALES['small']:
+            parser.add_argument(f'--{name}', type=int, help=f"Number of {name} rows (overrides --scale)")
+        parser.add_argument('--featured', type=int, default=6, help="How many projects are featured")
+        parser.add_argument('--days', type=int, default=365,
+                            help="Spread contact messages over this many days before today")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for repeatable data")
+        parser.add_argument('--flush', action='store_true',
+                            help="Delete existing content and messages first (the profile is kept)")
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] if options[name] is not None else default
+                  for name, default in SCALES[options['scale']].items()}
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+
+        if options['flush']:
+            self.flush()
+        if not Profile.objects.exists():
+            Profile.objects.create(
+                name="Alex Developer", title="Full Stack Developer", email="alex@example.com",
+                phone="+1 555 0100", location="Remote", bio=" ".join(SENTENCES[:4]),
+            )
+
+        started = time.perf_counter()
+        technologies = self.timed('technologies', lambda: self.seed_technologies(counts['technologies']))
+        self.timed('projects', lambda: self.seed_projects(counts['projects'], options['featured'], technologies))
+        self.timed('skills', lambda: self.seed_skills(counts['skills']))
+        self.timed('experience', lambda: self.seed_experience(counts['experience']))
+        self.timed('education', lambda: self.seed_education(counts['education']))
+        self.timed('certifications', lambda: self.seed_certifications(counts['certifications']))
+        self.timed('testimonials', lambda: self.seed_testimonials(counts['testimonials']))
+        self.timed('contacts', lambda: self.seed_contacts(counts['contacts'], options['days']))
+
+        # bulk_create() skips the signals that keep these in step
+        reconcile(days=options['days'] + 1)
+        bump_content_version()
+        clear_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s."))
+
+    def timed(self, name, seed):
+        started = time.perf_counter()
+        result = seed()
+        count = len(result) if isinstance(result, list) else result
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{name:<16}{count:>10} rows{elapsed:>8.1f}s{count / max(elapsed, 1e-6):>10.0f}/s")
+        return result
+
+    def flush(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model in SEEDED_MODELS:
+                # Plain DELETE: queryset.delete() would load every row to send signals
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+
+    def bulk(self, model, rows, keep=True):
+        """
+        bulk_create() a generator in batches. Returns the created objects, or
+        only how many there were when `keep` is false, so a million rows never
+        sit in memory at once.
+        """
+        created, batch, count = [], [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                count += self.flush_batch(model, batch, created if keep else None)
+                batch = []
+        if batch:
+            count += self.flush_batch(model, batch, created if keep else None)
+        return created if keep else count
+
+    def flush_batch(self, model, batch, created):
+        objects = model.objects.bulk_create(batch)
+        if created is not None:
+            created.extend(objects)
+        return len(batch)
+
+    def sentence(self, count=2):
+        return " ".join(self.random.sample(SENTENCES, count))
+
+    def past_date(self, days):
+        return (self.now - datetime.timedelta(days=self.random.randrange(days))).date()
+
+    def seed_technologies(self, count):
+        names = list(TECHNOLOGIES[:count])
+        names += [f'{self.random.choice(TECHNOLOGIES)} {n}' for n in range(len(names), count)]
+        existing = set(Technology.objects.values_list('slug', flat=True))
+        Technology.objects.bulk_create(
+            [Technology(name=name, slug=tech_slug(name)) for name in names if tech_slug(name) not in existing],
+            ignore_conflicts=True,
+        )
+        return list(Technology.objects.all())
+
+    def seed_projects(self, count, featured, technologies):
+        featured = set(self.random.sample(range(count), min(featured, count)))
+        created_date = Project._meta.get_field('created_date')
+        with explicit_dates(created_date), transaction.atomic():
+            projects = self.bulk(Project, (
+                Project(
+                    title=f"{self.random.choice(WORDS).title()} {self.random.choice(WORDS).title()} {n}",
+                    description=self.sentence(3),
+                    image='projects/placeholder.jpg',
+                    github_link=f'https://github.com/example/project-{n}',
+                    live_link=f'https://project-{n}.example.com' if n % 3 else '',
+                    is_featured=n in featured,
+                    created_date=self.past_date(5 * 365),
+                )
+                for n in range(count)
+            ))
+            Through = Project.stack.through
+            self.bulk(Through, keep=False, rows=(
+                Through(project_id=project.pk, technology_id=tech.pk)
+                for project in projects
+                for tech in self.random.sample(technologies, min(len(technologies), self.random.randint(2, 5)))
+            ))
+        return count
+
+    def seed_skills(self, count):
+        categories = [key for key, _ in Skill.CATEGORY_CHOICES]
+        return self.bulk(Skill, (
+            Skill(
+                name=TECHNOLOGIES[n % len(TECHNOLOGIES)],
+                category=categories[n % len(categories)],
+                proficiency=self.random.randint(40, 100),
+                icon='fas fa-code',
+            )
+            for n in range(count)
+        ))
+
+    def seed_experience(self, count):
+        return self.bulk(Experience, (
+            Experience(
+                company=self.random.choice(COMPANIES),
+                position=self.random.choice(('Software Engineer', 'Backend Developer', 'Tech Lead')),
+                description=self.sentence(3),
+                start_date=self.past_date(10 * 365),
+                is_current=n == 0,
+            )
+            for n in range(count)
+        ))
+
+    def seed_education(self, count):
+        return self.bulk(Education, (
+            Education(
+                institution=f"{self.random.choice(LAST_NAMES)} University",
+                degree=self.random.choice(('B.Tech', 'B.Sc', 'M.Sc', 'MBA')),
+                field_of_study="Computer Science",
+                start_date=self.past_date(15 * 365),
+                grade=f"{self.random.randint(70, 98)}%",
+                description=self.sentence(1),
+            )
+            for n in range(count)
+        ))
+
+    def seed_certifications(self, count):
+        return self.bulk(Certification, (
+            Certification(
+                name=f"Certified {self.random.choice(TECHNOLOGIES)} Professional",
+                issuing_organization=self.random.choice(COMPANIES),
+                issue_date=self.past_date(6 * 365),
+                credential_id=f'CERT-{n:06d}',
+            )
+            for n in range(count)
+        ))
+
+    def seed_testimonials(self, count):
+        return self.bulk(Testimonial, (
+            Testimonial(
+                name=f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}",
+                position=self.random.choice(('CTO', 'Product Manager', 'Founder', 'Engineering Manager')),
+                company=self.random.choice(COMPANIES),
+                testimonial=self.sentence(2),
+                rating=self.random.randint(4, 5),
+            )
+            for n in range(count)
+        ))
+
+    def seed_contacts(self, count, days):
+        created_at = Contact._meta.get_field('created_at')
+        span = days * 24 * 3600
+        with explicit_dates(created_at), transaction.atomic():
+            return self.bulk(Contact, keep=False, rows=(
+                Contact(
+                    name=f"{first} {last}",
+                    email=f"{first.lower()}.{n}@example.com",
+                    subject=self.random.choice(SUBJECTS),
+                    message=self.sentence(2),
+                    created_at=self.now - datetime.timedelta(seconds=self.random.randrange(span)),
+                    # Most of the inbox has been read
+                    is_read=self.random.random() < 0.9,
+                )
+                for n, first, last in (
+                    (n, self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)) for n in range(count)
+                )
+            ))
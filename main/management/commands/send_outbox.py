@@ -0,0 +1,40 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from main.outbox import claim_batch, deliver
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails in batches over a single SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-attempts', type=int, default=None,
+                            help="Dead-letter a message after this many failed attempts")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep polling the outbox instead of exiting when it is empty")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep between polls in --loop mode")
+
+    def handle(self, *args, **options):
+        totals = [0, 0, 0]
+        while True:
+            items = claim_batch(options['batch_size'])
+            if items:
+                result = deliver(items, get_connection(fail_silently=False), options['max_attempts'])
+                totals = [total + count for total, count in zip(totals, result)]
+                self.stdout.write(
+                    f"sent={result[0]} retried={result[1]} dead={result[2]}"
+                )
+                # Drain a backlog without sleeping between full batches
+                if len(items) == options['batch_size']:
+                    continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox drained: {totals[0]} sent, {totals[1]} retried, {totals[2]} dead."
+        ))
@@ -0,0 +1,137 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+MARKER = '-- imported --'
+
+# Runs in a fresh interpreter: import the WSGI application as a server would,
+# then warm up explicitly so both phases can be timed apart
+PROBE = f"""
+import json, resource, sys, time
+started = time.perf_counter()
+import {{module}}
+imported = time.perf_counter()
+imported_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.stderr.write({MARKER!r} + '\\n')
+sys.stderr.flush()
+steps = []
+if {{warmup}}:
+    from main.warmup import warmup
+    steps = [(name, seconds) for name, seconds, _ in warmup()]
+json.dump({{{{
+    'import_s': imported - started,
+    'import_rss_kib': imported_rss,
+    'steps': steps,
+    'rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}}}, sys.stdout)
+"""
+
+
+def parse_importtime(lines):
+    """[(module, self_us, cumulative_us)] from `python -X importtime` output"""
+    modules = []
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        if not self_us.strip().isdigit():
+            continue  # the column header
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def probe(module='portfolio.wsgi', warmup=True, env=None):
+    """Import `module` in a fresh interpreter; returns (modules, timings)"""
+    env = {**os.environ, **(env or {}), 'PORTFOLIO_WARMUP': '0'}
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(module=module, warmup=warmup)],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode:
+        raise CommandError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    stderr = completed.stderr.splitlines()
+    split = stderr.index(MARKER) if MARKER in stderr else len(stderr)
+    return parse_importtime(stderr[:split]), json.loads(completed.stdout)
+
+
+class Command(BaseCommand):
+    help = ("Import the WSGI application in a fresh interpreter and report where import "
+            "and warmup time goes")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='portfolio.wsgi', help="Module to import")
+        parser.add_argument('--top', type=int, default=20, help="Slowest modules and packages to list")
+        parser.add_argument('--no-warmup', action='store_true', help="Only time the imports")
+        parser.add_argument('--compare', metavar='SETTINGS',
+                            help="Compare per-worker import time and RSS with another settings module, e.g. "
+                                 "--settings portfolio.settings_public --compare portfolio.settings")
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per side with --compare")
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            return self.compare(options)
+        modules, timings = probe(options['module'], warmup=not options['no_warmup'])
+
+        packages = defaultdict(int)
+        for name, self_us, _ in modules:
+            packages[name.split('.')[0]] += self_us
+        top = options['top']
+
+        self.stdout.write(
+            f"{options['module']}: imported {len(modules)} modules in {timings['import_s'] * 1000:.0f} ms, "
+            f"max RSS {timings['import_rss_kib'] / 1024:.1f} MiB"
+        )
+        self.stdout.write(f"\n{'package':<40}{'self ms':>10}")
+        for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"{name:<40}{self_us / 1000:>10.1f}")
+
+        self.stdout.write(f"\n{'module':<60}{'cumulative ms':>15}")
+        for name, _, cumulative_us in sorted(modules, key=lambda module: -module[2])[:top]:
+            self.stdout.write(f"{name:<60}{cumulative_us / 1000:>15.1f}")
+
+        if timings['steps']:
+            self.stdout.write(f"\n{'warmup step':<40}{'ms':>10}")
+            for name, seconds in timings['steps']:
+                self.stdout.write(f"{name:<40}{seconds * 1000:>10.1f}")
+            self.stdout.write(
+                f"Warmup took {sum(seconds for _, seconds in timings['steps']) * 1000:.0f} ms, "
+                f"max RSS {timings['rss_kib'] / 1024:.1f} MiB"
+            )
+
+    def compare(self, options):
+        """Median import time and RSS of this settings module against another"""
+        sides = {
+            'this': os.environ['DJANGO_SETTINGS_MODULE'],
+            'other': options['compare'],
+        }
+        results = {}
+        for side, settings_module in sides.items():
+            runs = [
+                probe(options['module'], warmup=not options['no_warmup'],
+                      env={'DJANGO_SETTINGS_MODULE': settings_module})
+                for _ in range(options['runs'])
+            ]
+            results[side] = {
+                'modules': statistics.median(len(modules) for modules, _ in runs),
+                'import ms': statistics.median(timings['import_s'] * 1000 for _, timings in runs),
+                'import RSS MiB': statistics.median(timings['import_rss_kib'] / 1024 for _, timings in runs),
+            }
+            if not options['no_warmup']:
+                results[side].update({
+                    'warmup ms': statistics.median(
+                        sum(seconds for _, seconds in timings['steps']) * 1000 for _, timings in runs
+                    ),
+                    'warm RSS MiB': statistics.median(timings['rss_kib'] / 1024 for _, timings in runs),
+                })
+
+        this, other = sides['this'], sides['other']
+        self.stdout.write(f"{'per worker':<20}{this:>28}{other:>28}{'saved':>12}")
+        for metric, value in results['this'].items():
+            baseline = results['other'][metric]
+            self.stdout.write(f"{metric:<20}{value:>28.1f}{baseline:>28.1f}{baseline - value:>12.1f}")
@@ -0,0 +1,370 @@
+"""
+Per-request performance metrics in the Prometheus text format.
+
+MetricsMiddleware times each request and tags it with its URL name. A
+database execute wrapper and the TimedDjangoTemplates backend add query and
+template render time to the request being served, found through a context
+variable, so async views and streamed bodies are counted correctly too.
+Totals are kept in memory per process and written every few seconds to a
+file of their own in METRICS_DIR, which the /metrics endpoint merges.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+from django.utils.crypto import constant_time_compare
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help)
+METRICS = {
+    'portfolio_requests_total': ('counter', "Requests handled, by view, method and status"),
+    'portfolio_request_duration_seconds': ('histogram', "Time to produce the full response, by view"),
+    'portfolio_db_queries_total': ('counter', "SQL queries issued while serving requests, by view"),
+    'portfolio_db_query_seconds_total': ('counter', "Time spent in SQL queries, by view"),
+    'portfolio_template_render_seconds_total': (
+        'counter', "Time spent rendering templates, including queries run while rendering, by view"
+    ),
+    'portfolio_response_bytes_total': ('counter', "Response body bytes sent, by view"),
+}
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds', 'template_seconds', 'template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+
+_current = ContextVar('portfolio_request_stats', default=None)
+
+
+def query_timer(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created receiver; the wrapper outlives reconnects, so add it once"""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+@contextmanager
+def template_timer():
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    # Only the outermost render counts; includes and nested
+    # render_to_string() calls are part of it
+    stats.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.template_depth -= 1
+        if not stats.template_depth:
+            stats.template_seconds += time.perf_counter() - started
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with template_timer():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time added to the request's metrics"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def _labels(**labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    """This process's totals"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.counters = {}
+        # (name, labels) -> [count per bucket..., count above the last, sum]
+        self.histograms = {}
+        self.dumped_at = time.monotonic()
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe_histogram(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        key = (name, labels)
+        series = self.histograms.get(key)
+        if series is None:
+            series = self.histograms[key] = [0] * (len(buckets) + 2)
+        index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+        series[index] += 1
+        series[-1] += value
+
+    def observe(self, view, method, status, seconds, stats, size):
+        labels = _labels(view=view)
+        with self.lock:
+            self.inc('portfolio_requests_total', _labels(view=view, method=method, status=str(status)))
+            self.observe_histogram('portfolio_request_duration_seconds', labels, seconds)
+            self.inc('portfolio_db_queries_total', labels, stats.queries)
+            self.inc('portfolio_db_query_seconds_total', labels, stats.query_seconds)
+            self.inc('portfolio_template_render_seconds_total', labels, stats.template_seconds)
+            self.inc('portfolio_response_bytes_total', labels, size)
+        if time.monotonic() - self.dumped_at >= settings.METRICS_DUMP_INTERVAL:
+            self.dump()
+
+    def state(self):
+        with self.lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, labels, series] for (name, labels), series in self.histograms.items()],
+            }
+
+    def dump(self):
+        """Write this process's totals to METRICS_DIR/<pid>.json"""
+        self.dumped_at = time.monotonic()
+        if not settings.METRICS_DIR:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f'{self.pid}.json')
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state(), f)
+        os.replace(tmp, path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """This process's registry; a forked worker starts its own"""
+    global _registry
+    if _registry is None or _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                _registry = Registry()
+    return _registry
+
+
+def reset_registry():
+    """Forget this process's totals, e.g. the requests made by main/warmup.py"""
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+@atexit.register
+def _dump_at_exit():
+    if _registry is not None and _registry.pid == os.getpid():
+        try:
+            _registry.dump()
+        except OSError:
+            pass
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def stop_request(token):
+    _current.reset(token)
+
+
+def finish_request(request, response, stats, started):
+    """Record `response`, or arrange to once its streamed body is sent"""
+    def done(size):
+        get_registry().observe(
+            view_name(request), request.method, response.status_code,
+            time.perf_counter() - started, stats, size,
+        )
+
+    if not response.streaming:
+        done(len(response.content))
+    elif response.is_async:
+        response.streaming_content = _astreamed(response.streaming_content, stats, done)
+    else:
+        response.streaming_content = _streamed(response.streaming_content, stats, done)
+    return response
+
+
+def _streamed(chunks, stats, done):
+    # Streamed bodies render and query after the middleware has returned
+    chunks = iter(chunks)
+    size = 0
+    try:
+        while True:
+            token = _current.set(stats)
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                _current.reset(token)
+            size += len(chunk)
+            yield chunk
+    finally:
+        done(size)
+
+
+async def _astreamed(chunks, stats, done):
+    chunks = aiter(chunks)
+    size = 0
+    try:
+        while True:
+            token = _current.set(stats)
+            try:
+                chunk = await anext(chunks)
+            except StopAsyncIteration:
+                return
+            finally:
+                _current.reset(token)
+            size += len(chunk)
+            yield chunk
+    finally:
+        done(size)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Someone else's process
+        return True
+    return True
+
+
+def collect():
+    """
+    Totals across every live process that has written to METRICS_DIR.
+    Files of processes that have exited are removed, so a restart or a
+    reused directory doesn't add stale counters to the current ones.
+    """
+    registry = get_registry()
+    registry.dump()
+    states = []
+    if settings.METRICS_DIR:
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+            pid = os.path.basename(path)[:-len('.json')]
+            if pid.isdigit() and not _alive(int(pid)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    else:
+        states.append(registry.state())
+
+    counters, histograms = {}, {}
+    for state in states:
+        for name, labels, value in state['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, series in state['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(series))
+            for i, value in enumerate(series):
+                total[i] += value
+    return counters, histograms
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def exposition(counters, histograms):
+    """Render merged totals in the Prometheus text format"""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            for (metric, labels), series in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, series):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels, le=bound)} {cumulative}')
+                cumulative += series[len(LATENCY_BUCKETS)]
+                lines.append(f'{name}_bucket{_format_labels(labels, le="+Inf")} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {series[-1]:.6f}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        else:
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    number = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{_format_labels(labels)} {number}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    /metrics, for staff users or a scraper sending the bearer token in
+    METRICS_TOKEN
+    """
+    user = getattr(request, 'user', None)
+    allowed = bool(user and user.is_active and user.is_staff)
+    if not allowed and settings.METRICS_TOKEN:
+        allowed = constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {settings.METRICS_TOKEN}'
+        )
+    if not allowed:
+        return HttpResponseForbidden("Metrics are only available to staff.")
+    response = HttpResponse(
+        exposition(*collect()), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,62 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .analytics import record
+from .metrics import finish_request, start_request, stop_request
+
+
+class PageViewMiddleware:
+    """Queues every page view for the analytics pipeline (main/analytics.py)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return record(request, response, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return record(request, response, started)
+
+
+class MetricsMiddleware:
+    """Times every request for /metrics (main/metrics.py); goes first in MIDDLEWARE"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_request(token)
+        return finish_request(request, response, stats, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_request(token)
+        return finish_request(request, response, stats, started)
@@ -0,0 +1,62 @@
+# Generated by Django 5.2 on 2026-10-18 02:27
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def split_technologies(apps, schema_editor):
+    Project = apps.get_model('main', 'Project')
+    Technology = apps.get_model('main', 'Technology')
+
+    # Names fit (the old column was 300 characters too); a slug can grow
+    # past that, since '#' becomes 'sharp'
+    name_length = Technology._meta.get_field('name').max_length
+    slug_length = Technology._meta.get_field('slug').max_length
+
+    by_slug = {tech.slug: tech for tech in Technology.objects.all()}
+    for project in Project.objects.all():
+        techs = []
+        for name in project.technologies.split(','):
+            name = name.strip()[:name_length]
+            slug = slugify(name.replace('+', 'p').replace('#', 'sharp'))[:slug_length]
+            if not slug:
+                continue
+            if slug not in by_slug:
+                by_slug[slug] = Technology.objects.create(name=name, slug=slug)
+            techs.append(by_slug[slug])
+        project.stack.set(techs)
+
+
+def join_technologies(apps, schema_editor):
+    Project = apps.get_model('main', 'Project')
+    for project in Project.objects.prefetch_related('stack'):
+        project.technologies = ', '.join(tech.name for tech in project.stack.all())
+        project.save(update_fields=['technologies'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=300, unique=True)),
+                ('slug', models.SlugField(max_length=300, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Technologies',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='stack',
+            field=models.ManyToManyField(blank=True, related_name='projects', to='main.technology'),
+        ),
+        migrations.RunPython(split_technologies, join_technologies),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_technology'),
+    ]
+
+    operations = [
+        # A default lets the column be re-added on reverse before
+        # 0004 fills it back in from the technology table
+        migrations.AlterField(
+            model_name='project',
+            name='technologies',
+            field=models.CharField(blank=True, default='', help_text='Comma-separated technologies', max_length=300),
+        ),
+        migrations.RemoveField(
+            model_name='project',
+            name='technologies',
+        ),
+    ]
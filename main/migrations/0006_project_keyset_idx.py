@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_remove_project_technologies'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='project',
+            options={'ordering': ['-created_date', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-created_date', '-id'], name='project_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Full-text search tables; their sync triggers are (re)created by
+# main.search.install_search_index after every migrate.
+
+from django.db import migrations
+
+
+TABLES = (
+    ('main_project', ('title', 'description')),
+    ('main_experience', ('position', 'company', 'description')),
+    ('main_education', ('degree', 'institution', 'field_of_study', 'description')),
+    ('main_certification', ('name', 'issuing_organization', 'credential_id')),
+    ('main_contact', ('subject', 'name', 'email', 'message')),
+)
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for source, columns in TABLES:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {source}_fts USING fts5("
+            f"{', '.join(columns)}, content='{source}', content_rowid='id', "
+            f"tokenize='porter unicode61')"
+        )
+        schema_editor.execute(f"INSERT INTO {source}_fts({source}_fts) VALUES ('rebuild')")
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for source, _ in TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {source}_fts_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {source}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_project_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
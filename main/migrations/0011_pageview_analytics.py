@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_dashboardcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=300)),
+                ('referrer', models.CharField(blank=True, help_text='Referring host, blank for direct or internal', max_length=200)),
+                ('agent', models.CharField(help_text='Coarse browser family', max_length=30)),
+                ('status', models.PositiveSmallIntegerField()),
+                ('latency_ms', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PageViewDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(choices=[('path', 'Path'), ('referrer', 'Referrer'), ('agent', 'Browser'), ('status', 'Status')], max_length=10)),
+                ('value', models.CharField(blank=True, max_length=300)),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', 'day'], name='pageview_day_dimension_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'dimension', 'value'), name='pageview_day_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PageViewHour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('path', models.CharField(max_length=300)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('latency_total_ms', models.BigIntegerField(default=0)),
+                ('latency_max_ms', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hour', 'path'), name='pageview_hour_unique')],
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from django.utils.text import slugify
 # Create your models here.
 class Profile(models.Model):
     name = models.CharField(max_length=100)
@@ -13,6 +15,7 @@ class Profile(models.Model):
     github = models.URLField(blank=True)
     linkedin = models.URLField(blank=True)
     twitter = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return self.name
@@ -45,6 +48,7 @@ class Skill(models.Model):
         default='fa'
     )
     icon = models.CharField(max_length=50, help_text="Font Awesome icon class")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return self.name
@@ -53,24 +57,72 @@ class Skill(models.Model):
         ordering = ['-proficiency']
 
 
+def tech_slug(name):
+    """Slug that keeps C, C++ and C# apart"""
+    return slugify(name.strip().replace('+', 'p').replace('#', 'sharp'))[:300]
+
+
+class Technology(models.Model):
+    # As wide as the comma-separated field it replaced, so no entry is cut
+    name = models.CharField(max_length=300, unique=True)
+    slug = models.SlugField(max_length=300, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    def __str__(self):
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = tech_slug(self.name)
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_names(cls, names):
+        """Return Technology rows for a comma-separated string, creating missing ones"""
+        if isinstance(names, str):
+            names = names.split(',')
+        by_slug = {}
+        for name in names:
+            name = name.strip()
+            slug = tech_slug(name)
+            if slug and slug not in by_slug:
+                by_slug[slug] = name
+        existing = {tech.slug: tech for tech in cls.objects.filter(slug__in=by_slug)}
+        return [
+            existing.get(slug) or cls.objects.get_or_create(slug=slug, defaults={'name': name})[0]
+            for slug, name in by_slug.items()
+        ]
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = "Technologies"
+
+
 class Project(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     image = models.ImageField(upload_to='projects/')
-    technologies = models.CharField(max_length=300, help_text="Comma-separated technologies")
+    stack = models.ManyToManyField(Technology, related_name='projects', blank=True)
     github_link = models.URLField(blank=True)
     live_link = models.URLField(blank=True)
     is_featured = models.BooleanField(default=False)
     created_date = models.DateField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return self.title
     
     def get_tech_list(self):
-        return [tech.strip() for tech in self.technologies.split(',')]
+        # Served from the prefetch cache when loaded with prefetch_related('stack')
+        return [tech.name for tech in self.stack.all()]
     
     class Meta:
-        ordering = ['-created_date']
+        # id breaks ties between projects created on the same day so the
+        # order is total, which keyset pagination relies on
+        ordering = ['-created_date', '-id']
+        indexes = [
+            models.Index(fields=['-created_date', '-id'], name='project_keyset_idx'),
+        ]
 
 
 class Experience(models.Model):
@@ -80,6 +132,7 @@ class Experience(models.Model):
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)
     is_current = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return f"{self.position} at {self.company}"
@@ -96,6 +149,7 @@ class Education(models.Model):
     end_date = models.DateField(null=True, blank=True)
     grade = models.CharField(max_length=50, blank=True)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return f"{self.degree} - {self.institution}"
@@ -110,6 +164,7 @@ class Certification(models.Model):
     issue_date = models.DateField()
     credential_id = models.CharField(max_length=100, blank=True)
     credential_url = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return self.name
@@ -130,7 +185,12 @@ class Contact(models.Model):
         return f"{self.name} - {self.subject}"
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Newest-first inbox, with and without the read/unread filter
+            models.Index(fields=['-created_at', '-id'], name='contact_keyset_idx'),
+            models.Index(fields=['is_read', '-created_at', '-id'], name='contact_inbox_idx'),
+        ]
 
 
 class Testimonial(models.Model):
@@ -142,6 +202,108 @@ class Testimonial(models.Model):
     rating = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)]
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
-        return f"{self.name} - {self.company}"
\ No newline at end of file
+        return f"{self.name} - {self.company}"
+
+class OutboundEmail(models.Model):
+    """Email queued by a request and delivered later by the send_outbox command"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.TextField(help_text="Comma-separated recipients")
+    reply_to = models.CharField(max_length=254, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+    def get_recipients(self):
+        return [address.strip() for address in self.to.split(',') if address.strip()]
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+
+class DashboardCounter(models.Model):
+    """Running total behind the admin dashboard, kept up to date by main.counters"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class PageView(models.Model):
+    """Raw page view, written in batches by main.analytics and removed once rolled up"""
+    path = models.CharField(max_length=300)
+    referrer = models.CharField(max_length=200, blank=True, help_text="Referring host, blank for direct or internal")
+    agent = models.CharField(max_length=30, help_text="Coarse browser family")
+    status = models.PositiveSmallIntegerField()
+    latency_ms = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.path} ({self.status})"
+
+
+class PageViewHour(models.Model):
+    """Views of one path in one hour"""
+    hour = models.DateTimeField()
+    path = models.CharField(max_length=300)
+    views = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    latency_total_ms = models.BigIntegerField(default=0)
+    latency_max_ms = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.path}: {self.views}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'path'], name='pageview_hour_unique'),
+        ]
+
+
+class PageViewDay(models.Model):
+    """Views in one day broken down by path, referrer, agent or status"""
+    DIMENSION_CHOICES = [
+        ('path', 'Path'),
+        ('referrer', 'Referrer'),
+        ('agent', 'Browser'),
+        ('status', 'Status'),
+    ]
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=300, blank=True)
+    views = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}={self.value}: {self.views}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'dimension', 'value'], name='pageview_day_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'day'], name='pageview_day_dimension_idx'),
+        ]
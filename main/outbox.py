@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def enqueue_email(subject, body, to, from_email=None, reply_to=''):
+    """
+    Queue an email for the send_outbox worker.
+
+    Call this inside the same transaction as the write it reports on, so the
+    email exists if and only if that write was committed.
+    """
+    if isinstance(to, str):
+        to = [to]
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL or '',
+        to=','.join(address for address in to if address),
+        reply_to=reply_to,
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 1, 2, 4, ... minutes, capped"""
+    base = getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 60)
+    cap = getattr(settings, 'OUTBOX_RETRY_MAX_SECONDS', 60 * 60)
+    return timedelta(seconds=min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+def claim_batch(batch_size, lease_seconds=300):
+    """
+    Lease up to batch_size due messages to this worker.
+
+    Each row is claimed with a conditional UPDATE on its next_attempt_at, so
+    two workers draining the same outbox never send the same message twice.
+    """
+    now = timezone.now()
+    candidates = (
+        OutboundEmail.objects
+        .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')[:batch_size]
+    )
+    lease_until = now + timedelta(seconds=lease_seconds)
+    claimed = []
+    for item in candidates:
+        updated = OutboundEmail.objects.filter(
+            pk=item.pk,
+            status=OutboundEmail.STATUS_PENDING,
+            next_attempt_at=item.next_attempt_at,
+        ).update(next_attempt_at=lease_until)
+        if updated:
+            claimed.append(item)
+    return claimed
+
+
+def deliver(items, connection=None, max_attempts=None):
+    """
+    Send claimed messages over one reused connection.
+
+    Returns a (sent, retried, dead) tuple. Messages that keep failing are
+    moved to the dead status after max_attempts tries.
+    """
+    if max_attempts is None:
+        max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+    sent = retried = dead = 0
+    if not items:
+        return sent, retried, dead
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception:
+        # The failure is recorded per message below when send_messages raises
+        pass
+
+    try:
+        for item in items:
+            message = EmailMessage(
+                subject=item.subject,
+                body=item.body,
+                from_email=item.from_email or None,
+                to=item.get_recipients(),
+                reply_to=[item.reply_to] if item.reply_to else None,
+                connection=connection,
+            )
+            item.attempts += 1
+            try:
+                connection.send_messages([message])
+            except Exception as exc:
+                item.last_error = f"{exc.__class__.__name__}: {exc}"
+                if item.attempts >= max_attempts:
+                    item.status = OutboundEmail.STATUS_DEAD
+                    dead += 1
+                else:
+                    item.next_attempt_at = timezone.now() + retry_delay(item.attempts)
+                    retried += 1
+                item.save(update_fields=['attempts', 'status', 'next_attempt_at', 'last_error'])
+            else:
+                item.status = OutboundEmail.STATUS_SENT
+                item.sent_at = timezone.now()
+                item.last_error = ''
+                item.save(update_fields=['attempts', 'status', 'sent_at', 'last_error'])
+                sent += 1
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    return sent, retried, dead
@@ -0,0 +1,72 @@
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+
+
+# Largest primary key SQLite (and a bigint column) can store
+MAX_ID = 2 ** 63 - 1
+
+
+def pack_cursor(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def unpack_cursor(cursor, parse_date):
+    """Return the payload of a packed position, or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        payload['d'] = parse_date(payload['d'])
+        payload['id'] = int(payload['id'])
+    except (ValueError, TypeError, KeyError, AttributeError, OverflowError):
+        return None
+    # Tampered values that would only fail once they reach the database
+    if not 0 < payload['id'] <= MAX_ID or not isinstance(payload.get('tech', ''), str):
+        return None
+    return payload
+
+
+def encode_cursor(project, **extra):
+    """Opaque, URL-safe position just after `project` in (-created_date, -id) order"""
+    payload = {'d': project.created_date.isoformat(), 'id': project.pk}
+    payload.update({key: value for key, value in extra.items() if value})
+    return pack_cursor(payload)
+
+
+def decode_cursor(cursor):
+    """Return the cursor payload, or None if it is missing or malformed"""
+    return unpack_cursor(cursor, datetime.date.fromisoformat)
+
+
+def seek(queryset, position=None):
+    """`queryset` ordered newest first, starting after `position`"""
+    queryset = queryset.order_by('-created_date', '-id')
+    if position is not None:
+        queryset = queryset.filter(
+            Q(created_date__lt=position['d'])
+            | Q(created_date=position['d'], id__lt=position['id'])
+        )
+    return queryset
+
+
+def keyset_page(queryset, position=None, size=9):
+    """
+    Return (items, has_more) for the page after `position`.
+
+    Seeks on the (created_date, id) index instead of using OFFSET, so every
+    page costs the same no matter how deep it is, and rows inserted while a
+    visitor scrolls never shift or duplicate the pages they have yet to see.
+    """
+    items = list(seek(queryset, position)[:size + 1])
+    return items[:size], len(items) > size
+
+
+async def akeyset_page(queryset, position=None, size=9):
+    """keyset_page() through the async ORM"""
+    items = [item async for item in seek(queryset, position)[:size + 1]]
+    return items[:size], len(items) > size
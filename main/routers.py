@@ -0,0 +1,109 @@
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA = 'replica'
+
+# Depth of the primary's atomic blocks when a read_replica view started,
+# or None outside such a view
+_use_replica = ContextVar('portfolio_use_replica', default=None)
+
+
+def _atomic_depth():
+    return len(connections[DEFAULT_DB_ALIAS].atomic_blocks)
+
+
+def read_alias():
+    """
+    Alias for raw SQL reads, which the router never sees. A transaction the
+    view opens itself reads from the primary, so it sees its own writes.
+    """
+    depth = _use_replica.get()
+    if depth is not None and REPLICA in settings.DATABASES and _atomic_depth() <= depth:
+        return REPLICA
+    return DEFAULT_DB_ALIAS
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads made inside a `read_replica` view to the read-only replica
+    connection; everything else, and every write, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+def _streamed(chunks, depth):
+    # Set around each step rather than across yields: the consumer's
+    # context must not be left pointing at the replica between chunks
+    chunks = iter(chunks)
+    while True:
+        token = _use_replica.set(depth)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _use_replica.reset(token)
+        yield chunk
+
+
+async def _astreamed(chunks, depth):
+    chunks = aiter(chunks)
+    while True:
+        token = _use_replica.set(depth)
+        try:
+            chunk = await anext(chunks)
+        except StopAsyncIteration:
+            return
+        finally:
+            _use_replica.reset(token)
+        yield chunk
+
+
+def _route_stream(response, depth):
+    # Streamed bodies query after the view has returned
+    if response.streaming:
+        wrap = _astreamed if response.is_async else _streamed
+        response.streaming_content = wrap(response.streaming_content, depth)
+    return response
+
+
+def read_replica(view_func):
+    """Run a read-only view's queries, streamed body included, on the replica"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            depth = _atomic_depth()
+            token = _use_replica.set(depth)
+            try:
+                return _route_stream(await view_func(request, *args, **kwargs), depth)
+            finally:
+                _use_replica.reset(token)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        depth = _atomic_depth()
+        token = _use_replica.set(depth)
+        try:
+            return _route_stream(view_func(request, *args, **kwargs), depth)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
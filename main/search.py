@@ -0,0 +1,227 @@
+import re
+from dataclasses import dataclass
+
+from django.db import connection, connections, transaction
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .routers import read_alias
+
+
+@dataclass(frozen=True)
+class SearchTable:
+    """An SQLite FTS5 external-content index over one model table"""
+    kind: str
+    source: str
+    columns: tuple
+    public: bool = True
+
+    @property
+    def name(self):
+        return f'{self.source}_fts'
+
+
+# Contact messages are indexed for the admin only, never for /search/
+SEARCH_TABLES = {
+    table.kind: table for table in (
+        SearchTable('project', 'main_project', ('title', 'description')),
+        SearchTable('experience', 'main_experience', ('position', 'company', 'description')),
+        SearchTable('education', 'main_education', ('degree', 'institution', 'field_of_study', 'description')),
+        SearchTable('certification', 'main_certification', ('name', 'issuing_organization', 'credential_id')),
+        SearchTable('contact', 'main_contact', ('subject', 'name', 'email', 'message'), public=False),
+    )
+}
+
+RESULT_URLS = {
+    'project': lambda pk: reverse('projects'),
+    'experience': lambda pk: reverse('about'),
+    'education': lambda pk: reverse('about') + '#education-detail',
+    'certification': lambda pk: reverse('about') + '#certifications-detail',
+}
+
+# Control characters can't occur in indexed text, so they are safe markers
+# to swap for <mark> tags after HTML-escaping the highlighted output
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def search_available(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+MAX_QUERY_WORDS = 16
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 query matching every word as a prefix, and
+    words between double quotes as an exact phrase. Only words reach FTS5,
+    each one quoted, so operators and stray quotes are never a syntax error.
+    """
+    terms, budget = [], MAX_QUERY_WORDS
+    for phrase, word in re.findall(r'"([^"]*)"|(\w+)', text or ''):
+        words = re.findall(r'\w+', phrase or word)[:budget]
+        if not words:
+            continue
+        budget -= len(words)
+        terms.append(f'"{" ".join(words)}"' if phrase else f'"{word}"*')
+    return ' '.join(terms)
+
+
+def _highlighted(value):
+    return mark_safe(
+        escape(value or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    )
+
+
+def create_table_sql(table):
+    columns = ', '.join(table.columns)
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table.name} USING fts5("
+        f"{columns}, content='{table.source}', content_rowid='id', "
+        f"tokenize='porter unicode61')"
+    )
+
+
+def trigger_sql(table):
+    """
+    Triggers that keep the index in step with its source table.
+
+    The update trigger only fires when an indexed column is assigned, so
+    bulk updates such as marking messages read leave the index alone.
+    """
+    columns = ', '.join(table.columns)
+    new = ', '.join(f'new.{column}' for column in table.columns)
+    old = ', '.join(f'old.{column}' for column in table.columns)
+    delete_old = (
+        f"INSERT INTO {table.name}({table.name}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    insert_new = f"INSERT INTO {table.name}(rowid, {columns}) VALUES (new.id, {new});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table.name}_ai AFTER INSERT ON {table.source} "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table.name}_ad AFTER DELETE ON {table.source} "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table.name}_au AFTER UPDATE OF {columns} ON {table.source} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def install_search_index(using=None):
+    """
+    Create the FTS tables and triggers if they are missing.
+
+    Runs after every migrate because SQLite drops a table's triggers
+    whenever Django rebuilds that table to alter it.
+    """
+    using = using or connection
+    if not search_available(using):
+        return
+    with using.cursor() as cursor:
+        for table in SEARCH_TABLES.values():
+            cursor.execute(create_table_sql(table))
+            for sql in trigger_sql(table):
+                cursor.execute(sql)
+
+
+def rebuild_search_index(batch_size=1000, kinds=None, progress=None):
+    """Repopulate the index from the source tables in id-ordered batches"""
+    install_search_index()
+    totals = {}
+    for table in SEARCH_TABLES.values():
+        if kinds and table.kind not in kinds:
+            continue
+        columns = ', '.join(table.columns)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {table.name}({table.name}) VALUES ('delete-all')")
+
+        last_id, count = 0, 0
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT id FROM {table.source} WHERE id > %s ORDER BY id LIMIT 1 OFFSET %s",
+                    [last_id, batch_size - 1],
+                )
+                row = cursor.fetchone()
+                upper = row[0] if row else None
+                bound = "AND id <= %s" if upper is not None else ""
+                params = [last_id, upper] if upper is not None else [last_id]
+                cursor.execute(
+                    f"INSERT INTO {table.name}(rowid, {columns}) "
+                    f"SELECT id, {columns} FROM {table.source} WHERE id > %s {bound}",
+                    params,
+                )
+                count += cursor.rowcount
+            if progress:
+                progress(table.kind, count)
+            if upper is None:
+                break
+            last_id = upper
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {table.name}({table.name}) VALUES ('optimize')")
+        totals[table.kind] = count
+    return totals
+
+
+def matching_ids(kind, text):
+    """
+    Subquery of primary keys matching `text`, for use in pk__in filters.
+
+    Returns None when the text has no searchable words or FTS is
+    unavailable, so callers can fall back to a regular search.
+    """
+    query = build_match_query(text)
+    if not query or not search_available():
+        return None
+    table = SEARCH_TABLES[kind]
+    return RawSQL(f"SELECT rowid FROM {table.name} WHERE {table.name} MATCH %s", [query])
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    kind: str
+    object_id: int
+    title: str
+    snippet: str
+    rank: float
+    url: str
+
+
+def search(text, kinds=None, limit=20):
+    """Ranked, highlighted matches across the public indexes"""
+    query = build_match_query(text)
+    if not query or not search_available():
+        return []
+
+    results = []
+    # The replica when called from a read_replica view
+    with connections[read_alias()].cursor() as cursor:
+        for table in SEARCH_TABLES.values():
+            if kinds is None and not table.public:
+                continue
+            if kinds is not None and table.kind not in kinds:
+                continue
+            cursor.execute(
+                f"SELECT rowid, highlight({table.name}, 0, %s, %s), "
+                f"snippet({table.name}, -1, %s, %s, '…', 16), bm25({table.name}) "
+                f"FROM {table.name} WHERE {table.name} MATCH %s "
+                f"ORDER BY bm25({table.name}) LIMIT %s",
+                [MARK_START, MARK_END, MARK_START, MARK_END, query, limit],
+            )
+            url = RESULT_URLS.get(table.kind, lambda pk: '')
+            for rowid, title, snippet, rank in cursor.fetchall():
+                results.append(SearchResult(
+                    kind=table.kind,
+                    object_id=rowid,
+                    title=_highlighted(title),
+                    snippet=_highlighted(snippet),
+                    rank=rank,
+                    url=url(rowid),
+                ))
+
+    # bm25 scores are negative; lower is a better match
+    results.sort(key=lambda result: result.rank)
+    return results[:limit]
@@ -0,0 +1,120 @@
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.utils import timezone
+
+from .cache import bump_content_version
+from .counters import counted_models, record_delete, record_save, remember
+from .export import schedule_export
+from .icons import schedule_sprite_rebuild
+from .images import schedule_variants, variants_built
+from .freshness import CONTENT_MODELS
+from .search import install_search_index
+from .models import Profile, Skill, Project, Testimonial, Technology
+
+
+# Uploaded image fields that get responsive variants
+IMAGE_FIELDS = (
+    (Project, 'image'),
+    (Profile, 'profile_image'),
+    (Testimonial, 'image'),
+)
+
+
+def content_changed(sender, **kwargs):
+    # After the commit: a request bumping into the new version before then
+    # would cache the old rows under it
+    transaction.on_commit(bump_content_version)
+    schedule_export()
+
+
+def touch_projects(projects):
+    """Move updated_at on projects whose technologies changed"""
+    projects.update(updated_at=timezone.now())
+    transaction.on_commit(bump_content_version)
+
+
+def project_stack_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch_projects(Project.objects.filter(pk=instance.pk))
+    elif action in ('post_add', 'post_remove'):
+        touch_projects(Project.objects.filter(pk__in=pk_set))
+    elif action == 'pre_clear':
+        # The links are gone by post_clear
+        touch_projects(instance.projects.all())
+
+
+def technology_changed(sender, instance, **kwargs):
+    # A renamed or deleted technology shows on every project using it
+    touch_projects(instance.projects.all())
+
+
+def image_fields(sender):
+    return [field_name for model, field_name in IMAGE_FIELDS if model is sender]
+
+
+def image_before_save(sender, instance, update_fields=None, **kwargs):
+    """Note the stored image names, to tell an upload from any other edit"""
+    fields = [name for name in image_fields(sender) if update_fields is None or name in update_fields]
+    if not fields or instance._state.adding:
+        instance._image_names = {}
+        return
+    instance._image_names = (
+        sender._base_manager.filter(pk=instance.pk).values(*fields).first() or {}
+    )
+
+
+def image_saved(sender, instance, update_fields=None, **kwargs):
+    previous = getattr(instance, '_image_names', {})
+    for field_name in image_fields(sender):
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        name = getattr(instance, field_name).name
+        if name and name != previous.get(field_name):
+            schedule_variants(name)
+
+
+def image_variants_built(sender, name, **kwargs):
+    # Cards cached per updated_at would keep the plain <img> otherwise
+    for model, field_name in IMAGE_FIELDS:
+        model.objects.filter(**{field_name: name}).update(updated_at=timezone.now())
+
+
+def skill_icon_changed(sender, **kwargs):
+    schedule_sprite_rebuild()
+
+
+def counted_before_save(sender, instance, raw, **kwargs):
+    remember(instance)
+
+
+def counted_saved(sender, instance, created, **kwargs):
+    record_save(instance, created)
+
+
+def counted_deleted(sender, instance, **kwargs):
+    record_delete(instance)
+
+
+def install_search_triggers(sender, using, **kwargs):
+    install_search_index(connections[using])
+
+
+def connect_signals():
+    for model in CONTENT_MODELS:
+        post_save.connect(content_changed, sender=model, dispatch_uid=f'content_changed_save_{model.__name__}')
+        post_delete.connect(content_changed, sender=model, dispatch_uid=f'content_changed_delete_{model.__name__}')
+    m2m_changed.connect(content_changed, sender=Project.stack.through, dispatch_uid='content_changed_project_stack')
+    m2m_changed.connect(project_stack_changed, sender=Project.stack.through, dispatch_uid='project_stack_changed')
+    post_save.connect(technology_changed, sender=Technology, dispatch_uid='technology_changed_save')
+    pre_delete.connect(technology_changed, sender=Technology, dispatch_uid='technology_changed_delete')
+    for model, _ in IMAGE_FIELDS:
+        pre_save.connect(image_before_save, sender=model, dispatch_uid=f'image_before_save_{model.__name__}')
+        post_save.connect(image_saved, sender=model, dispatch_uid=f'image_saved_{model.__name__}')
+    variants_built.connect(image_variants_built, dispatch_uid='image_variants_built')
+    post_save.connect(skill_icon_changed, sender=Skill, dispatch_uid='skill_icon_changed_save')
+    post_delete.connect(skill_icon_changed, sender=Skill, dispatch_uid='skill_icon_changed_delete')
+    for model in counted_models():
+        pre_save.connect(counted_before_save, sender=model, dispatch_uid=f'counted_before_save_{model.__name__}')
+        post_save.connect(counted_saved, sender=model, dispatch_uid=f'counted_saved_{model.__name__}')
+        post_delete.connect(counted_deleted, sender=model, dispatch_uid=f'counted_deleted_{model.__name__}')
@@ -0,0 +1,48 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .analytics import analytics_summary
+from .counters import dashboard_stats
+
+
+class CustomAdminSite(admin.AdminSite):
+    site_header = "Portfolio Administration"
+    site_title = "Portfolio Admin"
+    index_title = "Dashboard"
+    
+    def get_urls(self):
+        return [
+            path('analytics/', self.admin_view(self.analytics_view), name='analytics'),
+        ] + super().get_urls()
+    
+    def index(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        
+        # Counter-cached statistics (main/counters.py), one query
+        stats = dashboard_stats()
+        totals = stats['totals']
+        extra_context['total_projects'] = totals['projects']
+        extra_context['featured_projects'] = totals['featured_projects']
+        extra_context['total_skills'] = totals['skills']
+        extra_context['unread_contacts'] = totals['unread_contacts']
+        extra_context['total_certifications'] = totals['certifications']
+        extra_context['new_contacts_trend'] = stats['trend']
+        extra_context['new_contacts_peak'] = max(count for _, count in stats['trend'])
+        extra_context['new_contacts_total'] = sum(count for _, count in stats['trend'])
+        
+        return super().index(request, extra_context)
+    
+    def analytics_view(self, request):
+        """Traffic from the page view rollups (main/analytics.py)"""
+        if not request.user.has_perm('main.view_pageviewday'):
+            raise PermissionDenied
+        context = {
+            **self.each_context(request),
+            'title': "Analytics",
+            'subtitle': None,
+            **analytics_summary(),
+        }
+        request.current_app = self.name
+        return TemplateResponse(request, 'admin/analytics.html', context)
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+
+from .cache import aget_content_version, get_content_version
+from .models import (
+    Profile, Skill, Project, Experience,
+    Education, Certification, Testimonial, Technology
+)
+
+
+@dataclass(frozen=True)
+class ContentSnapshot:
+    """Read-only view of every public portfolio model, loaded in one pass"""
+    version: int
+    profile: Profile
+    skills: tuple
+    skills_by_category: MappingProxyType
+    featured_projects: tuple
+    technologies: tuple
+    experiences: tuple
+    education: tuple
+    certifications: tuple
+    testimonials: tuple
+
+    @property
+    def top_education(self):
+        return self.education[:2]
+
+    @property
+    def top_certifications(self):
+        return self.certifications[:3]
+
+    @property
+    def top_testimonials(self):
+        return self.testimonials[:3]
+
+
+def snapshot_queries():
+    """The independent reads a snapshot is built from, as callables"""
+    return {
+        'profile': Profile.objects.first,
+        'skills': lambda: tuple(Skill.objects.all()),
+        'featured_projects': lambda: tuple(Project.objects.filter(is_featured=True).prefetch_related('stack')),
+        'technologies': lambda: tuple(Technology.objects.filter(projects__isnull=False).distinct()),
+        'experiences': lambda: tuple(Experience.objects.all()),
+        'education': lambda: tuple(Education.objects.all()),
+        'certifications': lambda: tuple(Certification.objects.all()),
+        'testimonials': lambda: tuple(Testimonial.objects.all()),
+    }
+
+
+def build_snapshot(version, results):
+    by_category = {key: [] for key, _ in Skill.CATEGORY_CHOICES}
+    for skill in results['skills']:
+        by_category.setdefault(skill.category, []).append(skill)
+
+    return ContentSnapshot(
+        version=version,
+        skills_by_category=MappingProxyType(
+            {key: tuple(value) for key, value in by_category.items()}
+        ),
+        **results,
+    )
+
+
+def load_snapshot(version):
+    return build_snapshot(version, {name: query() for name, query in snapshot_queries().items()})
+
+
+def _run_isolated(query):
+    # Executor threads keep a connection of their own; recycle it the way a
+    # request would, per CONN_MAX_AGE and CONN_HEALTH_CHECKS
+    close_old_connections()
+    return query()
+
+
+async def aload_snapshot(version):
+    """
+    load_snapshot() for async callers, with the queries running concurrently.
+
+    The async ORM sends every query through the one thread-sensitive
+    executor, so gathering afirst()/async-for calls would still run them
+    back to back; each query gets a worker thread and connection instead.
+    That only pays off when queries wait on a network round trip: SQLite
+    answers in-process in well under a millisecond, so there the whole
+    load is a single hand-off.
+    """
+    if connection.vendor == 'sqlite':
+        return await sync_to_async(load_snapshot)(version)
+    queries = snapshot_queries()
+    results = await asyncio.gather(*(
+        sync_to_async(_run_isolated, thread_sensitive=False)(query) for query in queries.values()
+    ))
+    return build_snapshot(version, dict(zip(queries, results)))
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_snapshot():
+    """
+    Return the process-wide content snapshot, reloading it only when the
+    content version has moved since it was loaded.
+    """
+    global _snapshot
+    version = get_content_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = load_snapshot(version)
+        return _snapshot
+
+
+def clear_snapshot():
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+# Event loop -> (version, task) of the reload in flight on that loop
+_loading = weakref.WeakKeyDictionary()
+
+
+async def aget_snapshot():
+    """
+    get_snapshot() for async views: no thread hand-off while the snapshot
+    is current, and requests arriving during a reload wait for that reload.
+    """
+    global _snapshot
+    version = await aget_content_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    loop = asyncio.get_running_loop()
+    loading = _loading.get(loop)
+    if loading is None or loading[0] != version:
+        loading = _loading[loop] = (version, loop.create_task(aload_snapshot(version)))
+    # Shielded: a client disconnecting must not cancel everyone's reload
+    snapshot = await asyncio.shield(loading[1])
+    if _loading.get(loop) is loading:
+        del _loading[loop]
+    _snapshot = snapshot
+    return snapshot
@@ -0,0 +1,51 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip siblings are always written
+    brotli = None
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Content-hashed static files with .gz (and .br, if brotli is installed)
+    siblings written at collectstatic time, so they can be served with
+    far-future immutable caching and no per-request compression.
+    """
+    manifest_strict = False
+    compress_extensions = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.xml', '.ttf', '.otf', '.eot', '.ico')
+    compress_min_size = 256
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet (e.g. under the test runner): use the plain name
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not dry_run and hashed_name and not isinstance(processed, Exception):
+                self.compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        if not name.endswith(self.compress_extensions):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < self.compress_min_size:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content)))
+        for suffix, compressed in variants:
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,84 @@
+"""
+Early-flush rendering for the public pages.
+
+The head partial (critical CSS and stylesheet links) needs no view data, so
+it is sent as the first chunk, before the view builds its context. The
+browser starts fetching stylesheets and fonts while the queries run; the
+rest of the document follows as one chunk once it has been rendered.
+
+Only read-only pages stream: anything rendered after the response has
+passed back through the middleware cannot set the CSRF cookie or mark
+flashed messages as read, so the contact page keeps using render().
+"""
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+
+HEAD_TEMPLATE = 'partials/head.html'
+
+
+def render_head(request, template_name):
+    return render_to_string(HEAD_TEMPLATE, {'page_template': template_name}, request)
+
+
+def render_body(request, template_name, context):
+    return get_template(template_name).render(dict(context, head_streamed=True), request)
+
+
+def stream_chunks(request, template_name, get_context):
+    yield render_head(request, template_name)
+    yield render_body(request, template_name, get_context())
+
+
+async def astream_chunks(request, template_name, get_context):
+    # Template rendering may hit the ORM, which must stay off the event loop
+    yield await sync_to_async(render_head)(request, template_name)
+    yield await sync_to_async(lambda: render_body(request, template_name, get_context()))()
+
+
+def stream_render(request, template_name, get_context):
+    """
+    Like render(), but `get_context` is a callable run after the head has
+    been flushed. Under ASGI the chunks come from an async iterator, since
+    Django buffers a synchronous one there.
+    """
+    if not getattr(settings, 'PORTFOLIO_STREAMING_RENDER', False):
+        return render(request, template_name, get_context())
+
+    if isinstance(request, ASGIRequest):
+        chunks = astream_chunks(request, template_name, get_context)
+    else:
+        chunks = stream_chunks(request, template_name, get_context)
+    return StreamingHttpResponse(chunks, content_type='text/html; charset=utf-8')
+
+
+def stream_chunks_from_async(request, template_name, get_context):
+    yield render_head(request, template_name)
+    yield render_body(request, template_name, async_to_sync(get_context)())
+
+
+async def astream_chunks_from_async(request, template_name, get_context):
+    yield render_head(request, template_name)
+    yield render_body(request, template_name, await get_context())
+
+
+async def astream_render(request, template_name, get_context):
+    """
+    stream_render() for async views, with `get_context` a coroutine function.
+
+    The context must leave nothing for the templates to query (async views
+    attach the snapshot to the request), since the chunks are rendered on
+    the event loop. Under WSGI the generator is synchronous so the server
+    can still flush the head on its own.
+    """
+    if not getattr(settings, 'PORTFOLIO_STREAMING_RENDER', False):
+        return HttpResponse(render_to_string(template_name, await get_context(), request))
+
+    if isinstance(request, ASGIRequest):
+        chunks = astream_chunks_from_async(request, template_name, get_context)
+    else:
+        chunks = stream_chunks_from_async(request, template_name, get_context)
+    return StreamingHttpResponse(chunks, content_type='text/html; charset=utf-8')
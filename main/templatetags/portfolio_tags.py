@@ -0,0 +1,192 @@
+import asyncio
+
+from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from main.assets import asset_url as vendor_asset_url
+from main.cache import NON_BLOCKING_CACHES, fragment_cache_key, get_cache
+from main.critical import critical_css_for
+from main.icons import load_sprite, parse_icon, sprite_version, svg_symbol_id, symbol_id
+from main.images import available_widths, variant_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt='', css_class='', sizes='100vw', width=None, height=None, loading='lazy'):
+    """
+    Render an uploaded image as a <picture> with WebP and JPEG srcsets.
+
+    Falls back to a plain <img> of the original upload until the variants
+    have been generated.
+    """
+    if not image:
+        return ''
+
+    dimensions = format_html(' width="{}" height="{}"', width, height) if width and height else ''
+    widths = available_widths(image.name)
+    if not widths:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}"{} loading="{}" decoding="async">',
+            image.url, alt, css_class, dimensions, loading,
+        )
+
+    # The last variant is capped at the original's width, which can be less
+    # than the width in its name
+    try:
+        original_width = image.width
+    except (OSError, ValueError):
+        original_width = None
+    labels = [min(w, original_width) if original_width else w for w in widths]
+
+    def srcset(ext):
+        return format_html_join(
+            ', ', '{} {}w',
+            ((default_storage.url(variant_name(image.name, w, ext)), label) for w, label in zip(widths, labels)),
+        )
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}"{} loading="{}" decoding="async">'
+        '</picture>',
+        srcset('webp'), sizes,
+        default_storage.url(variant_name(image.name, widths[-1], 'jpg')), srcset('jpg'), sizes,
+        alt, css_class, dimensions, loading,
+    )
+
+
+@register.simple_tag
+def asset_url(name):
+    """URL of a vendored third-party asset (see main.assets.VENDOR_ASSETS)"""
+    return vendor_asset_url(name)
+
+
+@register.simple_tag
+def icon(classes, extra=''):
+    """
+    A Font Awesome icon as <svg><use> into the inline sprite, e.g.
+    {% icon "fab fa-github" "fa-lg" %}. Falls back to the <i> webfont markup
+    for icons the sprite does not hold.
+    """
+    _, ids, _ = load_sprite()
+    style, name, rest = parse_icon(classes)
+    if name and symbol_id(style, name) in ids:
+        css_class = ' '.join(['svg-icon', *rest, *extra.split()])
+        return format_html(
+            '<svg class="{}" aria-hidden="true" focusable="false"><use href="#{}"></use></svg>',
+            css_class, symbol_id(style, name),
+        )
+    return format_html('<i class="{}" aria-hidden="true"></i>', f'{classes} {extra}'.strip())
+
+
+@register.simple_tag
+def skill_icon(skill, extra=''):
+    """A Skill's icon, whether it is a Font Awesome class or an SVG URL"""
+    if skill.icon_type != 'svg':
+        return icon(skill.icon, extra)
+    _, ids, _ = load_sprite()
+    if svg_symbol_id(skill.icon) in ids:
+        return format_html(
+            '<svg class="{}" role="img" aria-label="{}"><use href="#{}"></use></svg>',
+            f'svg-icon {extra}'.strip(), skill.name, svg_symbol_id(skill.icon),
+        )
+    return format_html('<img src="{}" alt="{}" width="40" height="40" class="mb-3">', skill.icon, skill.name)
+
+
+@register.simple_tag
+def icon_sprite():
+    """The built icon sprite (`manage.py build_icons`), inlined once per page"""
+    markup, _, _ = load_sprite()
+    return mark_safe(markup)
+
+
+@register.simple_tag
+def icon_sprite_complete():
+    """Whether the sprite covers every icon, so the Font Awesome CSS can be dropped"""
+    return load_sprite()[2]
+
+
+def _page_critical_css(context):
+    # A streamed head is rendered on its own and is told the page template
+    name = context.get('page_template')
+    if name is None and getattr(context, 'template', None):
+        name = context.template.name
+    return critical_css_for(name)
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context):
+    """Inline the page template's critical CSS (`manage.py build_critical_css`)"""
+    css = _page_critical_css(context)
+    return format_html('<style>{}</style>', mark_safe(css)) if css else ''
+
+
+@register.simple_tag(takes_context=True)
+def stylesheet(context, href):
+    """
+    A stylesheet link, loaded without blocking render when the page has
+    critical CSS inlined to cover the first paint.
+    """
+    if not _page_critical_css(context):
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    return format_html(
+        '<link rel="stylesheet" href="{0}" media="print" onload="this.onload=null;this.media=\'all\'">'
+        '<noscript><link rel="stylesheet" href="{0}"></noscript>',
+        href,
+    )
+
+
+class CardCacheNode(template.Node):
+    def __init__(self, nodelist, obj, variant):
+        self.nodelist = nodelist
+        self.obj = obj
+        self.variant = variant
+
+    def render(self, context):
+        obj = self.obj.resolve(context)
+        timeout = getattr(settings, 'PORTFOLIO_FRAGMENT_CACHE_TIMEOUT', 0)
+        cache = get_cache()
+        if not timeout or obj is None or not self.cache_usable(cache):
+            return self.nodelist.render(context)
+
+        variant = [value.resolve(context) for value in self.variant]
+        key = fragment_cache_key(obj, *variant, assets=sprite_version())
+        html = cache.get(key)
+        if html is None:
+            html = self.nodelist.render(context)
+            cache.set(key, html, timeout)
+        return html
+
+    @staticmethod
+    def cache_usable(cache):
+        # Async views render on the event loop, which a network cache would block
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+        return isinstance(cache, NON_BLOCKING_CACHES)
+
+
+@register.tag
+def cardcache(parser, token):
+    """
+    Cache the markup of one object's card, e.g.
+    {% cardcache project "compact" %}...{% endcardcache %}.
+
+    The key is the object's model, pk and updated_at plus the variant
+    arguments, so pages rendering the same card share it and editing an
+    object re-renders only its own cards. The block must depend on nothing
+    but the object and the variant: loop counters and the like stay outside.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes the object to cache the card of")
+    nodelist = parser.parse(('endcardcache',))
+    parser.delete_first_token()
+    return CardCacheNode(
+        nodelist, parser.compile_filter(bits[1]), [parser.compile_filter(bit) for bit in bits[2:]],
+    )
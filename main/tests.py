@@ -1,3 +1,1386 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from smtplib import SMTPException
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.template import Context, Template, engines
+from django.templatetags.static import static
+from django.test import AsyncClient, Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve, reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from .admin import ContactAdmin
+from .analytics import record
+from .assets import VENDOR_ASSETS, asset_url, serve_static
+from .benchmark import admin_routes, load_baseline, measure_client, public_routes
+from .bulk_export import stream_export
+from .counters import TOTALS, count_total, dashboard_stats, reconcile
+from .critical import (
+    CRITICAL_PAGES, STYLESHEETS, artifact_path, extract, fold_selectors,
+    selector_matches, split_rules, split_selectors,
+)
+from .checks import check_shared_cache, check_vendored_assets
+from .changelist import CURSOR_VAR, DateDrillDownFilter, EstimatedCountPaginator, update_in_batches
+from .cache import fragment_cache_key, get_cache, get_content_version, page_cache_key
+from .export import export_site, export_targets, output_file, pop_pending
+from .freshness import page_etag
+from .icons import svg_to_symbol
+from .management.commands.benchmark_serving import reload_urls
+from .images import generate_variants
+from .metrics import collect, get_registry, reset_registry
+from .models import Certification, Contact, OutboundEmail, Project, Skill, Technology
+from .outbox import claim_batch, deliver, enqueue_email, retry_delay
+from .pagination import pack_cursor
+from .routers import read_alias, read_replica
+from .search import install_search_index, search
+from .snapshot import clear_snapshot, get_snapshot
+from .storage import brotli
+from .throttle import hit
+from .views import project_page
+from .warmup import warmup
+
+
+# The periodic content check adds a query to whichever request it lands in
+@override_settings(PORTFOLIO_CONTENT_CHECK_INTERVAL=None)
+class QueryBudgetTests(TransactionTestCase):
+    """
+    Every public route and admin page renders within the query counts stored
+    in the benchmark baseline, so an N+1 shows up in `manage.py test` without
+    running the full `manage.py benchmark_endpoints`.
+    """
+    # The public views read through the replica: in tests a second connection
+    # to the same database, which only sees committed rows
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.baseline = (load_baseline(settings.BENCHMARK_BASELINE) or {}).get('cold')
+        if not self.baseline:
+            self.skipTest("No benchmark baseline stored")
+        call_command('seed_portfolio', scale='small', stdout=StringIO())
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client = Client()
+        self.client.force_login(user)
+
+    def test_routes_within_baseline_queries(self):
+        routes = {**public_routes(), **admin_routes()}
+        results = measure_client(self.client, routes, repeat=1, cold=True)
+        for name, result in results.items():
+            with self.subTest(route=name):
+                self.assertIn(name, self.baseline, "Route missing from the benchmark baseline")
+                self.assertLessEqual(result['queries'], self.baseline[name]['queries'])
+
+
+class ContentVersionTests(TransactionTestCase):
+    """
+    Edits reach the public pages once committed, and a request served while
+    the edit's transaction is open doesn't cache the old content under the
+    new version.
+    """
+    databases = {'default', 'replica'}
+    skill = 'Elixir Test Skill'
+
+    def setUp(self):
+        get_cache().clear()
+        clear_snapshot()
+
+    def skills_page_lists_skill(self):
+        return self.skill in Client().get(reverse('skills')).getvalue().decode()
+
+    def test_read_during_transaction_does_not_pin_old_content(self):
+        self.assertFalse(self.skills_page_lists_skill())
+        version = get_content_version()
+        with transaction.atomic():
+            Skill.objects.create(name=self.skill, category='backend', proficiency=90)
+            self.assertEqual(get_content_version(), version)
+            self.assertFalse(self.skills_page_lists_skill())
+        self.assertGreater(get_content_version(), version)
+        self.assertTrue(self.skills_page_lists_skill())
+        self.assertIn(self.skill, [skill.name for skill in get_snapshot().skills])
+
+    def test_delete_reaches_pages_after_commit(self):
+        skill = Skill.objects.create(name=self.skill, category='backend', proficiency=90)
+        self.assertTrue(self.skills_page_lists_skill())
+        with transaction.atomic():
+            skill.delete()
+            self.assertTrue(self.skills_page_lists_skill())
+        self.assertFalse(self.skills_page_lists_skill())
+
+    @override_settings(PORTFOLIO_CONTENT_CHECK_INTERVAL=0)
+    def test_edit_from_another_process_is_picked_up(self):
+        skill = Skill.objects.create(name='Placeholder', category='backend', proficiency=90)
+        self.assertFalse(self.skills_page_lists_skill())
+        # No signal fires, as for a save in a process with its own cache
+        Skill.objects.filter(pk=skill.pk).update(name=self.skill, updated_at=timezone.now())
+        self.assertTrue(self.skills_page_lists_skill())
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {Skill._meta.db_table}')
+        self.assertFalse(self.skills_page_lists_skill())
+
+
+class ConditionalGetTests(TransactionTestCase):
+    """Public pages revalidate by ETag, which moves with deletes and deploys"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        clear_snapshot()
+
+    def test_delete_of_the_newest_row_changes_the_etag(self):
+        Skill.objects.create(name='Older', category='backend', proficiency=50)
+        Skill.objects.create(name='Newer', category='backend', proficiency=50)
+        response = Client().get(reverse('skills'))
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(Client().get(reverse('skills'), headers={'if-none-match': etag}).status_code, 304)
+
+        Skill.objects.get(name='Newer').delete()
+        response = Client().get(reverse('skills'), headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_page_cache_key_follows_the_release(self):
+        request = RequestFactory().get(reverse('skills'))
+        with mock.patch('main.freshness.release_token', return_value='a'):
+            before = page_cache_key(request, 1)
+        with mock.patch('main.freshness.release_token', return_value='b'):
+            self.assertNotEqual(page_cache_key(request, 1), before)
+
+    def test_fragment_cache_key_follows_the_release(self):
+        skill = Skill.objects.create(name='Card', category='backend', proficiency=50)
+        with mock.patch('main.freshness.release_token', return_value='a'):
+            before = fragment_cache_key(skill, 'card')
+        with mock.patch('main.freshness.release_token', return_value='b'):
+            self.assertNotEqual(fragment_cache_key(skill, 'card'), before)
+
+
+@override_settings(PORTFOLIO_STREAMING_RENDER=True)
+class StreamingRenderTests(TransactionTestCase):
+    """Public pages flush their head before loading data, and cache once sent in full"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        clear_snapshot()
+        Skill.objects.create(name='Streamed Skill', category='backend', proficiency=70)
+
+    def test_head_is_sent_before_the_context_is_built(self):
+        with mock.patch('main.views.get_snapshot', wraps=get_snapshot) as snapshot:
+            response = Client().get(reverse('skills'))
+            self.assertTrue(response.streaming)
+            chunks = iter(response.streaming_content)
+            head = next(chunks).decode()
+            snapshot.assert_not_called()
+            body = b''.join(chunks).decode()
+            snapshot.assert_called_once()
+        self.assertIn('<head>', head)
+        self.assertNotIn('Streamed Skill', head)
+        self.assertIn('Streamed Skill', body)
+
+    def test_streamed_body_matches_the_buffered_render(self):
+        streamed = Client().get(reverse('skills')).getvalue()
+        get_cache().clear()
+        with override_settings(PORTFOLIO_STREAMING_RENDER=False):
+            response = Client().get(reverse('skills'))
+        self.assertFalse(response.streaming)
+        # The two paths leave different blank lines around {% load %} and blocks
+        self.assertEqual(re.sub(rb'\s+', b' ', streamed).strip(), re.sub(rb'\s+', b' ', response.content).strip())
+
+    def test_page_is_cached_only_once_fully_sent(self):
+        response = Client().get(reverse('skills'))
+        chunks = iter(response.streaming_content)
+        next(chunks)
+        self.assertTrue(Client().get(reverse('skills')).streaming)
+        body = b''.join(chunks)
+
+        cached = Client().get(reverse('skills'))
+        self.assertFalse(cached.streaming)
+        self.assertTrue(cached.content.endswith(body))
+
+
+@override_settings(PORTFOLIO_STREAMING_RENDER=True)
+class CriticalCssTests(TransactionTestCase):
+    """build_critical_css renders every page, streamed or not, into BUILD_DIR"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        build_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, build_dir, ignore_errors=True)
+        self.enterContext(override_settings(BUILD_DIR=build_dir))
+
+    def test_command_builds_streamed_pages(self):
+        out = StringIO()
+        call_command('build_critical_css', stdout=out)
+        for template_name in CRITICAL_PAGES:
+            with self.subTest(template=template_name):
+                css = artifact_path(template_name).read_text()
+                self.assertIn('.navbar', css)
+        self.assertIn("Critical CSS built.", out.getvalue())
+
+    def test_extract_keeps_only_rules_for_the_fold(self):
+        html = (
+            '<html><body><nav class="navbar" id="top"></nav>'
+            '<section class="hero"></section><section></section>'
+            '<section class="below"></section></body></html>'
+        )
+        css = (
+            '.navbar{color:red}#top a{color:blue}.hero,.missing{margin:0}.below{margin:1px}'
+            '@media (min-width:1px){.hero{padding:0}.below{padding:0}}@keyframes spin{to{opacity:1}}'
+        )
+        self.assertEqual(
+            extract(html, [css]),
+            '.navbar{color:red}.hero{margin:0}@media (min-width:1px){.hero{padding:0}}',
+        )
+
+    def test_inlined_rules_only_use_selectors_from_the_page(self):
+        call_command('build_critical_css', template=['skills.html'], stdout=StringIO())
+        html = Client().get(reverse('skills')).getvalue().decode()
+        tags, classes, ids = fold_selectors(html)
+        inlined = re.search(r'<style>(.*?)</style>', html, re.S).group(1)
+        self.assertEqual(inlined, artifact_path('skills.html').read_text())
+
+        def selectors(css):
+            for prelude, block in split_rules(css):
+                if prelude.startswith('@media') or prelude.startswith('@supports'):
+                    yield from selectors(block)
+                elif block is not None and not prelude.startswith('@'):
+                    yield from split_selectors(prelude)
+
+        found = list(selectors(inlined))
+        self.assertTrue(found)
+        for selector in found:
+            self.assertTrue(selector_matches(selector, tags, classes, ids), selector)
+        # Rules for other templates' markup stay in the full stylesheet
+        for selector in ('.hero-section{', '.contact-info{', '.timeline{'):
+            self.assertNotIn(selector, inlined)
+        self.assertIn('.page-header{', inlined)
+
+    def test_stylesheets_load_without_blocking_render(self):
+        call_command('build_critical_css', template=['skills.html'], stdout=StringIO())
+        head = Client().get(reverse('skills')).getvalue().decode().split('</head>')[0]
+        links = re.findall(r'<link rel="stylesheet"[^>]*>', re.sub(r'<noscript>.*?</noscript>', '', head))
+        hrefs = [re.search(r'href="([^"]+)"', link).group(1) for link in links]
+        for path in STYLESHEETS:
+            self.assertIn(static(path), hrefs)
+        for link, href in zip(links, hrefs):
+            self.assertIn('media="print"', link)
+            self.assertIn("onload=\"this.onload=null;this.media='all'\"", link)
+            self.assertIn(f'<noscript><link rel="stylesheet" href="{href}"></noscript>', head)
+
+
+class SearchTests(TransactionTestCase):
+    """The FTS5 index follows its tables, ranks with bm25 and never exposes contacts"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+
+    def project(self, title, description=''):
+        return Project.objects.create(title=title, description=description)
+
+    def titles(self, text):
+        return [str(result.title).replace('<mark>', '').replace('</mark>', '')
+                for result in search(text, kinds=['project'])]
+
+    def test_triggers_follow_insert_update_and_delete(self):
+        project = self.project('Quokka tracker')
+        self.assertEqual(self.titles('quokka'), ['Quokka tracker'])
+
+        project.title = 'Wombat tracker'
+        project.save()
+        self.assertEqual(self.titles('quokka'), [])
+        self.assertEqual(self.titles('wombat'), ['Wombat tracker'])
+
+        # Unindexed columns leave the entry alone
+        Project.objects.filter(pk=project.pk).update(is_featured=True)
+        self.assertEqual(self.titles('wombat'), ['Wombat tracker'])
+
+        project.delete()
+        self.assertEqual(self.titles('wombat'), [])
+
+    def test_prefix_matches_rank_by_relevance(self):
+        self.project('Weekend blog', 'A long write-up of many things, ' * 20 + 'one of them Django.')
+        self.project('Django shop', 'Built on Django and Django REST framework.')
+        self.assertEqual(self.titles('djan'), ['Django shop', 'Weekend blog'])
+
+    def test_quoted_words_match_as_a_phrase(self):
+        self.project('REST API gateway')
+        self.project('Rest day planner', 'An API for scheduling days off.')
+        self.assertEqual(self.titles('"rest api"'), ['REST API gateway'])
+        self.assertEqual(sorted(self.titles('rest api')), ['REST API gateway', 'Rest day planner'])
+
+    def test_malformed_queries_are_not_errors(self):
+        self.project('Rocket launcher')
+        for text in ('"foo', 'AND', 'OR NOT', 'NEAR(', '*', '-foo', 'title:foo', '"', '(('):
+            with self.subTest(text=text):
+                self.assertEqual(search(text), [])
+        self.assertEqual(self.titles('"rocket'), ['Rocket launcher'])
+
+    def test_public_search_never_returns_contacts(self):
+        Contact.objects.create(name='Zebulon', email='z@example.com', subject='Zebulon', message='Private')
+        self.project('Zebulon widget')
+        self.assertEqual([result.kind for result in search('zebulon', kinds=['contact'])], ['contact'])
+        self.assertEqual([result.kind for result in search('zebulon')], ['project'])
+
+        body = Client().get(reverse('search'), {'q': 'zebulon'}).getvalue().decode()
+        self.assertIn('widget', body)
+        self.assertNotIn('z@example.com', body)
+        self.assertNotIn('Private', body)
+
+
+@override_settings(PROJECTS_PAGE_SIZE=2)
+class ProjectPaginationTests(TransactionTestCase):
+    """Infinite scroll walks the projects by keyset cursor, each exactly once"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        clear_snapshot()
+        days = [3, 3, 3, 2, 2, 1, 0]
+        self.projects = [Project.objects.create(title=f'Project {i}', description='') for i in range(len(days))]
+        today = timezone.localdate()
+        for project, day in zip(self.projects, days):
+            Project.objects.filter(pk=project.pk).update(created_date=today - timedelta(days=day))
+
+    def walk(self, tech=''):
+        page, cursor = project_page(tech)
+        seen = [project.pk for project in page]
+        while cursor:
+            data = Client().get(reverse('projects_fragment', args=[cursor])).json()
+            seen += [project['id'] for project in data['projects']]
+            cursor = data['next_url'] and resolve(data['next_url']).kwargs['cursor']
+        return seen
+
+    def test_fragments_visit_every_project_once(self):
+        expected = list(Project.objects.order_by('-created_date', '-id').values_list('pk', flat=True))
+        self.assertEqual(self.walk(), expected)
+        self.assertEqual(len(set(expected)), len(self.projects))
+
+    def test_filtered_walk_keeps_its_technology(self):
+        python = Technology.objects.create(name='Python')
+        tagged = self.projects[::2]
+        for project in tagged:
+            project.stack.add(python)
+        expected = list(Project.objects.filter(stack=python).order_by('-created_date', '-id')
+                        .values_list('pk', flat=True))
+        self.assertEqual(len(expected), len(tagged))
+        self.assertEqual(self.walk('python'), expected)
+
+    def test_bad_cursors_are_not_found(self):
+        today = timezone.localdate().isoformat()
+        cursors = [
+            'garbage', '!!!!', 'AAAA',
+            base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+            pack_cursor([1, 2]),
+            pack_cursor({'d': 'yesterday', 'id': 1}),
+            pack_cursor({'d': today, 'id': 'NaN'}),
+            pack_cursor({'d': today, 'id': float('inf')}),
+            pack_cursor({'d': today, 'id': 10 ** 30}),
+            pack_cursor({'d': today, 'id': 1, 'tech': {'slug': 'python'}}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(Client().get(reverse('projects_fragment', args=[cursor])).status_code, 404)
+        # The full page just starts over
+        self.assertEqual(Client().get(reverse('projects'), {'cursor': cursors[-1]}).status_code, 200)
+
+
+class StaticExportTests(TransactionTestCase):
+    """export_static_site writes every public route and re-renders only what changed"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        clear_snapshot()
+        dirs = [tempfile.mkdtemp() for _ in range(3)]
+        for path in dirs:
+            self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        self.root = Path(dirs[0]) / 'site'
+        self.enterContext(override_settings(STATIC_EXPORT_DIR=str(self.root), STATIC_ROOT=dirs[1], MEDIA_ROOT=dirs[2]))
+
+        python = Technology.objects.create(name='Python')
+        project = Project.objects.create(title='Exported project', description='')
+        project.stack.add(python)
+        Skill.objects.create(name='Exported skill', category='backend', proficiency=60)
+
+    def export(self, **kwargs):
+        return export_site(self.root, workers=1, **kwargs)
+
+    def mtimes(self):
+        return {path: output_file(self.root, path).stat().st_mtime_ns for _, path in export_targets()}
+
+    def test_one_file_per_public_route(self):
+        summary = self.export()
+        targets = export_targets()
+        self.assertIn(reverse('projects_by_tech', args=['python']), [path for _, path in targets])
+        self.assertEqual(summary['rendered'], len(targets))
+        for _, path in targets:
+            with self.subTest(path=path):
+                self.assertIn(b'</html>', output_file(self.root, path).read_bytes())
+        self.assertIn(b'Exported skill', output_file(self.root, reverse('skills')).read_bytes())
+        self.assertEqual(len(list(self.root.rglob('index.html'))), len(targets))
+
+    def test_incremental_run_rewrites_only_changed_pages(self):
+        self.export()
+        before = self.mtimes()
+        self.assertEqual(self.export(incremental=True)['rendered'], 0)
+        self.assertEqual(self.mtimes(), before)
+
+        etags = {page: page_etag(page) for page, _ in export_targets()}
+        Certification.objects.create(name='Exported cert', issuing_organization='Org', issue_date=timezone.localdate())
+        changed = {page for page in etags if page_etag(page) != etags[page]}
+        self.assertTrue(changed)
+        self.assertNotIn('projects', changed)
+
+        summary = self.export(incremental=True)
+        after = self.mtimes()
+        rewritten = {path for path in after if after[path] != before[path]}
+        self.assertEqual(rewritten, {path for page, path in export_targets() if page in changed})
+        self.assertEqual(summary['rendered'], len(rewritten))
+
+    @override_settings(STATIC_EXPORT_ON_SAVE=True)
+    def test_save_schedules_an_export_on_commit(self):
+        with mock.patch('main.export._spawn_export') as spawn:
+            with transaction.atomic():
+                Skill.objects.create(name='Later', category='backend', proficiency=10)
+                spawn.assert_not_called()
+            spawn.assert_called_once()
+
+            with transaction.atomic():
+                Skill.objects.create(name='Rolled back', category='backend', proficiency=10)
+                transaction.set_rollback(True)
+            spawn.assert_called_once()
+
+    def test_saves_in_one_burst_spawn_one_exporter(self):
+        with mock.patch('main.export.subprocess.Popen') as popen, \
+                mock.patch('main.export._last_spawn', 0.0):
+            with override_settings(STATIC_EXPORT_ON_SAVE=True):
+                for name in ('One', 'Two'):
+                    Skill.objects.create(name=name, category='backend', proficiency=10)
+        popen.assert_called_once()
+        self.assertIn('--when-idle', popen.call_args.args[0])
+        self.assertTrue(pop_pending(self.root))
+
+
+@contextmanager
+def async_public_views():
+    """Route the public URLs to main.async_views, as PORTFOLIO_ASYNC_VIEWS does"""
+    try:
+        with override_settings(PORTFOLIO_ASYNC_VIEWS=True):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+async def aget(path, **headers):
+    response = await AsyncClient().get(path, headers=headers)
+    if response.streaming:
+        body = b''.join([chunk async for chunk in response.streaming_content])
+    else:
+        body = response.content
+    return response, body
+
+
+@override_settings(PROJECTS_PAGE_SIZE=1)
+class AsyncViewTests(TransactionTestCase):
+    """The async public views answer like the sync ones, page cache and ETags included"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        clear_snapshot()
+        python = Technology.objects.create(name='Python')
+        for title in ('Async one', 'Async two'):
+            Project.objects.create(title=title, description='Runs on the event loop').stack.add(python)
+        Skill.objects.create(name='Async skill', category='backend', proficiency=80)
+        Certification.objects.create(name='Async cert', issuing_organization='Org', issue_date=timezone.localdate())
+
+    def paths(self):
+        return [
+            reverse('home'), reverse('about'), reverse('projects'),
+            reverse('projects_by_tech', args=['python']), reverse('skills'),
+            reverse('search') + '?q=event', reverse('projects_fragment', args=[project_page()[1]]),
+            reverse('projects_fragment', args=['garbage']),
+        ]
+
+    def test_same_status_and_body_as_sync(self):
+        def normalized(body):
+            return re.sub(rb'\s+', b' ', body).strip()
+
+        expected = {}
+        for path in self.paths():
+            response = Client().get(path)
+            expected[path] = (response.status_code, normalized(b''.join(response) if response.streaming
+                                                               else response.content))
+        get_cache().clear()
+        clear_snapshot()
+
+        with async_public_views():
+            self.assertEqual(resolve(reverse('home')).func.__module__, 'main.async_views')
+            for path in self.paths():
+                with self.subTest(path=path):
+                    response, body = async_to_sync(aget)(path)
+                    self.assertEqual((response.status_code, normalized(body)), expected[path])
+
+    def test_page_cache_and_conditional_get_under_asgi(self):
+        with async_public_views():
+            first, body = async_to_sync(aget)(reverse('skills'))
+            self.assertTrue(first.streaming and first.is_async)
+            self.assertIn(b'Async skill', body)
+
+            cached, cached_body = async_to_sync(aget)(reverse('skills'))
+            self.assertFalse(cached.streaming)
+            self.assertEqual(cached_body, body)
+            self.assertEqual(cached['ETag'], first['ETag'])
+
+            not_modified, _ = async_to_sync(aget)(reverse('skills'), if_none_match=first['ETag'])
+            self.assertEqual(not_modified.status_code, 304)
+
+            Skill.objects.create(name='Newer skill', category='backend', proficiency=10)
+            changed, body = async_to_sync(aget)(reverse('skills'), if_none_match=first['ETag'])
+            self.assertEqual(changed.status_code, 200)
+            self.assertIn(b'Newer skill', body)
+
+
+class WarmupTests(TransactionTestCase):
+    """Warmup leaves templates compiled and pages cached, but counts no traffic"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        clear_snapshot()
+        Skill.objects.create(name='Warm Skill', category='backend', proficiency=70)
+
+    def test_warmup_fills_the_caches_and_resets_the_metrics(self):
+        loader = engines.all()[0].engine.template_loaders[0]
+        loader.reset()
+        registry = get_registry()
+        registry.inc('portfolio_requests_total', (('view', 'before'),))
+
+        # gc.freeze() would keep this test run's objects out of the collector
+        with mock.patch('main.warmup.gc.freeze'):
+            timings = warmup()
+
+        self.assertEqual([(name, result is not None) for name, _, result in timings], [
+            ('templates', True), ('urls', True), ('pages', True),
+        ])
+        for name in ('base.html', 'index.html', 'skills.html', 'partials/skill_card.html'):
+            self.assertIn(name, loader.get_template_cache)
+        # The warmup requests were not real traffic
+        self.assertIsNot(get_registry(), registry)
+        self.assertEqual(get_registry().counters, {})
+        for name in ('home', 'about', 'projects', 'skills', 'contact'):
+            # Served whole from the page cache rather than streamed
+            self.assertFalse(Client().get(reverse(name)).streaming, name)
+        self.assertIn('Warm Skill', Client().get(reverse('skills')).content.decode())
+
+    def test_enabled_outside_the_autoreloader_whatever_debug_says(self):
+        env = {key: value for key, value in os.environ.items() if key not in ('PORTFOLIO_WARMUP', 'RUN_MAIN')}
+        code = 'from portfolio import settings; print(settings.DEBUG, settings.PORTFOLIO_WARMUP)'
+
+        def setting(**extra):
+            return subprocess.run(
+                [sys.executable, '-c', code], env={**env, **extra}, cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+
+        self.assertEqual(setting()[1], 'True')
+        self.assertEqual(setting(RUN_MAIN='true')[1], 'False')
+        self.assertEqual(setting(RUN_MAIN='true', PORTFOLIO_WARMUP='1')[1], 'True')
+        self.assertEqual(setting(PORTFOLIO_WARMUP='0')[1], 'False')
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """read_replica views read from the replica; writes and their transactions use the primary"""
+    databases = {'default', 'replica'}
+
+    def run_view(self, body):
+        @read_replica
+        def view(request):
+            return body() or HttpResponse()
+        return view(RequestFactory().get('/'))
+
+    def aliases(self, func):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            func()
+        return len(primary), len(replica)
+
+    def test_reads_go_to_the_replica(self):
+        Skill.objects.create(name='Committed', category='backend', proficiency=50)
+        found = []
+        self.assertEqual(self.aliases(lambda: self.run_view(lambda: found.extend(Skill.objects.all()))), (0, 1))
+        self.assertEqual([skill.name for skill in found], ['Committed'])
+        self.assertEqual(read_alias(), 'default')
+
+    def test_writes_and_transactions_use_the_primary(self):
+        def body():
+            with transaction.atomic():
+                Skill.objects.create(name='Uncommitted', category='backend', proficiency=50)
+                self.assertEqual(read_alias(), 'default')
+                # Reads its own write, which the replica can't see yet
+                self.assertTrue(Skill.objects.filter(name='Uncommitted').exists())
+            self.assertEqual(read_alias(), 'replica')
+
+        primary, replica = self.aliases(lambda: self.run_view(body))
+        self.assertGreaterEqual(primary, 2)
+        self.assertEqual(replica, 0)
+
+    def test_streamed_body_reads_from_the_replica(self):
+        def chunks():
+            yield read_alias()
+            yield str(Skill.objects.count())
+
+        response = self.run_view(lambda: StreamingHttpResponse(chunks()))
+        self.assertEqual(read_alias(), 'default')
+        self.assertEqual(list(response.streaming_content), [b'replica', b'0'])
+
+    def test_connection_pragmas(self):
+        configured = dict(re.findall(r'PRAGMA (\w+)=(\w+)', settings.SQLITE_PRAGMAS))
+        synchronous = {'OFF': 0, 'NORMAL': 1, 'FULL': 2, 'EXTRA': 3}
+        with connections['default'].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], int(configured['busy_timeout']))
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], synchronous[configured['synchronous'].upper()])
+        with connections['replica'].cursor() as cursor:
+            cursor.execute('PRAGMA query_only')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+@mock.patch.object(EstimatedCountPaginator, 'threshold', 5)
+@mock.patch.object(ContactAdmin, 'list_per_page', 3)
+class ContactChangeListTests(TestCase):
+    """The contact inbox caps its count, pages by keyset and updates in batches"""
+    url = reverse_lazy('admin:main_contact_changelist')
+
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        self.start = timezone.now() - timedelta(days=30)
+        self.contacts = [self.contact(self.start + timedelta(hours=i)) for i in range(10)]
+
+    def contact(self, created_at, **fields):
+        contact = Contact.objects.create(name='Visitor', email='v@example.com', subject='Hi', message='Hello')
+        Contact.objects.filter(pk=contact.pk).update(created_at=created_at, **fields)
+        return contact
+
+    def changelist(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_count_stops_at_the_threshold(self):
+        with CaptureQueriesContext(connection) as queries:
+            cl = self.changelist()
+        counts = [query['sql'] for query in queries if 'COUNT(' in query['sql'].upper()]
+        self.assertTrue(counts)
+        for sql in counts:
+            # Only counts of a LIMITed subquery, never of the whole table
+            self.assertIn('LIMIT 6', sql)
+        self.assertEqual(cl.result_count, 5)
+
+        cl = self.changelist(p=2)
+        self.assertTrue(cl.paginator.truncated)
+        self.assertIsNotNone(cl.older_url)
+
+    def test_older_pages_hold_still_while_rows_arrive(self):
+        newest_first = [contact.pk for contact in reversed(self.contacts)]
+        first = Contact.objects.get(pk=newest_first[0])
+        url = self.url + '?' + urlencode({
+            CURSOR_VAR: pack_cursor({'d': first.created_at.isoformat(), 'id': first.pk})
+        })
+
+        seen = []
+        while url:
+            cl = self.changelist(url)
+            seen += [contact.pk for contact in cl.result_list]
+            self.contact(timezone.now())
+            url = cl.older_url and self.url + cl.older_url
+        self.assertEqual(seen, newest_first[1:])
+
+    def test_drill_down_filters_by_year_and_month(self):
+        Contact.objects.all().delete()
+        for year, month in ((2024, 3), (2024, 5), (2025, 1)):
+            self.contact(timezone.make_aware(datetime(year, month, 10)))
+
+        self.assertEqual(self.changelist(received='2024').result_count, 2)
+        cl = self.changelist(received='2024-03')
+        self.assertEqual(cl.result_count, 1)
+        spec = next(spec for spec in cl.filter_specs if isinstance(spec, DateDrillDownFilter))
+        # Every month between the oldest and newest rows, without a DISTINCT scan
+        self.assertEqual(
+            [value for value, _ in spec.lookup_choices],
+            ['2025', '2024', *(f'2024-{month:02d}' for month in range(12, 2, -1))],
+        )
+        self.assertEqual(self.changelist(received='garbage').result_count, 3)
+
+    def test_update_in_batches_reaches_every_row(self):
+        self.contact(timezone.now(), is_read=True)
+        batches = []
+        updated = update_in_batches(
+            Contact.objects.filter(is_read__in=[False]), batch_size=3, after_batch=batches.append, is_read=True,
+        )
+        self.assertEqual(updated, 10)
+        self.assertEqual(batches, [3, 3, 3, 1])
+        self.assertFalse(Contact.objects.filter(is_read=False).exists())
+
+
+class BulkExportTests(TestCase):
+    """Exports stream every column as CSV or JSON Lines, optionally gzipped"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.contacts = [
+            self.contact(timezone.make_aware(datetime(2024, month, 10)), name=name)
+            for month, name in ((1, 'Plain'), (2, 'Doe, "Jane"'), (3, 'Line\nbreak'))
+        ]
+
+    def contact(self, created_at, **fields):
+        contact = Contact.objects.create(email='v@example.com', subject='Hi', message='Hello', **fields)
+        Contact.objects.filter(pk=contact.pk).update(created_at=created_at)
+        return contact
+
+    def export(self, *args, **options):
+        output = self.tmp / 'export.out'
+        call_command('export_data', *args, output=str(output), stderr=StringIO(), **options)
+        return output.read_bytes()
+
+    def test_csv_quotes_commas_quotes_and_newlines(self):
+        rows = list(csv.reader(StringIO(self.export('contact').decode())))
+        self.assertEqual(rows[0][:3], ['id', 'name', 'email'])
+        # Newest first, as the model orders them
+        self.assertEqual(
+            [row[1] for row in rows[1:]], ['Line\nbreak', 'Doe, "Jane"', 'Plain'],
+        )
+        self.assertEqual(len(rows), 4)
+
+    def test_jsonl_writes_one_object_per_line(self):
+        lines = self.export('main.contact', format='jsonl').decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record['name'] for record in records], ['Line\nbreak', 'Doe, "Jane"', 'Plain'])
+        self.assertEqual(records[-1]['created_at'], '2024-01-10T00:00:00+00:00')
+        self.assertIs(records[-1]['is_read'], False)
+
+    def test_jsonl_lists_many_to_many_values(self):
+        project = Project.objects.create(title='Site', description='d')
+        project.stack.set(Technology.from_names('Django, Python'))
+        record = json.loads(self.export('project', format='jsonl'))
+        self.assertEqual(record['title'], 'Site')
+        self.assertEqual(sorted(record['stack']), ['Django', 'Python'])
+
+    def test_date_range_includes_since_and_excludes_until(self):
+        lines = self.export('contact', format='jsonl', since=date(2024, 2, 10), until=date(2024, 3, 10))
+        self.assertEqual([json.loads(line)['name'] for line in lines.splitlines()], ['Doe, "Jane"'])
+
+        Certification.objects.create(name='Old', issuing_organization='Org', issue_date=date(2023, 6, 1))
+        Certification.objects.create(name='New', issuing_organization='Org', issue_date=date(2024, 6, 1))
+        lines = self.export('certification', format='jsonl', since=date(2024, 1, 1))
+        self.assertEqual([json.loads(line)['name'] for line in lines.splitlines()], ['New'])
+
+    def test_date_filter_needs_a_date_field(self):
+        with self.assertRaisesMessage(CommandError, 'no date field'):
+            call_command('export_data', 'dashboardcounter', since=date(2024, 1, 1))
+        with self.assertRaisesMessage(CommandError, 'Unknown model'):
+            call_command('export_data', 'nosuchmodel')
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'contact', '--since', '2024-13-01')
+
+    def test_gzip_output_decompresses_to_the_plain_export(self):
+        plain = self.export('contact')
+        compressed = self.export('contact', gzip=True)
+        self.assertEqual(compressed[:2], b'\x1f\x8b')
+        self.assertEqual(gzip.decompress(compressed), plain)
+
+    def test_exports_larger_than_a_block_are_split_and_complete(self):
+        with mock.patch('main.bulk_export.BLOCK_SIZE', 64):
+            chunks = list(stream_export(Contact.objects.all(), 'csv', chunk_size=1))
+            compressed = b''.join(stream_export(Contact.objects.all(), 'csv', compress=True, chunk_size=1))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(gzip.decompress(compressed), b''.join(chunks))
+
+    def test_admin_action_streams_the_selected_rows(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        selected = [self.contacts[0].pk, self.contacts[1].pk]
+        data = {'action': 'export_as_csv', '_selected_action': selected}
+        url = reverse('admin:main_contact_changelist')
+
+        response = self.client.post(url, data)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'attachment; filename="contact-\d{8}-\d{6}\.csv"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = b''.join(response.streaming_content)
+        rows = list(csv.reader(StringIO(body.decode())))
+        self.assertEqual(sorted(int(row[0]) for row in rows[1:]), selected)
+
+        response = self.client.post(url, data, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), body)
+
+        response = self.client.post(url, {**data, 'action': 'export_as_jsonl'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(sorted(json.loads(line)['id'] for line in lines), selected)
+
+
+class TechnologyMigrationTests(TransactionTestCase):
+    """0004 splits the old comma-separated technologies into shared Technology rows"""
+    migrate_from = [('main', '0003_outboundemail')]
+    migrate_to = [('main', '0005_remove_project_technologies')]
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.migrate_from)
+
+    def tearDown(self):
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.executor.loader.graph.leaf_nodes())
+        # Normally done by the post_migrate handler that `migrate` fires
+        install_search_index()
+
+    def migrate(self, technologies):
+        Project = self.executor.loader.project_state(self.migrate_from).apps.get_model('main', 'Project')
+        ids = {
+            key: Project.objects.create(title=key, description='', technologies=value).pk
+            for key, value in technologies.items()
+        }
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.migrate_to)
+        apps = self.executor.loader.project_state(self.migrate_to).apps
+        Project = apps.get_model('main', 'Project')
+        return apps, {key: sorted(Project.objects.get(pk=pk).stack.values_list('name', flat=True))
+                      for key, pk in ids.items()}
+
+    def test_split_into_shared_rows(self):
+        long_name = 'A' * 300
+        apps, stacks = self.migrate({
+            'spaced': ' Django ,  Python,django, ,',
+            'empty': '',
+            'langs': 'Python, C++, C#, C',
+            'long': long_name,
+        })
+        self.assertEqual(stacks['spaced'], ['Django', 'Python'])
+        self.assertEqual(stacks['empty'], [])
+        self.assertEqual(stacks['langs'], ['C', 'C#', 'C++', 'Python'])
+        self.assertEqual(stacks['long'], [long_name])
+
+        Technology = apps.get_model('main', 'Technology')
+        self.assertEqual(
+            sorted(Technology.objects.values_list('slug', flat=True)),
+            sorted(['a' * 300, 'c', 'cpp', 'csharp', 'django', 'python']),
+        )
+
+
+class DashboardCounterTests(TestCase):
+    """The dashboard's stored totals agree with a fresh COUNT after every kind of write"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+
+    def contact(self, **fields):
+        return Contact.objects.create(
+            name='Visitor', email='visitor@example.com', subject='Hi', message='Hello', **fields
+        )
+
+    def assertCountersMatch(self):
+        stats = dashboard_stats()
+        self.assertEqual(stats['totals'], {name: count_total(name) for name in TOTALS})
+        self.assertEqual(stats['trend'][-1][1], Contact.objects.count())
+        self.assertEqual(reconcile(), {})
+
+    def test_create_and_delete(self):
+        dashboard_stats()
+        featured = Project.objects.create(title='A', description='A', is_featured=True)
+        Project.objects.create(title='B', description='B')
+        Skill.objects.create(name='Go', category='backend', proficiency=70)
+        Certification.objects.create(name='Cert', issuing_organization='Org', issue_date=timezone.localdate())
+        self.contact()
+        self.contact().delete()
+        featured.delete()
+        self.assertCountersMatch()
+
+    def test_field_changes_move_between_totals(self):
+        dashboard_stats()
+        project = Project.objects.create(title='A', description='A')
+        project.is_featured = True
+        project.save()
+        message = self.contact()
+        message.is_read = True
+        message.save(update_fields=['is_read'])
+        self.assertCountersMatch()
+        self.assertEqual(dashboard_stats()['totals']['featured_projects'], 1)
+        self.assertEqual(dashboard_stats()['totals']['unread_contacts'], 0)
+
+    def post_action(self, action, query=''):
+        return self.client.post(reverse('admin:main_contact_changelist') + query, {
+            'action': action, 'select_across': '1', 'index': '0',
+            '_selected_action': list(Contact.objects.values_list('pk', flat=True)),
+        })
+
+    def test_mark_read_actions_on_a_filtered_selection(self):
+        dashboard_stats()
+        for is_read in (False, False, False, True):
+            self.contact(is_read=is_read)
+
+        self.post_action('mark_as_read', '?is_read__exact=0')
+        self.assertEqual(dashboard_stats()['totals']['unread_contacts'], 0)
+        self.assertCountersMatch()
+
+        self.post_action('mark_as_unread', '?is_read__exact=1')
+        self.assertEqual(dashboard_stats()['totals']['unread_contacts'], 4)
+        self.assertCountersMatch()
+
+    def test_bulk_delete_of_a_filtered_selection(self):
+        dashboard_stats()
+        for is_read in (False, True, True):
+            self.contact(is_read=is_read)
+        response = self.client.post(reverse('admin:main_contact_changelist') + '?is_read__exact=1', {
+            'action': 'delete_selected', 'select_across': '1', 'index': '0', 'post': 'yes',
+            '_selected_action': list(Contact.objects.filter(is_read=True).values_list('pk', flat=True)),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Contact.objects.count(), 1)
+        self.assertCountersMatch()
+
+    def test_reconcile_repairs_writes_that_bypass_signals(self):
+        dashboard_stats()
+        self.contact()
+        Contact.objects.update(is_read=True)
+        Project.objects.bulk_create([Project(title='A', description='A', is_featured=True)])
+        drift = reconcile()
+        self.assertEqual(drift['unread_contacts'], (1, 0))
+        self.assertEqual(drift['projects'], (0, 1))
+        self.assertEqual(dashboard_stats()['totals'], {name: count_total(name) for name in TOTALS})
+        self.assertEqual(dashboard_stats()['trend'][-1], (timezone.localdate(), 1))
+
+
+class PageViewRecordTests(SimpleTestCase):
+    """What the analytics middleware queues for a response"""
+
+    def setUp(self):
+        patcher = mock.patch('main.analytics.get_buffer')
+        self.buffer = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def request(self, path):
+        request = RequestFactory().get(path, headers={'user-agent': 'Mozilla/5.0 Firefox/120.0'})
+        try:
+            request.resolver_match = resolve(path)
+        except Resolver404:
+            request.resolver_match = None
+        return request
+
+    def recorded(self):
+        self.buffer.add.assert_called_once()
+        return self.buffer.add.call_args.args[0]
+
+    def test_streamed_page_is_recorded_once_sent(self):
+        def body():
+            yield b'start'
+            time.sleep(0.05)
+            yield b'end'
+
+        response = record(self.request('/skills/'), StreamingHttpResponse(body()), time.perf_counter())
+        self.buffer.add.assert_not_called()
+        self.assertEqual(response.getvalue(), b'startend')
+        self.assertEqual(self.recorded()['path'], '/skills/')
+        self.assertGreaterEqual(self.recorded()['latency_ms'], 50)
+
+    def test_unmatched_paths_share_one_row(self):
+        record(self.request('/wp-login.php'), HttpResponse(status=404), time.perf_counter())
+        self.assertEqual(self.recorded()['path'], '<unresolved>')
+
+    def test_errors_on_a_route_are_filed_under_its_pattern(self):
+        record(self.request('/projects/tech/no-such-tech/'), HttpResponse(status=404), time.perf_counter())
+        self.assertEqual(self.recorded()['path'], '/projects/tech/<slug:tech>/')
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    filebased = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.gettempdir(),
+    }}
+
+    def test_public_profile_rejects_a_process_local_cache(self):
+        with override_settings(PORTFOLIO_PUBLIC_ONLY=True, CACHES=self.locmem):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['main.E001'])
+        with override_settings(PORTFOLIO_PUBLIC_ONLY=True, CACHES=self.filebased):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_single_process_setup_may_use_locmem(self):
+        with override_settings(CACHES=self.locmem):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise SMTPException("Connection refused")
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_BASE_SECONDS=60, OUTBOX_RETRY_MAX_SECONDS=600)
+class OutboxTests(TestCase):
+    """Queued email against the locmem backend the test runner installs"""
+
+    def enqueue(self, subject='Hello'):
+        return enqueue_email(subject, 'Body', ['owner@example.com'], reply_to='visitor@example.com')
+
+    def test_claim_leases_due_messages_once(self):
+        due = [self.enqueue('First'), self.enqueue('Second')]
+        later = self.enqueue('Later')
+        OutboundEmail.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual([item.pk for item in claim_batch(10)], [item.pk for item in due])
+        # Leased to the first worker
+        self.assertEqual(claim_batch(10), [])
+
+    def test_claim_respects_batch_size(self):
+        for _ in range(3):
+            self.enqueue()
+        self.assertEqual(len(claim_batch(2)), 2)
+        self.assertEqual(len(claim_batch(2)), 1)
+
+    def test_deliver_sends_and_marks_sent(self):
+        self.enqueue()
+        self.assertEqual(deliver(claim_batch(10)), (1, 0, 0))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertEqual(mail.outbox[0].reply_to, ['visitor@example.com'])
+        item = OutboundEmail.objects.get()
+        self.assertEqual(item.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(item.attempts, 1)
+        self.assertIsNotNone(item.sent_at)
+
+    def test_failed_delivery_retries_with_backoff(self):
+        self.enqueue()
+        before = timezone.now()
+        self.assertEqual(deliver(claim_batch(10), FailingEmailBackend()), (0, 1, 0))
+
+        item = OutboundEmail.objects.get()
+        self.assertEqual(item.status, OutboundEmail.STATUS_PENDING)
+        self.assertEqual(item.attempts, 1)
+        self.assertIn("Connection refused", item.last_error)
+        self.assertGreaterEqual(item.next_attempt_at, before + timedelta(seconds=60))
+        # Not due again until the backoff has passed
+        self.assertEqual(claim_batch(10), [])
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        self.assertEqual(
+            [retry_delay(attempts).total_seconds() for attempts in range(1, 6)],
+            [60, 120, 240, 480, 600],
+        )
+
+    def test_dead_letters_after_max_attempts(self):
+        self.enqueue()
+        results = []
+        for _ in range(3):
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            results.append(deliver(claim_batch(10), FailingEmailBackend()))
+        self.assertEqual(results, [(0, 1, 0), (0, 1, 0), (0, 0, 1)])
+
+        item = OutboundEmail.objects.get()
+        self.assertEqual(item.status, OutboundEmail.STATUS_DEAD)
+        self.assertEqual(item.attempts, 3)
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(claim_batch(10), [])
+
+    def test_send_outbox_drains_the_queue(self):
+        for _ in range(3):
+            self.enqueue()
+        out = StringIO()
+        call_command('send_outbox', batch_size=2, stdout=out)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+        self.assertIn("3 sent, 0 retried, 0 dead", out.getvalue())
+
+    @override_settings(CONTACT_EMAIL='owner@example.com')
+    def test_contact_form_queues_instead_of_sending(self):
+        get_cache().clear()
+        response = self.client.post(reverse('contact'), {
+            'name': 'Visitor', 'email': 'visitor@example.com',
+            'subject': 'Hi', 'message': 'A message long enough to pass.',
+        })
+        self.assertRedirects(response, reverse('contact'), fetch_redirect_response=False)
+        self.assertEqual(mail.outbox, [])
+        item = OutboundEmail.objects.get()
+        self.assertEqual(item.get_recipients(), ['owner@example.com'])
+        self.assertEqual(item.reply_to, 'visitor@example.com')
+
+
+class ThrottleTests(TestCase):
+    """Contact rate limits are counted in the cache and never touch the database"""
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_limit_costs_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual([hit('ip', '10.0.0.1', 2, 60, now=600) for _ in range(3)], [0, 0, 60])
+            self.assertEqual(hit('ip', '10.0.0.2', 2, 60, now=610), 0)
+
+    def test_rejected_attempts_are_not_counted(self):
+        for _ in range(5):
+            hit('ip', '10.0.0.1', 2, 60, now=600)
+        # Had the rejections counted, the next window would still be full
+        self.assertEqual(hit('ip', '10.0.0.1', 2, 60, now=690), 0)
+
+    def test_previous_window_is_weighted_by_its_overlap(self):
+        hit('ip', '10.0.0.1', 2, 60, now=600)
+        hit('ip', '10.0.0.1', 2, 60, now=601)
+        # Halfway through the next window the two count as one
+        self.assertEqual(hit('ip', '10.0.0.1', 2, 60, now=690), 0)
+        self.assertEqual(hit('ip', '10.0.0.1', 2, 60, now=690), 30)
+
+    def test_limit_holds_across_processes_sharing_a_file_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        with override_settings(CACHES={'default': backend}):
+            self.assertEqual([hit('ip', '10.0.0.1', 2, 60, now=600) for _ in range(2)], [0, 0])
+        # Another worker: a fresh handle on the same directory
+        with override_settings(CACHES={'default': dict(backend)}):
+            self.assertEqual(hit('ip', '10.0.0.1', 2, 60, now=610), 50)
+
+
+class MetricsTests(TestCase):
+    """/metrics is private and merges the totals of every live process"""
+
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.enterContext(override_settings(METRICS_DIR=str(self.dir), METRICS_TOKEN='s3cret'))
+        reset_registry()
+        self.addCleanup(reset_registry)
+
+    def write_dump(self, pid, value):
+        labels = [['method', 'GET'], ['status', '200'], ['view', 'elsewhere']]
+        state = {'counters': [['portfolio_requests_total', labels, value]], 'histograms': []}
+        (self.dir / f'{pid}.json').write_text(json.dumps(state))
+
+    def process(self, *code):
+        child = subprocess.Popen([sys.executable, '-c', ';'.join(code)])
+        self.addCleanup(child.wait)
+        self.addCleanup(child.kill)
+        return child.pid
+
+    def test_anonymous_requests_are_forbidden(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    def test_staff_and_bearer_token_can_read(self):
+        user = get_user_model().objects.create_user('staff', password='password', is_staff=True)
+        self.client.force_login(user)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertIn('# TYPE portfolio_requests_total counter', response.content.decode())
+
+        self.client.logout()
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    def test_counters_of_live_processes_are_merged(self):
+        self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.write_dump(os.getppid(), 2)
+        self.write_dump(self.process('import time', 'time.sleep(60)'), 3)
+
+        counters, _ = collect()
+        key = ('portfolio_requests_total', (('method', 'GET'), ('status', '200'), ('view', 'elsewhere')))
+        self.assertEqual(counters[key], 5)
+        # This process's own totals are dumped alongside
+        self.assertTrue((self.dir / f'{os.getpid()}.json').exists())
+        self.assertTrue(any(
+            dict(labels).get('view') == 'metrics' for name, labels in counters
+            if name == 'portfolio_requests_total'
+        ))
+
+    def test_files_of_exited_processes_are_removed(self):
+        child = subprocess.Popen([sys.executable, '-c', 'pass'])
+        child.wait()
+        self.write_dump(child.pid, 100)
+        self.write_dump(os.getppid(), 1)
+
+        counters, _ = collect()
+        key = ('portfolio_requests_total', (('method', 'GET'), ('status', '200'), ('view', 'elsewhere')))
+        self.assertEqual(counters[key], 1)
+        self.assertFalse((self.dir / f'{child.pid}.json').exists())
+
+
+class StaticAssetTests(SimpleTestCase):
+    """Collected files are hashed and precompressed, and served with the right headers"""
+    css = b'body{color:teal}' + b'.card{margin:0}' * 100
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        source, root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, source)
+        cls.addClassCleanup(shutil.rmtree, root)
+        with open(f'{source}/site.css', 'wb') as fh:
+            fh.write(cls.css)
+        settings_override = override_settings(
+            STATICFILES_DIRS=[source], STATIC_ROOT=root,
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        cls.hashed = staticfiles_storage.stored_name('site.css')
+
+    def get(self, path, **headers):
+        return serve_static(RequestFactory().get('/static/' + path, headers=headers), path)
+
+    def test_hashed_file_is_immutable(self):
+        self.assertNotEqual(self.hashed, 'site.css')
+        response = self.get(self.hashed)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(b''.join(response.streaming_content), self.css)
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_unhashed_file_gets_a_short_lifetime(self):
+        self.assertEqual(self.get('site.css')['Cache-Control'], 'public, max-age=300')
+
+    def test_not_modified_since_last_fetch(self):
+        last_modified = self.get(self.hashed)['Last-Modified']
+        response = self.get(self.hashed, if_modified_since=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_gzip_variant_for_gzip_clients(self):
+        response = self.get(self.hashed, accept_encoding='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.css)
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_variant_preferred(self):
+        response = self.get(self.hashed, accept_encoding='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(b''.join(response.streaming_content)), self.css)
+
+
+
+class VendoredAssetTests(SimpleTestCase):
+    def test_every_asset_is_vendored(self):
+        self.assertEqual(check_vendored_assets(None), [])
+
+    def test_pages_link_local_copies_only(self):
+        for name in VENDOR_ASSETS:
+            self.assertTrue(asset_url(name).startswith(settings.STATIC_URL), name)
+
+
+def png_upload(width, height, name='shot.png'):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageVariantTests(TestCase):
+    """Variants are built for new uploads only, and labelled with their real width"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root, IMAGE_VARIANTS_ASYNC=False, IMAGE_VARIANT_WIDTHS=(160, 320),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_project(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Project.objects.create(title='Demo', description='Demo', image=png_upload(200, 100))
+
+    def test_upload_builds_variants_capped_at_the_original_width(self):
+        project = self.create_project()
+        html = Template('{% load portfolio_tags %}{% responsive_image project.image %}').render(
+            Context({'project': project})
+        )
+        self.assertIn('-160w.webp 160w', html)
+        # The 320 variant is the unscaled 200px original
+        self.assertIn('-320w.webp 200w', html)
+        self.assertEqual(generate_variants(project.image.name), [])
+
+    def test_edit_without_new_upload_schedules_nothing(self):
+        project = self.create_project()
+        with mock.patch('main.signals.schedule_variants') as schedule:
+            project.title = 'Renamed'
+            project.save()
+            project.save(update_fields=['title'])
+        schedule.assert_not_called()
+
+    def test_new_upload_is_scheduled(self):
+        project = self.create_project()
+        with mock.patch('main.signals.schedule_variants') as schedule:
+            project.image = png_upload(400, 200, 'other.png')
+            project.save()
+        schedule.assert_called_once_with(project.image.name)
+
+
+class SvgIconTests(SimpleTestCase):
+    """Skill SVG icons keep their shapes and lose everything else"""
+
+    def test_shapes_and_paint_are_kept(self):
+        view_box, inner = svg_to_symbol(
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">'
+            '<defs><linearGradient id="g"><stop offset="0" stop-color="red"/></linearGradient></defs>'
+            '<g transform="translate(1 1)"><path d="M0 0h24v24H0z" fill="url(#g)"/></g></svg>'
+        )
+        self.assertEqual(view_box, '0 0 24 24')
+        self.assertIn('<path d="M0 0h24v24H0z" fill="url(#g)" />', inner)
+        self.assertIn('stop-color="red"', inner)
+
+    def test_active_content_is_dropped(self):
+        _, inner = svg_to_symbol(
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'viewBox="0 0 24 24">'
+            '<script>alert(1)</script><style>*{fill:red}</style>'
+            '<a href="java&#9;script:alert(1)"><rect width="1" height="1"/></a>'
+            '<circle r="4" onload="alert(1)" fill="url(https://example.com/x.svg#g)">'
+            '<animate attributeName="href" to="javascript:alert(1)"/>'
+            '<set attributeName="onclick" to="alert(1)"/></circle>'
+            '<use xlink:href="data:image/svg+xml,x"/>'
+            '<foreignObject><div xmlns="http://www.w3.org/1999/xhtml">x</div></foreignObject></svg>'
+        )
+        self.assertEqual(inner, '<circle xmlns="http://www.w3.org/2000/svg" r="4" />')
@@ -0,0 +1,106 @@
+"""Rate limiting and duplicate suppression for the contact form.
+
+Everything lives in the page cache backend, so a shared backend
+(PORTFOLIO_CACHE_DIR, see the CACHES note in settings) makes the limits hold
+across worker processes. Counters are only ever touched through add(),
+incr() and decr(); no check here reads or writes the database, so a
+turned-away attempt never reaches the Contact table or the outbox.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+
+from .cache import get_cache
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'portfolio:throttle'
+
+# Reasons a submission can be turned away, reported by `contact_rejections`
+REASONS = ('ip', 'email', 'duplicate')
+
+
+def client_ip(request):
+    """REMOTE_ADDR, or the client address appended by a trusted proxy"""
+    hops = getattr(settings, 'CONTACT_TRUSTED_PROXY_HOPS', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if hops and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        if len(addresses) >= hops:
+            return addresses[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _digest(*parts):
+    return hashlib.sha256('\0'.join(parts).encode()).hexdigest()[:32]
+
+
+def _incr(cache, key, timeout):
+    # add() seeds the counter without clobbering one another process created
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def hit(scope, ident, limit, window, now=None):
+    """Count an attempt and return the seconds to wait if it is over the limit.
+
+    A sliding window approximated by two fixed ones: the previous window's
+    count is weighted by how much of it still overlaps the sliding window.
+    An attempt over the limit is taken back out of the count.
+    """
+    cache = get_cache()
+    now = time.time() if now is None else now
+    bucket, offset = divmod(now, window)
+    bucket = int(bucket)
+    key = f'{KEY_PREFIX}:{scope}:{_digest(ident)}'
+    current = _incr(cache, f'{key}:{bucket}', window * 2)
+    previous = cache.get(f'{key}:{bucket - 1}', 0)
+    estimate = previous * (1 - offset / window) + current
+    if estimate <= limit:
+        return 0
+    try:
+        cache.decr(f'{key}:{bucket}')
+    except ValueError:
+        pass
+    return max(1, int(window - offset))
+
+
+def check_rate(scope, ident):
+    """Seconds until `ident` may post again under CONTACT_RATE_LIMITS[scope]"""
+    limit, window = settings.CONTACT_RATE_LIMITS[scope]
+    if not ident:
+        return 0
+    return hit(scope, ident.lower(), limit, window)
+
+
+def is_duplicate(email, subject, message):
+    """Whether the same message was accepted within CONTACT_DUPLICATE_WINDOW"""
+    normalized = [' '.join(part.split()).lower() for part in (email, subject, message)]
+    key = f'{KEY_PREFIX}:dup:{_digest(*normalized)}'
+    return not get_cache().add(key, 1, settings.CONTACT_DUPLICATE_WINDOW)
+
+
+def reject(reason, ident=''):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:rejected:{reason}'
+    _incr(cache, key, None)
+    logger.info("Contact submission rejected (%s) %s", reason, ident)
+
+
+def rejection_counts():
+    cache = get_cache()
+    keys = {f'{KEY_PREFIX}:rejected:{reason}': reason for reason in REASONS}
+    found = cache.get_many(list(keys))
+    return {reason: found.get(key, 0) for key, reason in keys.items()}
+
+
+def reset_rejection_counts():
+    get_cache().delete_many([f'{KEY_PREFIX}:rejected:{reason}' for reason in REASONS])
@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Public read-only pages; contact stays sync either way
+public = async_views if settings.PORTFOLIO_ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.index, name='home'),
-    path('about/', views.about, name='about'),
-    path('projects/', views.projects, name='projects'),
-    path('skills/', views.skills, name='skills'),
+    path('', public.index, name='home'),
+    path('about/', public.about, name='about'),
+    path('projects/', public.projects, name='projects'),
+    path('projects/tech/<slug:tech>/', public.projects, name='projects_by_tech'),
+    path('projects/more/<str:cursor>/', public.projects_fragment, name='projects_fragment'),
+    path('skills/', public.skills, name='skills'),
+    path('search/', public.search, name='search'),
     path('contact/', views.contact, name='contact'),
 ]
\ No newline at end of file
@@ -1,96 +1,208 @@
 from django.shortcuts import render, redirect
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib import messages
-from django.core.mail import send_mail
-from .models import (
-    Profile, Skill, Project, Experience, 
-    Education, Certification, Testimonial
-)
+from django.db import transaction
+from .models import Project
 from .forms import ContactForm
-from django.core.mail import send_mail
+from .cache import cache_public_page
+from .freshness import conditional_page
+from .routers import read_replica
+from .snapshot import get_snapshot
+from .streaming import stream_render
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .search import search as search_content
+from .outbox import enqueue_email
+from .throttle import check_rate, client_ip, is_duplicate, reject
 from django.conf import settings
 
 # Create your views here.
-def index(request):
-    profile = Profile.objects.first()
-    featured_projects = Project.objects.filter(is_featured=True)[:3]
-    skills = Skill.objects.all()
-    education = Education.objects.all()[:2] 
-    certifications = Certification.objects.all()[:3] 
-    testimonials = Testimonial.objects.all()[:3]
-    
-    context = {
-        'profile': profile,
-        'featured_projects': featured_projects,
-        'skills': skills,
-        'education': education,
-        'certifications': certifications,
-        'testimonials': testimonials,
+
+# Context builders shared with the async views in async_views.py
+def index_context(snapshot):
+    return {
+        'featured_projects': snapshot.featured_projects[:3],
+        'skills': snapshot.skills,
+        'education': snapshot.top_education,
+        'certifications': snapshot.top_certifications,
+        'testimonials': snapshot.top_testimonials,
     }
-    return render(request, 'index.html', context)
 
-def about(request):
-    profile = Profile.objects.first()
-    experiences = Experience.objects.all()
-    education = Education.objects.all()
-    certifications = Certification.objects.all()
-    
-    context = {
-        'profile': profile,
-        'experiences': experiences,
-        'education': education,
-        'certifications': certifications,
+def about_context(snapshot):
+    return {
+        'experiences': snapshot.experiences,
+        'education': snapshot.education,
+        'certifications': snapshot.certifications,
     }
-    return render(request, 'about.html', context)
 
-def projects(request):
-    all_projects = Project.objects.all()
-    
-    context = {
-        'projects': all_projects,
+def skills_context(snapshot):
+    skills_by_category = snapshot.skills_by_category
+    return {
+        'frontend_skills': skills_by_category['frontend'],
+        'backend_skills': skills_by_category['backend'],
+        'database_skills': skills_by_category['database'],
+        'tools_skills': skills_by_category['tools'],
     }
-    return render(request, 'projects.html', context)
 
+def projects_query(tech=''):
+    queryset = Project.objects.prefetch_related('stack')
+    if tech:
+        # Indexed join through the project/technology table
+        queryset = queryset.filter(stack__slug=tech)
+    return queryset
+
+def projects_position(request, tech=''):
+    """(keyset position, technology slug) a projects listing request asks for"""
+    position = decode_cursor(request.GET.get('cursor'))
+    tech = (position or {}).get('tech') or tech or request.GET.get('tech', '')
+    return position, tech
+
+def next_page_cursor(items, has_more, tech=''):
+    return encode_cursor(items[-1], tech=tech) if has_more else None
+
+def project_page(tech='', position=None):
+    """One keyset page of projects plus the cursor for the next one"""
+    items, has_more = keyset_page(projects_query(tech), position, settings.PROJECTS_PAGE_SIZE)
+    return items, next_page_cursor(items, has_more, tech)
+
+def fragment_response(request, page, next_cursor):
+    next_url = reverse('projects_fragment', args=[next_cursor]) if next_cursor else None
+    html = render_to_string('partials/project_list.html', {'projects': page}, request)
+    
+    if request.GET.get('format') == 'html':
+        response = HttpResponse(html)
+        if next_url:
+            response['X-Next-Url'] = next_url
+        return response
+    
+    return JsonResponse({
+        'html': html,
+        'next_url': next_url,
+        'projects': [
+            {
+                'id': project.pk,
+                'title': project.title,
+                'description': project.description,
+                'image': project.image.url if project.image else None,
+                'technologies': project.get_tech_list(),
+                'github_link': project.github_link,
+                'live_link': project.live_link,
+                'is_featured': project.is_featured,
+                'created_date': project.created_date.isoformat(),
+            }
+            for project in page
+        ],
+    })
+
+@read_replica
+@conditional_page('home')
+@cache_public_page
+def index(request):
+    return stream_render(request, 'index.html', lambda: index_context(get_snapshot()))
+
+@read_replica
+@conditional_page('about')
+@cache_public_page
+def about(request):
+    return stream_render(request, 'about.html', lambda: about_context(get_snapshot()))
+
+@read_replica
+@conditional_page('projects')
+@cache_public_page
+def projects(request, tech=''):
+    position, tech = projects_position(request, tech)
+    
+    def context():
+        page, next_cursor = project_page(tech, position)
+        return {
+            'projects': page,
+            'next_cursor': next_cursor,
+            'technologies': get_snapshot().technologies,
+            'current_tech': tech,
+        }
+    return stream_render(request, 'projects.html', context)
+
+@read_replica
+@conditional_page('projects_fragment')
+@cache_public_page
+def projects_fragment(request, cursor):
+    """Next batch of project cards for infinite scroll, as JSON or bare HTML"""
+    position = decode_cursor(cursor)
+    if position is None:
+        raise Http404("Invalid cursor")
+    page, next_cursor = project_page(position.get('tech', ''), position)
+    return fragment_response(request, page, next_cursor)
+
+@read_replica
+@conditional_page('skills')
+@cache_public_page
 def skills(request):
-    frontend_skills = Skill.objects.filter(category='frontend')
-    backend_skills = Skill.objects.filter(category='backend')
-    database_skills = Skill.objects.filter(category='database')
-    tools_skills = Skill.objects.filter(category='tools')
+    return stream_render(request, 'skills.html', lambda: skills_context(get_snapshot()))
+
+@read_replica
+@conditional_page('search')
+def search(request):
+    query = request.GET.get('q', '').strip()
     
-    context = {
-        'frontend_skills': frontend_skills,
-        'backend_skills': backend_skills,
-        'database_skills': database_skills,
-        'tools_skills': tools_skills,
-    }
-    return render(request, 'skills.html', context)
+    def context():
+        return {
+            'query': query,
+            'results': search_content(query) if query else [],
+        }
+    return stream_render(request, 'search.html', context)
 
 def contact(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
 
-        if form.is_valid():
-            contact = form.save()
-
-            name = contact.name
-            email = contact.email
-            message = contact.message
+        # Flood checks run before anything touches the database or outbox
+        ip = client_ip(request)
+        retry_after = check_rate('ip', ip)
+        if retry_after:
+            reject('ip', ip)
+            return throttled(request, form, retry_after)
 
-            subject = f"New Contact Message from {name}"
-
-            body = f"""
+        if form.is_valid():
+            email = form.cleaned_data['email']
+            retry_after = check_rate('email', email)
+            if retry_after:
+                reject('email', email)
+                return throttled(request, form, retry_after)
+
+            # A resubmitted message gets the usual reply but is stored once
+            if is_duplicate(email, form.cleaned_data['subject'], form.cleaned_data['message']):
+                reject('duplicate', email)
+                messages.success(
+                    request,
+                    "Thank you! Your message has been sent successfully."
+                )
+                return redirect('contact')
+
+            # The notification is queued in the same transaction as the
+            # message itself; the send_outbox command delivers it.
+            with transaction.atomic():
+                contact = form.save()
+
+                name = contact.name
+                email = contact.email
+                message = contact.message
+
+                subject = f"New Contact Message from {name}"
+
+                body = f"""
             You have received a new message from your website.
             Name: {name}
             Email: {email}
             Message:{message}
             """
 
-            send_mail(
-                subject,
-                body,
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.CONTACT_EMAIL],
-                fail_silently=False,
-            )
+                enqueue_email(
+                    subject,
+                    body,
+                    [settings.CONTACT_EMAIL],
+                    reply_to=email,
+                )
 
             messages.success(
                 request,
@@ -102,11 +214,15 @@ def contact(request):
     else:
         form = ContactForm()
 
-    profile = Profile.objects.first()
-
     context = {
         'form': form,
-        'profile': profile,
     }
 
-    return render(request, 'contact.html', context)
\ No newline at end of file
+    return render(request, 'contact.html', context)
+
+
+def throttled(request, form, retry_after):
+    form.add_error(None, "You have sent several messages in a short time. Please try again later.")
+    response = render(request, 'contact.html', {'form': form}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Warm a process up before the server forks its workers.
+
+portfolio/wsgi.py and asgi.py call warmup() once the application is loaded.
+Under `gunicorn --preload` that runs in the master, so every worker starts
+with the templates compiled, the URL resolver populated, the template tag
+libraries and views imported, and the content snapshot and page caches
+filled, all shared copy-on-write. Without --preload each worker warms itself
+at import, before it accepts a connection.
+
+`python manage.py startup_report` shows where import and warmup time goes.
+"""
+import asyncio
+import gc
+import logging
+import threading
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.test import Client
+from django.urls import get_resolver, reverse
+
+from .metrics import reset_registry
+from .snapshot import get_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+
+def compile_templates():
+    """
+    Compile every template each engine can see into its cached loader.
+    Returns (compiled, skipped): templates for apps that are not installed,
+    such as Jazzmin's import_export overrides, fail to load and are skipped.
+    """
+    compiled = skipped = 0
+    for engine in engines.all():
+        for directory in map(Path, getattr(engine, 'template_dirs', ())):
+            for path in directory.rglob('*'):
+                if path.suffix not in TEMPLATE_SUFFIXES or not path.is_file():
+                    continue
+                try:
+                    engine.get_template(path.relative_to(directory).as_posix())
+                except (TemplateDoesNotExist, TemplateSyntaxError):
+                    skipped += 1
+                else:
+                    compiled += 1
+    return compiled, skipped
+
+
+def populate_urls():
+    """Import every URLconf and view module and build the reverse lookups"""
+    resolver = get_resolver()
+    resolver.reverse_dict  # populates the resolver and its includes
+    return len(resolver.url_patterns)
+
+
+def warm_pages():
+    """
+    Render the public pages and, where installed, the admin login through the
+    full stack. This fills the snapshot, page and card caches and imports
+    everything the first requests would (context processors, Jazzmin's tags).
+    """
+    get_snapshot()
+    client = Client()
+    paths = [reverse(name) for name in ('home', 'about', 'projects', 'skills', 'contact')]
+    if apps.is_installed('django.contrib.admin'):
+        paths.append(reverse('admin:login'))
+    for path in paths:
+        response = client.get(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if response.status_code != 200:
+            logger.warning("Warmup: %s returned %s", path, response.status_code)
+    # These were not real traffic
+    reset_registry()
+    return len(paths)
+
+
+STEPS = (
+    ('templates', compile_templates),
+    ('urls', populate_urls),
+    ('pages', warm_pages),
+)
+
+
+def warmup():
+    """Run every warmup step; returns [(step, seconds, result)]"""
+    timings = []
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            result = step()
+        except Exception:
+            # A cold worker is slower, not broken
+            logger.exception("Warmup step %s failed", name)
+            result = None
+        timings.append((name, time.perf_counter() - started, result))
+
+    # Forked workers must not share the master's database sockets
+    connections.close_all()
+    # Keep the warmed objects out of the collector, whose reference count
+    # writes would otherwise copy every shared page into each worker
+    gc.collect()
+    gc.freeze()
+    logger.info("Warmup: %s", ', '.join(f'{name} {seconds * 1000:.0f}ms' for name, seconds, _ in timings))
+    return timings
+
+
+def warmup_if_enabled():
+    if not getattr(settings, 'PORTFOLIO_WARMUP', False):
+        return None
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return warmup()
+    # Some ASGI servers import the application inside their event loop, where
+    # the ORM refuses to run; warm up from a thread instead
+    timings = []
+    thread = threading.Thread(target=lambda: timings.extend(warmup()), name='warmup')
+    thread.start()
+    thread.join()
+    return timings
@@ -0,0 +1,10 @@
+from django.contrib.admin.apps import AdminConfig
+
+
+class PortfolioAdminConfig(AdminConfig):
+    """
+    django.contrib.admin with the dashboard site from main/sites.py as
+    admin.site. Kept out of main/apps.py so that processes without the admin
+    (portfolio/settings_public.py) never import django.contrib.admin.
+    """
+    default_site = 'main.sites.CustomAdminSite'
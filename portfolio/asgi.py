@@ -2,6 +2,8 @@
 ASGI config for portfolio project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Importing it also warms the process up (main/warmup.py); serve with
+``gunicorn --preload`` so the workers fork from a warm master.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +16,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio.settings')
 
 application = get_asgi_application()
+
+from main.warmup import warmup_if_enabled  # noqa: E402  (needs the app registry)
+
+warmup_if_enabled()
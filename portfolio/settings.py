@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -36,7 +37,7 @@ ALLOWED_HOSTS = ['*']
 
 INSTALLED_APPS = [
     'jazzmin',
-    'django.contrib.admin',
+    'portfolio.apps.PortfolioAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -136,9 +137,9 @@ JAZZMIN_SETTINGS = {
     "custom_links": {
         "main": [{
             "name": "Analytics", 
-            "url": "admin:index", 
+            "url": "admin:analytics", 
             "icon": "fas fa-chart-line",
-            "permissions": ["main.view_contact"]
+            "permissions": ["main.view_pageviewday"]
         }]
     },
 
@@ -227,7 +228,9 @@ JAZZMIN_UI_TWEAKS = {
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
 MIDDLEWARE = [
+    'main.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'main.middleware.PageViewMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -240,7 +243,8 @@ ROOT_URLCONF = 'portfolio.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates with render time reported to /metrics
+        'BACKEND': 'main.metrics.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -248,6 +252,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'main.context_processors.portfolio',
             ],
         },
     },
@@ -259,13 +264,117 @@ WSGI_APPLICATION = 'portfolio.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuned for a web workload: WAL lets readers run alongside a writer,
+# synchronous=NORMAL is durable in WAL mode bar power loss, and writers
+# wait (busy_timeout) instead of failing with "database is locked".
+# IMMEDIATE transactions take the write lock up front, so a read-then-write
+# transaction cannot deadlock against another writer.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA busy_timeout=5000;'
+    'PRAGMA mmap_size=134217728;'
+    'PRAGMA cache_size=-20000;'
+    'PRAGMA temp_store=MEMORY;'
+)
+
+# Persistent connections; set SQLITE_CONN_MAX_AGE=0 under ASGI, where each
+# executor thread would otherwise keep its own connection open
+SQLITE_CONN_MAX_AGE = int(os.getenv('SQLITE_CONN_MAX_AGE', 600))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'CONN_MAX_AGE': SQLITE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # A file rather than the in-memory default, so that tests get WAL's
+        # snapshot reads on the replica connection as production does
+        'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'portfolio-test.sqlite3')},
+    },
+    # Read-only connection to the same file for the public pages (see
+    # main/routers.py), so page reads never queue behind a write transaction
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{BASE_DIR / 'db.sqlite3'}?mode=ro",
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA query_only=1;'
+                'PRAGMA busy_timeout=5000;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-20000;'
+            ),
+        },
+        'CONN_MAX_AGE': SQLITE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['main.routers.PrimaryReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Any backend works; use a shared one (file-based, memcached, redis) when
+# running several worker processes so they agree on the content version.
+# Setting PORTFOLIO_CACHE_DIR switches every process started with it to one
+# file-based cache in that directory.
+
+PORTFOLIO_CACHE_DIR = os.getenv('PORTFOLIO_CACHE_DIR')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portfolio',
+    } if not PORTFOLIO_CACHE_DIR else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': PORTFOLIO_CACHE_DIR,
     }
 }
 
+# Seconds between each process's check of the content tables against the
+# database (main/cache.py), which moves the content version for edits made
+# in processes that don't share this cache. None turns it off; only do that
+# with a shared cache backend
+PORTFOLIO_CONTENT_CHECK_INTERVAL = 5
+
+# Rendered public pages, invalidated by bumping the content version on save
+PORTFOLIO_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Rendered project, skill and certification cards ({% cardcache %}), keyed on
+# each object's updated_at so one edit re-renders one card; 0 disables
+PORTFOLIO_FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Send the <head> of public pages before their data is loaded (main/streaming.py);
+# compare with `python manage.py measure_ttfb`
+PORTFOLIO_STREAMING_RENDER = True
+
+# Serve the public pages from main/async_views.py; worthwhile under an ASGI
+# server (portfolio/asgi.py). Compare with `python manage.py benchmark_serving`
+PORTFOLIO_ASYNC_VIEWS = False
+
+# Project cards per page on /projects/ and per infinite-scroll batch
+PROJECTS_PAGE_SIZE = 9
+
+# Page view analytics (main/analytics.py): views are buffered in memory,
+# written in batches, and rolled up into hourly and daily tables which the
+# admin "Analytics" page reads
+PORTFOLIO_ANALYTICS = True
+ANALYTICS_EXCLUDE_PATHS = ('/admin/', '/static/', '/media/', '/favicon.ico', '/metrics')
+ANALYTICS_BUFFER_SIZE = 10000
+ANALYTICS_FLUSH_SIZE = 500
+ANALYTICS_FLUSH_INTERVAL = 10
+# Seconds between rollups run by each process's flusher thread; 0 leaves
+# them to `python manage.py rollup_pageviews`
+ANALYTICS_ROLLUP_INTERVAL = 5 * 60
+ANALYTICS_HOURLY_RETENTION_DAYS = 14
+ANALYTICS_DAILY_RETENTION_DAYS = 400
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -305,10 +414,63 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# `python manage.py build_assets` collects content-hashed files plus .gz/.br
+# siblings; Django serves them with immutable caching when SERVE_STATIC is on
+# (point a web server at STATIC_ROOT instead if you have one).
+SERVE_STATIC = True
+STATIC_UNHASHED_MAX_AGE = 300
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'main.storage.PrecompressedManifestStaticFilesStorage',
+    },
+}
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Generated artefacts that are not static files (see `manage.py build_icons`)
+BUILD_DIR = os.path.join(BASE_DIR, 'build')
+ICON_SPRITE_PATH = os.path.join(BUILD_DIR, 'icons.svg')
+
+# Request metrics (main/metrics.py) at /metrics, for staff users or a scraper
+# sending "Authorization: Bearer $METRICS_TOKEN". Each process writes its
+# totals to METRICS_DIR every METRICS_DUMP_INTERVAL seconds and the endpoint
+# merges them, dropping files left by processes that have exited. Kept in
+# the checkout so separate deployments on one host don't mix their counters.
+# None keeps metrics per-process.
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(BUILD_DIR, 'metrics'))
+METRICS_DUMP_INTERVAL = 5
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# `python manage.py export_static_site` writes the public pages, static files
+# and media here for a plain file server; /contact/ and /search/ still need
+# Django. With STATIC_EXPORT_ON_SAVE, content edits re-export in the background.
+STATIC_EXPORT_DIR = os.path.join(BUILD_DIR, 'site')
+STATIC_EXPORT_ON_SAVE = False
+
+# `python manage.py benchmark_endpoints` compares against this file; refresh
+# it with --update-baseline after `manage.py seed_portfolio --scale medium`
+BENCHMARK_BASELINE = os.path.join(BASE_DIR, 'benchmark_baseline.json')
+
+# portfolio/wsgi.py and asgi.py warm templates, URLs and caches at import
+# (see main/warmup.py); run gunicorn with --preload so workers fork warm.
+# `python manage.py startup_report` breaks down import and warmup time.
+# On by default, DEBUG or not, except in the runserver process that the
+# autoreloader restarts on every change (it has RUN_MAIN set).
+# PORTFOLIO_WARMUP=0 or 1 overrides the default either way.
+PORTFOLIO_WARMUP = os.getenv('PORTFOLIO_WARMUP', '0' if os.getenv('RUN_MAIN') else '1') == '1'
+
+# Responsive image variants (see main/images.py); backfill existing uploads
+# with `python manage.py build_image_variants`
+IMAGE_VARIANT_WIDTHS = (160, 320, 640, 960, 1280)
+IMAGE_VARIANT_WORKERS = 2
+IMAGE_VARIANTS_ASYNC = True
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -326,4 +488,22 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
-CONTACT_EMAIL = os.getenv("CONTACT_EMAIL")
\ No newline at end of file
+CONTACT_EMAIL = os.getenv("CONTACT_EMAIL")
+
+# Contact notifications are queued in the outbox and delivered by
+# `python manage.py send_outbox --loop`
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 60
+OUTBOX_RETRY_MAX_SECONDS = 60 * 60
+
+# Contact form flood control (main/throttle.py): (submissions, seconds) per
+# client address and per sender email, and how long an identical message is
+# dropped as a resubmission. Both are counted in the cache, so they only hold
+# across worker processes with a shared backend (PORTFOLIO_CACHE_DIR).
+CONTACT_RATE_LIMITS = {
+    'ip': (5, 10 * 60),
+    'email': (3, 60 * 60),
+}
+CONTACT_DUPLICATE_WINDOW = 10 * 60
+# Number of reverse proxies in front of the site that append X-Forwarded-For
+CONTACT_TRUSTED_PROXY_HOPS = int(os.getenv('CONTACT_TRUSTED_PROXY_HOPS', 0))
@@ -0,0 +1,73 @@
+"""
+Settings for processes that only serve the public site.
+
+These settings drop the admin, Jazzmin, crispy_forms, auth, sessions and
+contenttypes, along with their middleware and context processors. Serve
+/admin/ from a second process on portfolio.settings and route it there at
+the proxy:
+
+    DJANGO_SETTINGS_MODULE=portfolio.settings_public gunicorn --preload portfolio.wsgi
+    gunicorn --preload portfolio.wsgi  # admin, bound elsewhere
+
+Both share the database, cache and METRICS_DIR. The cache is file-based
+under PORTFOLIO_CACHE_DIR (a temporary directory by default), so start the
+admin process with the same PORTFOLIO_CACHE_DIR:
+
+    PORTFOLIO_CACHE_DIR=/var/cache/portfolio gunicorn --preload portfolio.wsgi
+
+`manage.py check` rejects a process-local cache in this profile. The contact
+page keeps its flash message in a signed cookie instead of the session.
+`python manage.py startup_report --settings portfolio.settings_public
+--compare portfolio.settings` shows the import time and RSS saved per worker.
+"""
+
+import os
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, PORTFOLIO_CACHE_DIR, TEMPLATES
+
+PORTFOLIO_PUBLIC_ONLY = True
+
+ADMIN_ONLY_APPS = (
+    'jazzmin',
+    'portfolio.apps.PortfolioAdminConfig',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'crispy_forms',
+    'crispy_bootstrap4',
+)
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_ONLY_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in (
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+    )
+]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.contrib.auth.context_processors.auth'
+        ],
+    },
+}]
+
+ROOT_URLCONF = 'portfolio.urls_public'
+
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Content version bumps from admin saves must reach this process
+PORTFOLIO_CACHE_DIR = PORTFOLIO_CACHE_DIR or os.path.join(tempfile.gettempdir(), 'portfolio-cache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': PORTFOLIO_CACHE_DIR,
+    }
+}
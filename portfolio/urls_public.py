@@ -0,0 +1,25 @@
+"""
+URL configuration for public-only processes (portfolio/settings_public.py):
+everything in portfolio/urls.py except the admin.
+"""
+import re
+
+from django.urls import path, include, re_path
+from django.conf import settings
+from django.conf.urls.static import static
+
+from main.assets import serve_static
+from main.metrics import metrics_view
+
+urlpatterns = [
+    path('metrics', metrics_view, name='metrics'),
+    path('', include('main.urls')),
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static),
+    ]
@@ -2,6 +2,8 @@
 WSGI config for portfolio project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Importing it also warms the process up (main/warmup.py); serve with
+``gunicorn --preload`` so the workers fork from a warm master.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -14,3 +16,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio.settings')
 
 application = get_wsgi_application()
+
+from main.warmup import warmup_if_enabled  # noqa: E402  (needs the app registry)
+
+warmup_if_enabled()
@@ -69,6 +69,47 @@ document.addEventListener("DOMContentLoaded", function() {
     lazyImages.forEach(img => imageObserver.observe(img));
 });
 
+// Infinite scroll for the projects grid
+const projectsSentinel = document.getElementById('projects-sentinel');
+if (projectsSentinel && 'IntersectionObserver' in window) {
+    const grid = document.getElementById('projects-grid');
+    let loading = false;
+    
+    // The "Load More" link stays as the no-JS fallback
+    projectsSentinel.querySelector('.load-more').classList.add('d-none');
+    
+    const sentinelObserver = new IntersectionObserver((entries) => {
+        const url = projectsSentinel.dataset.next;
+        if (!entries[0].isIntersecting || loading) return;
+        if (!url) {
+            sentinelObserver.disconnect();
+            return;
+        }
+        
+        loading = true;
+        fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(data => {
+                grid.insertAdjacentHTML('beforeend', data.html);
+                projectsSentinel.dataset.next = data.next_url || '';
+                if (!data.next_url) {
+                    sentinelObserver.disconnect();
+                }
+                AOS.refreshHard();
+                document.dispatchEvent(new CustomEvent('projects:appended'));
+            })
+            .catch(() => {
+                projectsSentinel.querySelector('.load-more').classList.remove('d-none');
+                sentinelObserver.disconnect();
+            })
+            .finally(() => {
+                loading = false;
+            });
+    }, { rootMargin: '400px' });
+    
+    sentinelObserver.observe(projectsSentinel);
+}
+
 // Preloader (optional)
 window.addEventListener('load', function() {
     const preloader = document.querySelector('.preloader');